@@ -0,0 +1,37 @@
+"""
+admin/backfill_stats.py
+
+Пересчёт агрегатов статистики (user_stats, user_daily_stats) из
+существующих scores.
+Нужен один раз после применения db/schema.sql на базе с историей ответов;
+дальше агрегаты поддерживает триггер на scores.
+
+Запуск:
+  python admin/backfill_stats.py
+"""
+
+import os
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+
+
+def backfill_stats() -> None:
+    db = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    res = db.rpc("backfill_user_stats", {}).execute()
+    updated = res.data[0]["users_updated"] if res.data else 0
+    print(f"user_stats: обновлено пользователей {updated}")
+
+    res = db.rpc("backfill_user_daily_stats", {}).execute()
+    written = res.data[0]["buckets_written"] if res.data else 0
+    print(f"user_daily_stats: записано корзин {written}")
+
+
+if __name__ == "__main__":
+    backfill_stats()
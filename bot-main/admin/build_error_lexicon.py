@@ -0,0 +1,277 @@
+"""
+admin/build_error_lexicon.py
+
+Сборка data/error_lexicon.tsv — словаря типичных ошибок русско- и
+узбекоязычных учеников (wrong → right) для проверки ответов.
+
+Здесь только буквальные записи (неправильные глаголы вида «goed»,
+предлоги, неисчисляемые существительные и т.д. плюс ручные записи).
+Семейства ошибок вида «did {pronoun} {past}», «since {number} weeks»,
+«at {year}» — это шаблоны в services/error_patterns.py, в файл они не
+разворачиваются. Все записи — в нормализованном виде
+(utils.text.normalize): сокращения раскрыты, только строчные буквы.
+
+Запуск:
+  python admin/build_error_lexicon.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from services.error_patterns import IRREGULAR, regular_past  # noqa: E402
+from utils.text import normalize  # noqa: E402
+
+OUTPUT = ROOT / "data" / "error_lexicon.tsv"
+
+# ─── Глаголы ──────────────────────────────────────────────────
+# Формы глаголов — общие с шаблонами (services/error_patterns.py)
+# «seed», «singed», «wined»… — настоящие слова, их не считаем ошибкой
+REAL_WORDS = {
+    "seed", "singed", "wined", "leaded", "teared", "ringed", "bended", "waked",
+    "putted", "quitted", "costed", "setted", "letted",
+}
+
+
+def over_regularized(verb: str) -> list[str]:
+    forms = [regular_past(verb)]
+    # run → runned, win → winned
+    if len(verb) <= 4 and verb[-1] not in "aeiouwxy" and verb[-2] in "aeiou" and verb[-3] not in "aeiou":
+        forms.append(verb + verb[-1] + "ed")
+    return [form for form in forms if form not in REAL_WORDS]
+
+
+def verb_entries() -> list[tuple[str, str, str]]:
+    entries = []
+    for verb, correct in IRREGULAR.items():
+        for wrong in over_regularized(verb):
+            if wrong != correct:
+                entries.append((wrong, correct, "verb_form"))
+    for stative in ("agree", "disagree"):
+        entries.append((f"i am {stative}", f"i {stative}", "verb_form"))
+        entries.append((f"we are {stative}", f"we {stative}", "verb_form"))
+        entries.append((f"they are {stative}", f"they {stative}", "verb_form"))
+    return entries
+
+
+# ─── Предлоги ─────────────────────────────────────────────────
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = (
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+)
+OBJECTS = ("me", "him", "her", "us", "them", "you")
+
+
+def preposition_entries() -> list[tuple[str, str, str]]:
+    entries = [
+        # прежний словарь preposition_fixes
+        ("in weekend", "at weekend", "preposition"),
+        ("in the weekend", "at the weekend", "preposition"),
+        ("on the weekends", "at weekends", "preposition"),
+        ("in weekends", "at weekends", "preposition"),
+        ("work in the weekend", "work at the weekend", "preposition"),
+        ("on afternoon", "in the afternoon", "preposition"),
+        ("in morning", "in the morning", "preposition"),
+        ("in night", "at night", "preposition"),
+        ("at morning", "in the morning", "preposition"),
+        ("at the morning", "in the morning", "preposition"),
+        ("in evening", "in the evening", "preposition"),
+        ("at evening", "in the evening", "preposition"),
+        ("at afternoon", "in the afternoon", "preposition"),
+        ("in afternoon", "in the afternoon", "preposition"),
+        ("on morning", "in the morning", "preposition"),
+        ("on evening", "in the evening", "preposition"),
+        ("in the night time", "at night", "preposition"),
+        ("in the internet", "on the internet", "preposition"),
+        ("in internet", "on the internet", "preposition"),
+        ("in tv", "on tv", "preposition"),
+        ("in the tv", "on tv", "preposition"),
+        ("by foot", "on foot", "preposition"),
+        ("on the photo", "in the photo", "preposition"),
+        ("on the picture", "in the picture", "preposition"),
+        ("in the bus", "on the bus", "preposition"),
+        ("in the plane", "on the plane", "preposition"),
+        ("in the train", "on the train", "preposition"),
+        ("married with", "married to", "preposition"),
+        ("afraid from", "afraid of", "preposition"),
+        ("angry on", "angry with", "preposition"),
+        ("proud with", "proud of", "preposition"),
+        ("interested about", "interested in", "preposition"),
+        ("interested for", "interested in", "preposition"),
+        ("good in math", "good at math", "preposition"),
+        ("consist from", "consist of", "preposition"),
+        ("consists from", "consists of", "preposition"),
+        ("congratulate with", "congratulate on", "preposition"),
+        ("at the first time", "for the first time", "preposition"),
+        ("in the end of", "at the end of", "preposition"),
+        ("in the beginning of the", "at the beginning of the", "preposition"),
+    ]
+    for day in DAYS:
+        for wrong in ("in", "at"):
+            entries.append((f"{wrong} {day}", f"on {day}", "preposition"))
+    for month in MONTHS:
+        for wrong in ("on", "at"):
+            entries.append((f"{wrong} {month}", f"in {month}", "preposition"))
+    for form in ("depend", "depends", "depended", "depending"):
+        entries.append((f"{form} from", f"{form} on", "preposition"))
+        entries.append((f"{form} of", f"{form} on", "preposition"))
+    for form in ("listen", "listens", "listened", "listening"):
+        for thing in ("music", "the radio", "me", "him", "her", "them", "the teacher"):
+            entries.append((f"{form} {thing}", f"{form} to {thing}", "preposition"))
+    for form in ("arrive", "arrives", "arrived", "arriving"):
+        entries.append((f"{form} to", f"{form} at", "preposition"))
+    for form in ("explain", "explains", "explained", "explaining"):
+        for obj in OBJECTS:
+            entries.append((f"{form} {obj}", f"{form} to {obj}", "preposition"))
+    for form in ("wait", "waits", "waited", "waiting"):
+        for obj in OBJECTS:
+            entries.append((f"{form} {obj}", f"{form} for {obj}", "preposition"))
+    for form in ("discuss", "discusses", "discussed", "discussing"):
+        entries.append((f"{form} about", form, "preposition"))
+    for verb in ("go", "goes", "went", "going", "come", "comes", "came", "coming", "get", "got", "return", "returned"):
+        entries.append((f"{verb} to home", f"{verb} home", "preposition"))
+    for form in ("enter", "enters", "entered", "entering"):
+        entries.append((f"{form} into the", f"{form} the", "preposition"))
+        entries.append((f"{form} in the", f"{form} the", "preposition"))
+    return entries
+
+
+# ─── Лексика ──────────────────────────────────────────────────
+# Не бывают во множественном числе: «informations», «advices»
+NEVER_PLURAL = (
+    "information", "advice", "furniture", "equipment", "knowledge", "homework",
+    "luggage", "baggage", "evidence", "feedback", "software", "traffic", "progress",
+    "research",
+)
+# Неисчисляемые в типичном значении, но с законной формой на -s («waters», «works»)
+UNCOUNTABLE = ("news", "money", "weather", "bread", "rice", "water", "music", "fun", "help")
+PLURALS = (
+    "people", "friends", "books", "children", "students", "cars", "things", "questions",
+    "problems", "countries", "cities", "languages", "words", "apples", "tourists", "teachers", "houses", "places", "mistakes", "ideas", "jobs",
+)
+COMPARATIVES = (
+    "better", "worse", "bigger", "smaller", "easier", "harder", "faster", "older", "younger",
+    "taller", "cheaper", "happier", "longer", "shorter", "higher", "larger", "stronger",
+    "warmer", "colder", "hotter", "richer", "busier", "earlier", "later", "nicer", "closer",
+    "smarter", "cleaner",
+)
+IRREGULAR_SUPERLATIVES = {"better": "best", "worse": "worst"}
+
+
+def vocabulary_entries() -> list[tuple[str, str, str]]:
+    entries = []
+    for noun in NEVER_PLURAL:
+        entries.append((noun + "s", noun, "countable"))
+        entries.append((f"a lot of {noun}s", f"a lot of {noun}", "countable"))
+    for noun in NEVER_PLURAL + UNCOUNTABLE:
+        entries.append((f"many {noun}", f"much {noun}", "countable"))
+    entries += [
+        ("an information", "information", "countable"),
+        ("an advice", "a piece of advice", "countable"),
+        ("a advice", "a piece of advice", "countable"),
+        ("a news", "news", "countable"),
+        ("the news are", "the news is", "countable"),
+        ("a homework", "homework", "countable"),
+        ("a furniture", "furniture", "countable"),
+        ("peoples are", "people are", "countable"),
+        ("childrens", "children", "countable"),
+        ("mans", "men", "countable"),
+        ("womans", "women", "countable"),
+        ("foots", "feet", "countable"),
+        ("tooths", "teeth", "countable"),
+        ("mouses", "mice", "countable"),
+        ("persons", "people", "countable"),
+    ]
+    for noun in PLURALS:
+        entries.append((f"much {noun}", f"many {noun}", "countable"))
+        entries.append((f"how much {noun}", f"how many {noun}", "countable"))
+        entries.append((f"a {noun}", noun, "countable"))
+    entries.append(("people is", "people are", "agreement"))
+    entries.append(("children is", "children are", "agreement"))
+    entries.append(("police is", "police are", "agreement"))
+
+    for comparative in COMPARATIVES:
+        entries.append((f"more {comparative}", comparative, "comparative"))
+        superlative = IRREGULAR_SUPERLATIVES.get(comparative, comparative[:-2] + "est")
+        entries.append((f"most {superlative}", superlative, "comparative"))
+        entries.append((f"the most {superlative}", f"the {superlative}", "comparative"))
+    entries += [
+        ("more good", "better", "comparative"),
+        ("more bad", "worse", "comparative"),
+        ("gooder", "better", "comparative"),
+        ("badder", "worse", "comparative"),
+        ("most good", "best", "comparative"),
+        ("most bad", "worst", "comparative"),
+        ("the most best", "the best", "comparative"),
+        ("more then", "more than", "word_choice"),
+        ("better then", "better than", "word_choice"),
+    ]
+
+    for form, right in (("make", "take"), ("makes", "takes"), ("made", "took"), ("making", "taking")):
+        for thing in ("a photo", "photos", "a picture", "pictures", "a shower", "a rest"):
+            entries.append((f"{form} {thing}", f"{right} {thing}", "word_choice"))
+    for form, right in (("do", "make"), ("does", "makes"), ("did", "made"), ("doing", "making")):
+        for thing in ("a mistake", "mistakes", "a decision", "a noise", "a plan", "friends"):
+            entries.append((f"{form} {thing}", f"{right} {thing}", "word_choice"))
+    for form, right in (("make", "do"), ("makes", "does"), ("made", "did"), ("making", "doing")):
+        for thing in ("homework", "my homework", "sport", "sports", "exercises", "the shopping", "a favour"):
+            entries.append((f"{form} {thing}", f"{right} {thing}", "word_choice"))
+    for form, right in (("say", "tell"), ("says", "tells"), ("said", "told")):
+        for obj in OBJECTS:
+            entries.append((f"{form} {obj} about", f"{right} {obj} about", "word_choice"))
+        entries.append((f"{form} a story", f"{right} a story", "word_choice"))
+        entries.append((f"{form} the truth", f"{right} the truth", "word_choice"))
+        entries.append((f"{form} a lie", f"{right} a lie", "word_choice"))
+    for form in ("return", "returns", "returned", "returning"):
+        entries.append((f"{form} back", form, "word_choice"))
+    for form, right in (("borrow", "lend"), ("borrowed", "lent")):
+        for obj in ("me", "him", "her", "us", "them"):
+            entries.append((f"{form} {obj}", f"{right} {obj}", "word_choice"))
+    entries += [
+        ("how to say in english", "how do you say in english", "word_choice"),
+        ("i very like", "i really like", "word_choice"),
+        ("i very love", "i really love", "word_choice"),
+        ("very like", "really like", "word_choice"),
+        ("every days", "every day", "word_choice"),
+        ("each days", "each day", "word_choice"),
+        ("one of my friend", "one of my friends", "countable"),
+        ("one of the best student", "one of the best students", "countable"),
+        ("on my opinion", "in my opinion", "preposition"),
+        ("i am agree with", "i agree with", "verb_form"),
+        ("it is depend", "it depends", "verb_form"),
+        ("open the light", "turn on the light", "word_choice"),
+        ("close the light", "turn off the light", "word_choice"),
+        ("open the tv", "turn on the tv", "word_choice"),
+        ("close the tv", "turn off the tv", "word_choice"),
+        ("look tv", "watch tv", "word_choice"),
+        ("looking tv", "watching tv", "word_choice"),
+        ("see tv", "watch tv", "word_choice"),
+        ("i have 18 years old", "i am 18 years old", "word_choice"),
+    ]
+    return entries
+
+
+def build() -> list[tuple[str, str, str]]:
+    seen: dict[str, tuple[str, str, str]] = {}
+    for wrong, right, category in verb_entries() + preposition_entries() + vocabulary_entries():
+        wrong, right = normalize(wrong), normalize(right)
+        if wrong and wrong != right and wrong not in seen:
+            seen[wrong] = (wrong, right, category)
+    return sorted(seen.values(), key=lambda entry: (entry[2], entry[0]))
+
+
+def main() -> None:
+    entries = build()
+    OUTPUT.parent.mkdir(exist_ok=True)
+    with open(OUTPUT, "w", encoding="utf-8", newline="\n") as f:
+        f.write("# wrong\tright\tcategory — generated by admin/build_error_lexicon.py\n")
+        for entry in entries:
+            f.write("\t".join(entry) + "\n")
+    print(f"{OUTPUT.relative_to(ROOT)}: {len(entries)} записей")
+
+
+if __name__ == "__main__":
+    main()
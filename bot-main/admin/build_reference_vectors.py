@@ -0,0 +1,65 @@
+"""
+admin/build_reference_vectors.py
+
+Пересчитывает векторы эталонных ответов (english_answer и
+alternative_answers всех фраз) для SEMANTIC_SCORER=embedding|hashing и
+записывает их в SEMANTIC_VECTORS_PATH (.npy + .json). Бот отображает файл
+в память при старте; фразы, которых в файле нет, считаются на лету.
+
+load_phrases.py вызывает сборку сам после импорта.
+
+Запуск:
+  SEMANTIC_SCORER=embedding python admin/build_reference_vectors.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import SEMANTIC_SCORER, SEMANTIC_VECTORS_PATH  # noqa: E402
+from services.semantic import create_embedder, write_reference_vectors  # noqa: E402
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+PAGE_SIZE = 1000
+
+
+def reference_texts(db) -> list[str]:
+    texts: list[str] = []
+    start = 0
+    while True:
+        rows = (
+            db.table("phrases")
+            .select("english_answer,alternative_answers")
+            .order("id")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for row in rows:
+            texts.append(row["english_answer"])
+            texts.extend(row.get("alternative_answers") or [])
+        if len(rows) < PAGE_SIZE:
+            return texts
+        start += PAGE_SIZE
+
+
+def build_reference_vectors(db=None) -> bool:
+    embedder = create_embedder()
+    if embedder is None:
+        print(f"SKIP vectors: SEMANTIC_SCORER={SEMANTIC_SCORER!r} does not use embeddings")
+        return False
+    db = db or create_client(SUPABASE_URL, SUPABASE_KEY)
+    count = write_reference_vectors(reference_texts(db), embedder)
+    print(f"Vectors: {count} references ({embedder.name}) → {SEMANTIC_VECTORS_PATH}.npy")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if build_reference_vectors() else 1)
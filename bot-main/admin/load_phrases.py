@@ -8,12 +8,18 @@ topic_id,level,text_ru,text_uz,english_answer,alternative_answers
 
 import csv
 import os
-import re
 import sys
+from pathlib import Path
 
 from dotenv import load_dotenv
 from supabase import create_client
 
+# utils/ лежит в корне проекта; ключ должен совпадать с save_phrase бота
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from admin.build_reference_vectors import build_reference_vectors  # noqa: E402
+from utils.text import phrase_key  # noqa: E402
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -21,12 +27,6 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY
 ALLOWED_LEVELS = {"B1", "B2"}
 
 
-def phrase_key(text: str) -> str:
-    value = text.lower()
-    value = re.sub(r"[^a-z0-9\s']", " ", value)
-    return re.sub(r"\s+", " ", value).strip()
-
-
 def split_alternatives(value: str) -> list[str]:
     return [item.strip() for item in value.split("|") if item.strip()]
 
@@ -89,6 +89,8 @@ def load_phrases(csv_path: str) -> None:
         inserted += 1
 
     print(f"Done. inserted={inserted}, skipped={skipped}")
+    if inserted:
+        build_reference_vectors(db)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+"""
+bench/ai_clients.py — AI explanation latency: a new httpx client per
+request vs the shared per-provider client (development only, not used by
+the bot).
+
+Starts a local OpenAI-compatible stand-in (aiohttp, fixed per-request
+latency) and sends N sequential explanation calls through
+services/ai_explainer.py in each mode:
+  * fresh  — a new AsyncClient per call (the old behaviour);
+  * shared — the pooled client opened by start_ai_clients().
+
+With --tls the stand-in serves HTTPS with a throwaway self-signed
+certificate (needs the openssl CLI), so the difference includes the TLS
+handshake that a real provider costs on every fresh connection.
+
+Usage:
+    python -m bench.ai_clients [--latency-ms 50] [--requests 50] [--tls]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+from aiohttp import web
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _make_stand_in(latency: float) -> web.Application:
+    async def completions(request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(latency)
+        return web.json_response({"choices": [{"message": {"content": "Use 'was' for the past."}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    return app
+
+
+def _self_signed(directory: str):
+    import ssl
+
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", key, "-out", cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    # httpx trusts SSL_CERT_FILE, so the bot's clients accept the stand-in
+    os.environ["SSL_CERT_FILE"] = cert
+    return context
+
+
+async def _run_mode(ai_explainer, mode: str, requests: int) -> dict:
+    import httpx
+
+    provider = ai_explainer.PROVIDERS[0]
+    shared_client = ai_explainer._client
+
+    opened: list[httpx.AsyncClient] = []
+
+    def fresh(provider):
+        # What every call did before: a brand-new client and connection
+        client = httpx.AsyncClient(
+            timeout=ai_explainer.AI_TIMEOUT,
+            headers={"Authorization": f"Bearer {provider.api_key}"},
+        )
+        opened.append(client)
+        return client
+
+    latencies: list[float] = []
+    ai_explainer._client = fresh if mode == "fresh" else shared_client
+    try:
+        await ai_explainer._call_api(provider, "warm up")
+        for _ in range(requests):
+            started = time.perf_counter()
+            assert await ai_explainer._call_api(provider, "Explain the error.")
+            latencies.append(time.perf_counter() - started)
+    finally:
+        ai_explainer._client = shared_client
+        await asyncio.gather(*(client.aclose() for client in opened))
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+async def main(latency_ms: float, requests: int, tls: bool) -> None:
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        ssl_context = _self_signed(directory) if tls else None
+        scheme = "https" if tls else "http"
+        os.environ["GROQ_API_URL"] = f"{scheme}://127.0.0.1:{port}/v1/chat/completions"
+        os.environ["GROQ_API_KEY"] = "bench"
+
+        from services import ai_explainer
+
+        runner = web.AppRunner(_make_stand_in(latency_ms / 1000))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, ssl_context=ssl_context).start()
+        await ai_explainer.start_ai_clients()
+
+        print(f"stand-in latency {latency_ms} ms over {scheme}, {requests} sequential calls")
+        print(f"{'mode':<7} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        try:
+            for mode in ("fresh", "shared"):
+                r = await _run_mode(ai_explainer, mode, requests)
+                print(f"{r['mode']:<7} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['mean_ms']:>8.1f}")
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.requests, args.tls))
@@ -0,0 +1,146 @@
+"""
+bench/checker.py — checker latency benchmark and regression gate
+(development only, not used by the bot).
+
+Runs every case of bench/checker_corpus.json through
+services.checker._check_translation_sync and reports p50/p95/p99 latency
+and answers/sec. It runs twice: once on the heuristics only, and once with
+LanguageTool when it is available (Java or LANGUAGE_TOOL_URL).
+
+Gates (exit code 1 on failure):
+  * score drift — every score must stay inside its case's score_band;
+  * time — time per answer must not exceed --baseline (from an earlier
+    --save-baseline run on the same machine) by more than --max-slowdown.
+
+Caches (normalizer, reference index) are cleared before every pass, so
+each pass measures first-sight cost. The error lexicon is built up front,
+as the bot does at startup.
+
+Usage:
+    python -m bench.checker [--repeat 20] [--no-languagetool]
+                            [--save-baseline bench.json | --baseline bench.json --max-slowdown 1.25]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from services import checker, error_lexicon
+from utils import text
+
+CORPUS = Path(__file__).with_name("checker_corpus.json")
+
+
+def load_corpus(path: Path = CORPUS) -> list[dict]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data["cases"]
+
+
+def references(case: dict) -> list[str]:
+    return [case["reference"], *case["alternatives"]]
+
+
+def check_case(case: dict, with_languagetool: bool) -> dict:
+    grammar = checker._CHECK_INLINE if with_languagetool else None
+    return checker._check_translation_sync(references(case), case["answer"], case["level"], None, grammar)
+
+
+def score_drift(cases: list[dict], results: list[dict]) -> list[str]:
+    failures = []
+    for case, result in zip(cases, results):
+        low, high = case["score_band"]
+        if not low <= result["score"] <= high:
+            failures.append(f"{case['id']}: score {result['score']} outside [{low}, {high}] — {case['answer']!r}")
+    return failures
+
+
+def _clear_caches() -> None:
+    text.normalize.cache_clear()
+    text.tokens.cache_clear()
+    checker._reference_index.clear()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_mode(cases: list[dict], with_languagetool: bool, repeat: int) -> tuple[dict, list[dict]]:
+    latencies: list[float] = []
+    results: list[dict] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        _clear_caches()
+        results = []
+        for case in cases:
+            t0 = time.perf_counter()
+            results.append(check_case(case, with_languagetool))
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    report = {
+        "answers": len(latencies),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "answers_per_sec": round(len(latencies) / elapsed, 1),
+    }
+    return report, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-languagetool", action="store_true")
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    args = parser.parse_args()
+
+    cases = load_corpus()
+    error_lexicon.load()
+    modes = {"heuristics": False}
+    if not args.no_languagetool and checker.language_tool.start():
+        modes["languagetool"] = True
+
+    reports: dict[str, dict] = {}
+    failures: list[str] = []
+    for name, with_languagetool in modes.items():
+        report, results = run_mode(cases, with_languagetool, args.repeat)
+        reports[name] = report
+        print(
+            f"{name:<13} p50 {report['p50_ms']:8.3f} ms  p95 {report['p95_ms']:8.3f} ms  "
+            f"p99 {report['p99_ms']:8.3f} ms  {report['answers_per_sec']:9.1f} answers/s"
+        )
+        # Bands are calibrated on the heuristics; LanguageTool adds feedback only.
+        if name == "heuristics":
+            failures += score_drift(cases, results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(reports, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        for name, report in reports.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name]["mean_ms"] * args.max_slowdown
+            if report["mean_ms"] > limit:
+                failures.append(
+                    f"{name}: {report['mean_ms']} ms/answer exceeds {limit:.3f} "
+                    f"(baseline {baseline[name]['mean_ms']} × {args.max_slowdown})"
+                )
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(cases)} cases, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
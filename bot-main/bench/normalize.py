@@ -0,0 +1,74 @@
+"""
+bench/normalize.py — per-call cost of text normalization
+(development only, not used by the bot).
+
+Compares the previous checker normalizer (one re.sub per contraction plus
+two cleanup passes) with utils.text.normalize, both on fresh strings
+(cache miss, single-pass regex) and on repeated strings (memoized hit).
+Also checks that both produce identical output on the sample.
+
+Usage:
+    python -m bench.normalize [--n 20000]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from utils import text
+
+_SAMPLE = [
+    "I'm going to the office, it's late!",
+    "They're not sure they'll come — don't wait.",
+    "She doesn't like coffee; he can't drink tea.",
+    "We were at home when you called.",
+    "I won't forget what you're telling me.",
+    "The weather isn't good today, isn't it?",
+    "  I didn't know THAT Tashkent is so big.  ",
+    "You'll see: we'll win, they'll lose.",
+]
+
+
+def _legacy_normalize(value: str) -> str:
+    value = value.strip().lower()
+    for old, new in text.CONTRACTIONS.items():
+        value = re.sub(rf"\b{re.escape(old)}\b", new, value)
+    value = re.sub(r"[^a-z0-9'\s]", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _per_call_us(fn, inputs: list[str]) -> float:
+    started = time.perf_counter()
+    for item in inputs:
+        fn(item)
+    return (time.perf_counter() - started) / len(inputs) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Unique suffixes defeat the memo, so "fresh" measures the regex work itself.
+    fresh = [f"{rng.choice(_SAMPLE)} #{i}" for i in range(args.n)]
+    repeated = [rng.choice(_SAMPLE) for _ in range(args.n)]
+
+    mismatches = [item for item in fresh + _SAMPLE if _legacy_normalize(item) != text.normalize(item)]
+    text.normalize.cache_clear()
+
+    legacy = _per_call_us(_legacy_normalize, fresh)
+    single_pass = _per_call_us(text.normalize, fresh)
+    text.normalize.cache_clear()
+    _per_call_us(text.normalize, repeated)  # warm the memo
+    memoized = _per_call_us(text.normalize, repeated)
+
+    print(f"legacy (20+ passes)      {legacy:7.2f} µs/call")
+    print(f"single pass, fresh       {single_pass:7.2f} µs/call  ({legacy / single_pass:4.1f}x)")
+    print(f"single pass, memoized    {memoized:7.2f} µs/call  ({legacy / memoized:4.1f}x)")
+    print(f"output mismatches        {len(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
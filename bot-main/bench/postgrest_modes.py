@@ -0,0 +1,116 @@
+"""
+bench/postgrest_modes.py — compare SUPABASE_HTTP_MODE=sync vs async
+(development only, not used by the bot).
+
+Starts a local PostgREST-compatible stand-in (aiohttp, fixed per-request
+latency) and fires N concurrent get_user_stats() calls through
+db/supabase_client.py in each mode.
+
+The stand-in speaks plain HTTP/1.1, so this measures connection reuse and
+thread-free concurrency; HTTP/2 multiplexing only applies against the real
+TLS endpoint.
+
+Usage:
+    python -m bench.postgrest_modes [--latency-ms 20] [--concurrency 50 200 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import time
+
+from aiohttp import web
+
+# Dummy JWT-shaped key: supabase-py validates the format only.
+_FAKE_KEY = "bench.bench.bench"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _make_stand_in(latency: float) -> web.Application:
+    scores = [{"score": 50 + i % 50} for i in range(40)]
+    # get_user_stats reads the rollup; scores only serve the scan fallback
+    rows = {
+        "user_stats": [{
+            "total": len(scores),
+            "score_sum": sum(row["score"] for row in scores),
+            "best": max(row["score"] for row in scores),
+        }],
+        "scores": scores,
+    }
+
+    async def table(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response(rows.get(request.match_info["table"], []))
+
+    app = web.Application()
+    app.router.add_route("*", "/rest/v1/{table}", table)
+    return app
+
+
+async def _run_mode(client_module, mode: str, concurrency: int) -> dict:
+    client_module.SUPABASE_HTTP_MODE = mode
+    latencies: list[float] = []
+
+    async def one():
+        started = time.perf_counter()
+        await client_module.get_user_stats(1)
+        latencies.append(time.perf_counter() - started)
+
+    await one()  # warm up the connection / thread pool
+    latencies.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "req_per_s": concurrency / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main(latency_ms: float, levels: list[int]) -> None:
+    port = _free_port()
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["SUPABASE_KEY"] = _FAKE_KEY
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = ""
+
+    from db import supabase_client
+
+    runner = web.AppRunner(_make_stand_in(latency_ms / 1000))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    print(f"stand-in latency {latency_ms} ms")
+    print(f"{'mode':<6} {'conc':>5} {'wall s':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    try:
+        for concurrency in levels:
+            for mode in ("sync", "async"):
+                r = await _run_mode(supabase_client, mode, concurrency)
+                print(
+                    f"{r['mode']:<6} {r['concurrency']:>5} {r['wall_s']:>8.2f} "
+                    f"{r['req_per_s']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}"
+                )
+    finally:
+        await supabase_client.close_db()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.concurrency))
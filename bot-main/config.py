@@ -21,25 +21,126 @@ def _float_env(name: str, default: float) -> float:
 # ─── Telegram ────────────────────────────────────────────────
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 
+# Внутренние счётчики GET /metrics: только с заголовком
+# "Authorization: Bearer <METRICS_TOKEN>"; пустой токен отключает эндпоинт
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # ─── Supabase ────────────────────────────────────────────────
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+# "async" — общий httpx.AsyncClient (HTTP/2, keep-alive); "sync" — supabase-py в потоках
+SUPABASE_HTTP_MODE             = os.getenv("SUPABASE_HTTP_MODE", "async").strip().lower()
+SUPABASE_HTTP_TIMEOUT          = _float_env("SUPABASE_HTTP_TIMEOUT", 10.0)
+# HTTP/2 мультиплексирует запросы, поэтому хватает нескольких соединений;
+# большой пул только замедляет httpcore (см. bench/postgrest_modes.py)
+SUPABASE_HTTP_MAX_CONNECTIONS  = _int_env("SUPABASE_HTTP_MAX_CONNECTIONS", 10)
+SUPABASE_HTTP_MAX_KEEPALIVE    = _int_env("SUPABASE_HTTP_MAX_KEEPALIVE", 10)
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = _float_env("SUPABASE_HTTP_KEEPALIVE_EXPIRY", 60.0)
+
+# ─── Data layer backend ──────────────────────────────────────
+# "supabase" — PostgREST через supabase-py (по умолчанию)
+# "postgres" — прямое подключение asyncpg к DATABASE_URL
+DB_BACKEND   = os.getenv("DB_BACKEND", "supabase").strip().lower()
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+DB_POOL_MIN_SIZE = _int_env("DB_POOL_MIN_SIZE", 2)
+DB_POOL_MAX_SIZE = _int_env("DB_POOL_MAX_SIZE", 10)
+# 0 отключает prepared statements (нужно за PgBouncer в transaction mode)
+DB_STATEMENT_CACHE_SIZE = _int_env("DB_STATEMENT_CACHE_SIZE", 100)
 
 # ─── AI providers (для объяснения ошибок) ────────────────────
 GROQ_API_KEY    = os.getenv("GROQ_API_KEY", "")
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY", "")
 GEMINI_API_KEY  = os.getenv("GEMINI_API_KEY", "")
 AI_TIMEOUT      = _float_env("AI_TIMEOUT", 8.0)          # секунд
+GROQ_API_URL     = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+TOGETHER_API_URL = os.getenv("TOGETHER_API_URL", "https://api.together.xyz/v1/chat/completions")
+# Один долгоживущий клиент на провайдера (HTTP/2, keep-alive)
+AI_HTTP_MAX_CONNECTIONS  = _int_env("AI_HTTP_MAX_CONNECTIONS", 10)
+AI_HTTP_MAX_KEEPALIVE    = _int_env("AI_HTTP_MAX_KEEPALIVE", 10)
+AI_HTTP_KEEPALIVE_EXPIRY = _float_env("AI_HTTP_KEEPALIVE_EXPIRY", 60.0)
+# Запасной провайдер стартует, если основной молчит дольше своего
+# AI_HEDGE_PERCENTILE-го перцентиля задержки (до набора статистики — AI_HEDGE_DELAY)
+AI_HEDGE_PERCENTILE = _float_env("AI_HEDGE_PERCENTILE", 95.0)
+AI_HEDGE_DELAY      = _float_env("AI_HEDGE_DELAY", 2.0)       # секунд
+AI_HEDGE_MIN_DELAY  = _float_env("AI_HEDGE_MIN_DELAY", 0.2)   # секунд
+# Таймаут запроса = p95 задержки провайдера × AI_TIMEOUT_P95_FACTOR,
+# в пределах [AI_MIN_TIMEOUT, AI_TIMEOUT]; до набора статистики — AI_TIMEOUT
+AI_TIMEOUT_P95_FACTOR = _float_env("AI_TIMEOUT_P95_FACTOR", 3.0)
+AI_MIN_TIMEOUT        = _float_env("AI_MIN_TIMEOUT", 1.0)      # секунд
+AI_LATENCY_EWMA_ALPHA = _float_env("AI_LATENCY_EWMA_ALPHA", 0.2)
+# Предохранитель: провайдер отключается, если из последних AI_BREAKER_WINDOW
+# запросов (не меньше AI_BREAKER_MIN_CALLS) доля ошибок ≥ AI_BREAKER_ERROR_RATE;
+# через AI_BREAKER_COOLDOWN секунд пропускается один пробный запрос
+AI_BREAKER_WINDOW     = _int_env("AI_BREAKER_WINDOW", 20)
+AI_BREAKER_MIN_CALLS  = _int_env("AI_BREAKER_MIN_CALLS", 5)
+AI_BREAKER_ERROR_RATE = _float_env("AI_BREAKER_ERROR_RATE", 0.5)
+AI_BREAKER_COOLDOWN   = _float_env("AI_BREAKER_COOLDOWN", 30.0)  # секунд
+# Кэш объяснений по отпечатку промпта: память + (по желанию) таблица ai_explanations
+EXPLANATION_CACHE_SIZE    = _int_env("EXPLANATION_CACHE_SIZE", 5000)
+EXPLANATION_CACHE_TTL     = _float_env("EXPLANATION_CACHE_TTL", 0.0)   # секунд, 0 = без срока
+EXPLANATION_CACHE_PERSIST = _int_env("EXPLANATION_CACHE_PERSIST", 0)
+# Объяснение дописывается в сообщение с оценкой (edit_text) в фоне;
+# при AI_STREAMING=1 текст появляется по мере генерации, не чаще раза в
+# EXPLANATION_EDIT_INTERVAL секунд (лимиты Telegram на редактирование)
+AI_STREAMING              = _int_env("AI_STREAMING", 1)
+EXPLANATION_EDIT_INTERVAL = _float_env("EXPLANATION_EDIT_INTERVAL", 1.5)   # секунд
+EXPLANATION_MIN_SCORE     = _int_env("EXPLANATION_MIN_SCORE", 90)          # объяснять, если оценка ниже
 
 # ─── Validation weights ───────────────────────────────────────
 SEMANTIC_MODEL      = os.getenv("SEMANTIC_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 SEMANTIC_CACHE_SIZE = _int_env("SEMANTIC_CACHE_SIZE", 512)
+# lexical   — только rapidfuzz (по умолчанию)
+# embedding — ещё и эмбеддинги SEMANTIC_MODEL (нужен sentence-transformers)
+# hashing   — детерминированная заглушка без модели (тесты, бенчмарки)
+SEMANTIC_SCORER       = os.getenv("SEMANTIC_SCORER", "lexical").strip().lower()
+# Векторы эталонных ответов: <путь>.npy + <путь>.json, см. admin/build_reference_vectors.py
+SEMANTIC_VECTORS_PATH = os.getenv(
+    "SEMANTIC_VECTORS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reference_vectors")
+)
+SEMANTIC_COSINE_FLOOR = _float_env("SEMANTIC_COSINE_FLOOR", 0.3)   # косинус, который считается 0/100
 GRAMMAR_WEIGHT      = _float_env("GRAMMAR_WEIGHT",  0.50)
 SEMANTIC_WEIGHT     = _float_env("SEMANTIC_WEIGHT", 0.50)
+REFERENCE_INDEX_SIZE = _int_env("REFERENCE_INDEX_SIZE", 4096)   # фраз с готовыми признаками
+# Словарь типичных ошибок (wrong → right), см. admin/build_error_lexicon.py
+ERROR_LEXICON_PATH  = os.getenv(
+    "ERROR_LEXICON_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "error_lexicon.tsv")
+)
+
+# ─── LanguageTool ─────────────────────────────────────────────
+# Локально каждый экземпляр — отдельный JVM-сервер; с LANGUAGE_TOOL_URL
+# все клиенты ходят в один общий сервер.
+LANGUAGE_TOOL_URL             = os.getenv("LANGUAGE_TOOL_URL", "")
+LANGUAGE_TOOL_INSTANCES       = _int_env("LANGUAGE_TOOL_INSTANCES", 1)
+LANGUAGE_TOOL_ACQUIRE_TIMEOUT = _float_env("LANGUAGE_TOOL_ACQUIRE_TIMEOUT", 10.0)  # секунд
+LANGUAGE_TOOL_HEALTH_INTERVAL = _float_env("LANGUAGE_TOOL_HEALTH_INTERVAL", 60.0)  # секунд, 0 = выкл.
+# Ответы, пришедшие в пределах окна, проверяются одним документом
+GRAMMAR_BATCH_MAX_SIZE        = _int_env("GRAMMAR_BATCH_MAX_SIZE", 16)
+GRAMMAR_BATCH_MAX_WAIT_MS     = _float_env("GRAMMAR_BATCH_MAX_WAIT_MS", 5.0)    # 0 = без батчинга
+
+# ─── Checker execution ────────────────────────────────────────
+# thread  — проверка в потоке (по умолчанию)
+# process — пул прогретых процессов, масштабируется по ядрам
+CHECKER_EXECUTOR  = os.getenv("CHECKER_EXECUTOR", "thread").lower()
+CHECKER_PROCESSES = _int_env("CHECKER_PROCESSES", 0)   # 0 = по числу ядер
+
+# ─── Check result cache ───────────────────────────────────────
+# Повторный ответ на ту же фразу не проверяется заново: LRU в памяти,
+# за ним таблица check_results (RESULT_CACHE_PERSIST=0 — только память)
+RESULT_CACHE_SIZE    = _int_env("RESULT_CACHE_SIZE", 20000)
+RESULT_CACHE_PERSIST = _int_env("RESULT_CACHE_PERSIST", 1)
 
 # ─── Phrase storage ───────────────────────────────────────────
 PHRASE_SIMILARITY_THRESHOLD = _float_env("PHRASE_SIMILARITY_THRESHOLD", 75.0)
+PHRASE_CATALOG_TTL          = _float_env("PHRASE_CATALOG_TTL", 300.0)   # секунд
+
+# ─── User identity cache (telegram_id → users row) ───────────
+USER_CACHE_SIZE = _int_env("USER_CACHE_SIZE", 10000)
+USER_CACHE_TTL  = _float_env("USER_CACHE_TTL", 600.0)    # секунд
+
+# ─── Write-behind (пакетная запись scores / history) ─────────
+WRITE_BEHIND_FLUSH_MS  = _int_env("WRITE_BEHIND_FLUSH_MS", 200)
+WRITE_BEHIND_MAX_ROWS  = _int_env("WRITE_BEHIND_MAX_ROWS", 100)
 
 # ─── Anti-spam ────────────────────────────────────────────────
 ANTISPAM_WINDOW_SECONDS = _float_env("ANTISPAM_WINDOW_SECONDS", 2.0)
@@ -0,0 +1,146 @@
+"""
+In-process phrase catalog.
+
+Phrases only change when an admin imports new ones, so instead of pulling
+every row for a topic+level from Supabase on each "Next phrase" tap the bot
+keeps a compact copy per (topic_id, level) in memory. Each entry is loaded
+once and refreshed after PHRASE_CATALOG_TTL seconds; save_phrase()
+invalidates the affected entry immediately.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from array import array
+from collections.abc import Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogPhrase:
+    __slots__ = ("id", "text_ru", "text_uz", "english_answer", "alternative_answers", "level")
+
+    def __init__(
+        self,
+        id: int,
+        text_ru: str,
+        text_uz: str,
+        english_answer: str,
+        alternative_answers: tuple[str, ...],
+        level: str,
+    ):
+        self.id = id
+        self.text_ru = text_ru
+        self.text_uz = text_uz
+        self.english_answer = english_answer
+        self.alternative_answers = alternative_answers
+        self.level = level
+
+    @classmethod
+    def from_row(cls, row: dict) -> "CatalogPhrase":
+        return cls(
+            id=int(row["id"]),
+            text_ru=row.get("text_ru") or "",
+            text_uz=row.get("text_uz") or "",
+            english_answer=row.get("english_answer") or "",
+            alternative_answers=tuple(row.get("alternative_answers") or ()),
+            level=row.get("level") or "",
+        )
+
+    def as_dict(self) -> dict:
+        """Row shape returned by the DB layer (same keys as a phrases select)."""
+        return {
+            "id": self.id,
+            "text_ru": self.text_ru,
+            "text_uz": self.text_uz,
+            "english_answer": self.english_answer,
+            "alternative_answers": list(self.alternative_answers),
+            "level": self.level,
+        }
+
+
+class CatalogEntry:
+    """All phrases of one topic+level: ids in a flat array, records in a tuple."""
+
+    __slots__ = ("ids", "phrases", "_positions", "loaded_at")
+
+    def __init__(self, phrases: Iterable[CatalogPhrase], loaded_at: float):
+        self.phrases = tuple(phrases)
+        self.ids = array("q", (p.id for p in self.phrases))
+        self._positions = {pid: pos for pos, pid in enumerate(self.ids)}
+        self.loaded_at = loaded_at
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, phrase_id: int) -> CatalogPhrase | None:
+        pos = self._positions.get(phrase_id)
+        return None if pos is None else self.phrases[pos]
+
+    def pick_unseen(self, seen_ids: set[int]) -> CatalogPhrase | None:
+        """Random phrase whose id is not in seen_ids, or None if all were seen."""
+        unseen = [pos for pos, pid in enumerate(self.ids) if pid not in seen_ids]
+        if not unseen:
+            return None
+        return self.phrases[random.choice(unseen)]
+
+
+class PhraseCatalog:
+    def __init__(
+        self,
+        loader: Callable[[int, str], Awaitable[list[dict]]],
+        ttl: float,
+    ):
+        self._loader = loader
+        self._ttl = ttl
+        self._entries: dict[tuple[int, str], CatalogEntry] = {}
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+    async def get(self, topic_id: int, level: str) -> CatalogEntry:
+        key = (topic_id, level)
+        entry = self._entries.get(key)
+        if entry is not None and not self._is_stale(entry):
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another task may have refreshed the entry while we waited.
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_stale(entry):
+                return entry
+            try:
+                rows = await self._loader(topic_id, level)
+            except Exception as e:
+                if entry is None:
+                    raise
+                logger.warning(
+                    "Phrase catalog refresh failed for topic %s, level %s; serving stale copy: %s",
+                    topic_id, level, e,
+                )
+                return entry
+
+            entry = CatalogEntry(
+                (CatalogPhrase.from_row(row) for row in rows),
+                loaded_at=time.monotonic(),
+            )
+            self._entries[key] = entry
+            return entry
+
+    def invalidate(self, topic_id: int | None = None, level: str | None = None) -> None:
+        """Drop cached entries; with no arguments the whole catalog is cleared."""
+        if topic_id is None:
+            self._entries.clear()
+            return
+        for key in list(self._entries):
+            if key[0] == topic_id and (level is None or key[1] == level):
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "phrases": sum(len(entry) for entry in self._entries.values()),
+        }
+
+    def _is_stale(self, entry: CatalogEntry) -> bool:
+        return time.monotonic() - entry.loaded_at >= self._ttl
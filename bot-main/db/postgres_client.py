@@ -0,0 +1,410 @@
+"""
+Direct Postgres access layer (DB_BACKEND=postgres).
+
+Same function surface as db/supabase_client.py, but talks to Postgres
+natively through an asyncpg connection pool instead of PostgREST plus a
+worker thread per query. asyncpg prepares every statement once per pooled
+connection and reuses it by query text, so the hot queries below (user
+lookup, phrase selection, score insert, stats) run as prepared statements.
+Set DB_STATEMENT_CACHE_SIZE=0 when connecting through PgBouncer in
+transaction mode.
+
+Requires db/schema.sql to be applied (pick_unseen_phrase is used directly).
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from config import (
+    DATABASE_URL,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    LEVELS_FALLBACK,
+    PHRASE_CATALOG_TTL,
+    PHRASE_SIMILARITY_THRESHOLD,
+    WRITE_BEHIND_FLUSH_MS,
+    WRITE_BEHIND_MAX_ROWS,
+)
+from db.phrase_catalog import PhraseCatalog
+from db.write_behind import WriteBehindQueue
+from utils.text import phrase_key, phrase_similarity
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock: asyncio.Lock | None = None
+
+# ─── Simple in-memory cache for levels ───────────────────────
+_levels_cache: dict[str, str] | None = None
+_levels_cache_ts: float = 0.0
+_LEVELS_TTL = 600  # 10 минут
+
+# ─── Hot queries ─────────────────────────────────────────────
+_SQL_SELECT_USER = """
+    SELECT id, telegram_id, username FROM users WHERE telegram_id = $1
+"""
+_SQL_UPSERT_USER = """
+    INSERT INTO users (telegram_id, username) VALUES ($1, COALESCE($2, ''))
+    ON CONFLICT (telegram_id) DO UPDATE
+        SET username = COALESCE(NULLIF(EXCLUDED.username, ''), users.username)
+    RETURNING id, telegram_id, username
+"""
+_SQL_PICK_UNSEEN_PHRASE = """
+    SELECT phrase_id FROM pick_unseen_phrase($1, $2, $3)
+"""
+_SQL_USER_STATS = """
+    SELECT total, score_sum, best FROM user_stats WHERE user_id = $1
+"""
+_SQL_CHECK_RESULT = """
+    SELECT result FROM check_results
+    WHERE phrase_id = $1 AND answer_key = $2 AND level = $3 AND checker_version = $4
+"""
+_PHRASE_COLUMNS = "id, text_ru, text_uz, english_answer, alternative_answers, level"
+
+
+async def _init_connection(conn) -> None:
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+async def get_pool(dsn: str | None = None):
+    """Create the asyncpg pool on first use (dsn overrides DATABASE_URL)."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            import asyncpg
+
+            _pool = await asyncpg.create_pool(
+                dsn or DATABASE_URL,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                init=_init_connection,
+            )
+    return _pool
+
+
+async def close_db() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+
+
+async def _fetch(sql: str, *args) -> list[dict]:
+    pool = await get_pool()
+    rows = await pool.fetch(sql, *args)
+    return [dict(row) for row in rows]
+
+
+async def _fetchrow(sql: str, *args) -> dict | None:
+    pool = await get_pool()
+    row = await pool.fetchrow(sql, *args)
+    return dict(row) if row is not None else None
+
+
+def _normalize_phrase_row(row: dict, alternative_answers: list[str] | None = None) -> dict:
+    if row.get("alternative_answers") is None:
+        row["alternative_answers"] = alternative_answers or []
+    return row
+
+
+async def _bulk_insert(table: str, rows: list[dict], on_conflict: str | None) -> None:
+    """
+    One multi-row INSERT per batch, so statement-level triggers on scores
+    fire once. Rows travel as a single jsonb array and take the column
+    types of the table itself.
+    """
+    columns = ", ".join(rows[0])
+    sql = (
+        f"INSERT INTO {table} ({columns}) "
+        f"SELECT {columns} FROM jsonb_populate_recordset(NULL::{table}, $1::jsonb)"
+    )
+    if on_conflict:
+        sql += f" ON CONFLICT ({on_conflict}) DO NOTHING"
+
+    pool = await get_pool()
+    await pool.execute(sql, rows)
+
+
+# Scores и история просмотров пишутся пакетами в фоне (см. db/write_behind.py)
+write_queue = WriteBehindQueue(
+    _bulk_insert,
+    flush_interval=WRITE_BEHIND_FLUSH_MS / 1000,
+    max_rows=WRITE_BEHIND_MAX_ROWS,
+)
+
+
+# ─── Levels ───────────────────────────────────────────────────
+
+async def get_levels() -> dict[str, str]:
+    """Return {code: description} from DB, with in-memory TTL cache.
+    Falls back to LEVELS_FALLBACK if DB is unavailable."""
+    global _levels_cache, _levels_cache_ts
+
+    now = time.monotonic()
+    if _levels_cache is not None and (now - _levels_cache_ts) < _LEVELS_TTL:
+        return _levels_cache
+
+    try:
+        rows = await _fetch(
+            "SELECT code, name_en, description FROM levels "
+            "WHERE is_active ORDER BY sort_order"
+        )
+        if rows:
+            result = {r["code"]: f"{r['name_en']} — {r['description']}" for r in rows}
+            _levels_cache = result
+            _levels_cache_ts = now
+            return result
+    except Exception:
+        pass
+
+    return LEVELS_FALLBACK
+
+
+async def get_level_codes() -> list[str]:
+    """Return ordered list of active level codes (e.g. ['A2','B1','B2','C1'])."""
+    levels = await get_levels()
+    return list(levels.keys())
+
+
+# ─── Users ────────────────────────────────────────────────────
+
+async def get_or_create_user(telegram_id: int, username: str | None) -> dict:
+    """
+    An existing user costs one select; the upsert (a new row version) runs
+    only for a new user or a changed username. A None username keeps the
+    stored one.
+    """
+    row = await _fetchrow(_SQL_SELECT_USER, telegram_id)
+    if row is not None and (not username or row["username"] == username):
+        return row
+    return await _fetchrow(_SQL_UPSERT_USER, telegram_id, username)
+
+
+# ─── Topics ───────────────────────────────────────────────────
+
+async def get_topics() -> list[dict]:
+    return await _fetch(
+        "SELECT id, name_ru, name_uz, emoji FROM topics WHERE is_active ORDER BY name_ru"
+    )
+
+
+async def get_topic_by_id(topic_id: int) -> dict | None:
+    return await _fetchrow(
+        "SELECT id, name_ru, name_uz, emoji FROM topics WHERE id = $1", topic_id
+    )
+
+
+# ─── Phrases ──────────────────────────────────────────────────
+
+async def save_phrase(
+    topic_id: int,
+    text_ru: str,
+    text_uz: str,
+    english_answer: str,
+    level: str,
+    alternative_answers: list[str] | None = None,
+) -> dict:
+    key = phrase_key(english_answer)
+
+    candidates = await _fetch(
+        f"SELECT {_PHRASE_COLUMNS} FROM phrases WHERE topic_id = $1 AND level = $2 LIMIT 100",
+        topic_id, level,
+    )
+    for candidate in candidates:
+        if phrase_similarity(english_answer, candidate["english_answer"]) >= PHRASE_SIMILARITY_THRESHOLD:
+            return _normalize_phrase_row(candidate, alternative_answers)
+
+    phrase = await _fetchrow(
+        f"""
+        INSERT INTO phrases
+            (topic_id, text_ru, text_uz, english_answer, alternative_answers, phrase_key, level)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        ON CONFLICT (topic_id, level, phrase_key) WHERE phrase_key IS NOT NULL DO NOTHING
+        RETURNING {_PHRASE_COLUMNS}
+        """,
+        topic_id, text_ru, text_uz, english_answer, alternative_answers or [], key, level,
+    )
+    if phrase is None:
+        phrase = await _fetchrow(
+            f"SELECT {_PHRASE_COLUMNS} FROM phrases "
+            "WHERE topic_id = $1 AND level = $2 AND phrase_key = $3 LIMIT 1",
+            topic_id, level, key,
+        )
+
+    _phrase_catalog.invalidate(topic_id, level)
+    return _normalize_phrase_row(phrase, alternative_answers)
+
+
+async def get_recent_phrase_answers(
+    topic_id: int,
+    level: str,
+    limit: int = 25,
+) -> list[str]:
+    rows = await _fetch(
+        "SELECT english_answer FROM phrases WHERE topic_id = $1 AND level = $2 "
+        "ORDER BY created_at DESC LIMIT $3",
+        topic_id, level, limit,
+    )
+    return [row["english_answer"] for row in rows if row.get("english_answer")]
+
+
+# ─── Unique phrase (без повторов) ────────────────────────────
+
+async def mark_phrase_seen(user_id: int, phrase_id: int, topic_id: int, level: str) -> None:
+    """Записываем факт просмотра фразы пользователем (пакетно, в фоне)."""
+    write_queue.enqueue(
+        "user_phrase_history",
+        {
+            "user_id": user_id,
+            "phrase_id": phrase_id,
+            "topic_id": topic_id,
+            "level": level,
+        },
+        on_conflict="user_id, phrase_id",
+    )
+
+
+async def _load_catalog_rows(topic_id: int, level: str) -> list[dict]:
+    return await _fetch(
+        f"SELECT {_PHRASE_COLUMNS} FROM phrases WHERE topic_id = $1 AND level = $2",
+        topic_id, level,
+    )
+
+
+_phrase_catalog = PhraseCatalog(_load_catalog_rows, ttl=PHRASE_CATALOG_TTL)
+
+
+async def get_unique_phrase(user_id: int, topic_id: int, level: str) -> dict | None:
+    """
+    Возвращает случайную фразу, которую пользователь ещё не видел,
+    и сразу отмечает её как просмотренную (SQL-функция pick_unseen_phrase).
+    Возвращает None если фраз вообще нет.
+    """
+    catalog = await _phrase_catalog.get(topic_id, level)
+    if not catalog:
+        return None
+
+    for _ in range(2):
+        row = await _fetchrow(_SQL_PICK_UNSEEN_PHRASE, user_id, topic_id, level)
+        if row is None or row["phrase_id"] is None:
+            return None
+        phrase = await _picked_phrase(row["phrase_id"], topic_id, level, catalog)
+        if phrase is not None:
+            return phrase
+        # Фразу удалили между выбором и чтением — выбираем ещё раз
+        logger.warning("Picked phrase %s no longer exists, picking again", row["phrase_id"])
+    return None
+
+
+async def _picked_phrase(phrase_id: int, topic_id: int, level: str, catalog) -> dict | None:
+    """Фраза по id из каталога; если её там нет — из обновлённого каталога или одной строкой из БД."""
+    phrase = catalog.get(phrase_id)
+    if phrase is None:
+        # Фраза добавлена после загрузки каталога
+        _phrase_catalog.invalidate(topic_id, level)
+        phrase = (await _phrase_catalog.get(topic_id, level)).get(phrase_id)
+    if phrase is not None:
+        return phrase.as_dict()
+    # Обновление каталога могло не удаться (отдаётся старая копия)
+    row = await _fetchrow(f"SELECT {_PHRASE_COLUMNS} FROM phrases WHERE id = $1", phrase_id)
+    return _normalize_phrase_row(row) if row is not None else None
+
+
+# ─── Check results (кэш проверок, см. services/result_cache.py) ─
+
+async def get_check_result(phrase_id: int, answer_key: str, level: str, checker_version: str) -> dict | None:
+    row = await _fetchrow(_SQL_CHECK_RESULT, phrase_id, answer_key, level, checker_version)
+    return row["result"] if row else None
+
+
+async def save_check_result(
+    phrase_id: int,
+    answer_key: str,
+    level: str,
+    checker_version: str,
+    result: dict,
+) -> None:
+    write_queue.enqueue(
+        "check_results",
+        {
+            "phrase_id": phrase_id,
+            "answer_key": answer_key,
+            "level": level,
+            "checker_version": checker_version,
+            "result": result,
+        },
+        on_conflict="phrase_id, answer_key, level, checker_version",
+    )
+
+
+# ─── AI explanations (кэш, см. services/ai_explainer.py) ─────
+
+async def get_explanation(prompt_hash: str) -> str | None:
+    row = await _fetchrow("SELECT explanation FROM ai_explanations WHERE prompt_hash = $1", prompt_hash)
+    return row["explanation"] if row else None
+
+
+async def save_explanation(prompt_hash: str, explanation: str) -> None:
+    write_queue.enqueue(
+        "ai_explanations",
+        {"prompt_hash": prompt_hash, "explanation": explanation},
+        on_conflict="prompt_hash",
+    )
+
+
+# ─── Scores ───────────────────────────────────────────────────
+
+async def save_score(
+    user_id: int,
+    phrase_id: int | None,
+    user_answer: str,
+    score: int,
+    errors: list[str],
+    feedback: str,
+) -> dict:
+    """Queue a score row for the write-behind flusher and return it."""
+    row = {
+        "user_id": user_id,
+        "phrase_id": phrase_id,
+        "user_answer": user_answer,
+        "score": score,
+        "errors_json": errors,
+        "feedback": feedback,
+    }
+    write_queue.enqueue("scores", row)
+    return row
+
+
+async def get_user_stats(user_id: int) -> dict:
+    """O(1) read of the user_stats rollup maintained by a trigger on scores."""
+    row = await _fetchrow(_SQL_USER_STATS, user_id)
+    if not row or not row["total"]:
+        return {"total": 0, "avg": 0, "best": 0}
+    return {
+        "total": row["total"],
+        "avg": round(row["score_sum"] / row["total"], 1),
+        "best": row["best"],
+    }
+
+
+async def get_user_daily_stats(user_id: int) -> list[dict]:
+    """Daily (topic, level, day) buckets of the user's answers, oldest first."""
+    return await _fetch(
+        "SELECT topic_id, level, day, attempts, score_sum, score_min, score_max, low_count "
+        "FROM user_daily_stats WHERE user_id = $1 ORDER BY day",
+        user_id,
+    )
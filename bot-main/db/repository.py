@@ -0,0 +1,101 @@
+"""
+Data layer entry point.
+
+Handlers and services import DB functions from here. DB_BACKEND selects
+the implementation; both modules expose the same function surface:
+
+  supabase — PostgREST via supabase-py (default)
+  postgres — asyncpg connection pool on DATABASE_URL
+
+get_or_create_user is wrapped with a bounded TTL/LRU identity cache so
+practice interactions skip the users round trip.
+"""
+
+from config import DB_BACKEND, USER_CACHE_SIZE, USER_CACHE_TTL
+from utils.cache import SingleFlight, TTLCache
+
+if DB_BACKEND == "postgres":
+    from db.postgres_client import (
+        close_db,
+        get_check_result,
+        get_explanation,
+        get_level_codes,
+        get_levels,
+        get_or_create_user as _upsert_user,
+        get_recent_phrase_answers,
+        get_topic_by_id,
+        get_topics,
+        get_unique_phrase,
+        get_user_daily_stats,
+        get_user_stats,
+        mark_phrase_seen,
+        save_check_result,
+        save_explanation,
+        save_phrase,
+        save_score,
+        write_queue,
+    )
+else:
+    from db.supabase_client import (
+        close_db,
+        get_check_result,
+        get_explanation,
+        get_level_codes,
+        get_levels,
+        get_or_create_user as _upsert_user,
+        get_recent_phrase_answers,
+        get_topic_by_id,
+        get_topics,
+        get_unique_phrase,
+        get_user_daily_stats,
+        get_user_stats,
+        mark_phrase_seen,
+        save_check_result,
+        save_explanation,
+        save_phrase,
+        save_score,
+        write_queue,
+    )
+
+__all__ = [
+    "close_db",
+    "get_check_result",
+    "get_explanation",
+    "get_level_codes",
+    "get_levels",
+    "get_or_create_user",
+    "get_recent_phrase_answers",
+    "get_topic_by_id",
+    "get_topics",
+    "get_unique_phrase",
+    "get_user_daily_stats",
+    "get_user_stats",
+    "mark_phrase_seen",
+    "save_check_result",
+    "save_explanation",
+    "save_phrase",
+    "save_score",
+    "user_cache_stats",
+    "write_queue",
+]
+
+
+# ─── Users ────────────────────────────────────────────────────
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_user_flights = SingleFlight()
+
+
+async def get_or_create_user(telegram_id: int, username: str | None) -> dict:
+    """Cached users row for telegram_id; concurrent misses share one upsert."""
+    user = _user_cache.get(telegram_id)
+    if user is not None:
+        return user
+
+    user = await _user_flights.do(telegram_id, lambda: _upsert_user(telegram_id, username))
+    _user_cache.set(telegram_id, user)
+    return user
+
+
+def user_cache_stats() -> dict:
+    return {**_user_cache.stats(), "singleflight_shared": _user_flights.shared}
@@ -82,6 +82,35 @@ CREATE TABLE IF NOT EXISTS scores (
     created_at  TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- ─── USER STATS (rollup по scores) ──────────────────────────
+-- Итоги по пользователю для /stats; обновляются триггером на INSERT в scores,
+-- поэтому чтение — одна строка вместо полного скана scores.
+-- Для уже существующих данных: SELECT * FROM backfill_user_stats();
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id    INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total      INT    NOT NULL DEFAULT 0,
+    score_sum  BIGINT NOT NULL DEFAULT 0,
+    best       INT    NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ─── USER DAILY STATS (дневные корзины по теме и уровню) ─────
+-- Разбивка /stats по темам, уровням и дням. Строк столько, сколько у
+-- пользователя активных дней×тем×уровней, а не ответов. Ответы без фразы
+-- попадают в topic_id = 0, level = ''. День считается по UTC.
+CREATE TABLE IF NOT EXISTS user_daily_stats (
+    user_id   INT  NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    topic_id  INT  NOT NULL,
+    level     TEXT NOT NULL,
+    day       DATE NOT NULL,
+    attempts  INT    NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_min INT    NOT NULL,
+    score_max INT    NOT NULL,
+    low_count INT    NOT NULL DEFAULT 0,   -- ответы с баллом < 70
+    PRIMARY KEY (user_id, topic_id, level, day)
+);
+
 -- ─── USER PHRASE HISTORY (уникальные фразы без повторов) ─────
 -- Хранит какие фразы пользователь уже видел в разрезе topic+level.
 -- Когда все фразы пройдены — история сбрасывается (бот начинает заново).
@@ -94,6 +123,31 @@ CREATE TABLE IF NOT EXISTS user_phrase_history (
     seen_at   TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- ─── CHECK RESULTS (кэш результатов проверки) ────────────────
+-- Второй уровень services/result_cache.py: одинаковый ответ на ту же фразу
+-- не проверяется повторно. checker_version меняется вместе с логикой
+-- проверки, поэтому старые строки просто перестают совпадать; удалять их
+-- можно в любой момент:
+--   DELETE FROM check_results WHERE created_at < NOW() - INTERVAL '30 days';
+CREATE TABLE IF NOT EXISTS check_results (
+    phrase_id       INT   NOT NULL REFERENCES phrases(id) ON DELETE CASCADE,
+    answer_key      TEXT  NOT NULL,
+    level           TEXT  NOT NULL,
+    checker_version TEXT  NOT NULL,
+    result          JSONB NOT NULL,
+    created_at      TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (phrase_id, answer_key, level, checker_version)
+);
+
+-- ─── AI EXPLANATIONS (кэш объяснений, EXPLANATION_CACHE_PERSIST=1) ─
+-- Ключ — отпечаток промпта (services/ai_explainer.prompt_fingerprint):
+-- одна и та же ошибка в той же фразе объясняется один раз.
+CREATE TABLE IF NOT EXISTS ai_explanations (
+    prompt_hash TEXT PRIMARY KEY,
+    explanation TEXT NOT NULL,
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- ─── INDEXES ─────────────────────────────────────────────────
 CREATE INDEX IF NOT EXISTS idx_phrases_topic_level
     ON phrases(topic_id, level);
@@ -116,6 +170,189 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_uph_user_phrase
 CREATE INDEX IF NOT EXISTS idx_uph_user_topic_level
     ON user_phrase_history(user_id, topic_id, level);
 
+-- ─── FUNCTIONS ───────────────────────────────────────────────
+-- Выбор случайной непросмотренной фразы за один вызов (RPC):
+-- ищет фразу через NOT EXISTS по idx_uph_user_topic_level, сразу отмечает
+-- её как просмотренную, а когда цикл пройден — сбрасывает историю.
+-- Advisory lock сериализует одновременные нажатия одного пользователя.
+CREATE OR REPLACE FUNCTION pick_unseen_phrase(
+    p_user_id  INT,
+    p_topic_id INT,
+    p_level    TEXT
+)
+RETURNS TABLE (phrase_id INT)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_phrase_id INT;
+BEGIN
+    PERFORM pg_advisory_xact_lock(p_user_id, hashtext(p_topic_id::TEXT || ':' || p_level));
+
+    SELECT p.id INTO v_phrase_id
+    FROM phrases p
+    WHERE p.topic_id = p_topic_id
+      AND p.level    = p_level
+      AND NOT EXISTS (
+          SELECT 1
+          FROM user_phrase_history h
+          WHERE h.user_id   = p_user_id
+            AND h.topic_id  = p_topic_id
+            AND h.level     = p_level
+            AND h.phrase_id = p.id
+      )
+    ORDER BY random()
+    LIMIT 1;
+
+    IF v_phrase_id IS NULL THEN
+        DELETE FROM user_phrase_history
+        WHERE user_id  = p_user_id
+          AND topic_id = p_topic_id
+          AND level    = p_level;
+
+        SELECT p.id INTO v_phrase_id
+        FROM phrases p
+        WHERE p.topic_id = p_topic_id
+          AND p.level    = p_level
+        ORDER BY random()
+        LIMIT 1;
+
+        IF v_phrase_id IS NULL THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    INSERT INTO user_phrase_history (user_id, phrase_id, topic_id, level)
+    VALUES (p_user_id, v_phrase_id, p_topic_id, p_level)
+    ON CONFLICT (user_id, phrase_id) DO NOTHING;
+
+    phrase_id := v_phrase_id;
+    RETURN NEXT;
+END;
+$$;
+
+-- ─── STATS ROLLUP ────────────────────────────────────────────
+-- Statement-level триггер: пакетная вставка scores (write-behind)
+-- обновляет user_stats одним INSERT ... ON CONFLICT на пакет.
+CREATE OR REPLACE FUNCTION scores_rollup_user_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO user_stats AS s (user_id, total, score_sum, best, updated_at)
+    SELECT user_id, count(*), sum(score), max(score), NOW()
+    FROM new_scores
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+        SET total      = s.total + EXCLUDED.total,
+            score_sum  = s.score_sum + EXCLUDED.score_sum,
+            best       = GREATEST(s.best, EXCLUDED.best),
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_scores_user_stats ON scores;
+CREATE TRIGGER trg_scores_user_stats
+    AFTER INSERT ON scores
+    REFERENCING NEW TABLE AS new_scores
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION scores_rollup_user_stats();
+
+CREATE OR REPLACE FUNCTION scores_rollup_daily_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO user_daily_stats AS d
+        (user_id, topic_id, level, day, attempts, score_sum, score_min, score_max, low_count)
+    SELECT n.user_id,
+           COALESCE(p.topic_id, 0),
+           COALESCE(p.level, ''),
+           (n.created_at AT TIME ZONE 'UTC')::DATE,
+           count(*),
+           sum(n.score),
+           min(n.score),
+           max(n.score),
+           count(*) FILTER (WHERE n.score < 70)
+    FROM new_scores n
+    LEFT JOIN phrases p ON p.id = n.phrase_id
+    WHERE n.user_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, topic_id, level, day) DO UPDATE
+        SET attempts  = d.attempts + EXCLUDED.attempts,
+            score_sum = d.score_sum + EXCLUDED.score_sum,
+            score_min = LEAST(d.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(d.score_max, EXCLUDED.score_max),
+            low_count = d.low_count + EXCLUDED.low_count;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_scores_daily_stats ON scores;
+CREATE TRIGGER trg_scores_daily_stats
+    AFTER INSERT ON scores
+    REFERENCING NEW TABLE AS new_scores
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION scores_rollup_daily_stats();
+
+-- Пересчёт user_stats из scores (первый запуск или после ручных правок).
+-- Блокирует вставку в scores на время пересчёта.
+CREATE OR REPLACE FUNCTION backfill_user_stats()
+RETURNS TABLE (users_updated INT)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    LOCK TABLE scores IN SHARE MODE;
+
+    INSERT INTO user_stats (user_id, total, score_sum, best, updated_at)
+    SELECT user_id, count(*), sum(score), max(score), NOW()
+    FROM scores
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+        SET total      = EXCLUDED.total,
+            score_sum  = EXCLUDED.score_sum,
+            best       = EXCLUDED.best,
+            updated_at = NOW();
+
+    GET DIAGNOSTICS users_updated = ROW_COUNT;
+    RETURN NEXT;
+END;
+$$;
+
+-- Пересчёт user_daily_stats из scores (полная перестройка корзин).
+CREATE OR REPLACE FUNCTION backfill_user_daily_stats()
+RETURNS TABLE (buckets_written INT)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    LOCK TABLE scores IN SHARE MODE;
+
+    TRUNCATE user_daily_stats;
+
+    INSERT INTO user_daily_stats
+        (user_id, topic_id, level, day, attempts, score_sum, score_min, score_max, low_count)
+    SELECT s.user_id,
+           COALESCE(p.topic_id, 0),
+           COALESCE(p.level, ''),
+           (s.created_at AT TIME ZONE 'UTC')::DATE,
+           count(*),
+           sum(s.score),
+           min(s.score),
+           max(s.score),
+           count(*) FILTER (WHERE s.score < 70)
+    FROM scores s
+    LEFT JOIN phrases p ON p.id = s.phrase_id
+    WHERE s.user_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS buckets_written = ROW_COUNT;
+    RETURN NEXT;
+END;
+$$;
+
 -- ─── SEED TOPICS ─────────────────────────────────────────────
 INSERT INTO topics (name_ru, name_uz, emoji) VALUES
     ('Семья',           'Oila',              '👨‍👩‍👧'),
@@ -1,27 +1,54 @@
 """
 Supabase access layer.
 
-The official Supabase client is synchronous, so every database call is
-wrapped with asyncio.to_thread to avoid blocking aiogram's event loop.
+By default every query goes through one shared async PostgREST client:
+a single httpx.AsyncClient with HTTP/2, keep-alive and tuned pool limits,
+so concurrent handlers reuse warm connections instead of each borrowing a
+worker thread. SUPABASE_HTTP_MODE=sync switches back to the official
+synchronous Supabase client wrapped with asyncio.to_thread.
+
+Query code builds a PostgREST request with a `build(db)` callback and
+hands it to _execute(), which runs it in whichever mode is configured.
 """
 
 import asyncio
-import random
-import re
+import logging
 import time
-from typing import Optional
+from collections.abc import Callable
+from datetime import date
 
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.types import ReturnMethod
 from supabase import Client, create_client
 
 from config import (
     LEVELS_FALLBACK,
+    PHRASE_CATALOG_TTL,
     PHRASE_SIMILARITY_THRESHOLD,
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+    SUPABASE_HTTP_MAX_CONNECTIONS,
+    SUPABASE_HTTP_MAX_KEEPALIVE,
+    SUPABASE_HTTP_MODE,
+    SUPABASE_HTTP_TIMEOUT,
     SUPABASE_KEY,
     SUPABASE_SERVICE_ROLE_KEY,
     SUPABASE_URL,
+    WRITE_BEHIND_FLUSH_MS,
+    WRITE_BEHIND_MAX_ROWS,
 )
+from db.phrase_catalog import PhraseCatalog
+from db.write_behind import WriteBehindQueue
+from utils.text import phrase_key, phrase_similarity
+
+logger = logging.getLogger(__name__)
 
 _client: Client | None = None
+_async_client: AsyncPostgrestClient | None = None
+# httpcore rescans its whole wait queue and every pooled connection on each
+# release, so requests beyond the pool size wait here instead of in httpx.
+# Created with the async client, inside the running event loop.
+_in_flight: asyncio.Semaphore | None = None
 
 # ─── Simple in-memory cache for levels ───────────────────────
 _levels_cache: dict[str, str] | None = None
@@ -29,46 +56,91 @@ _levels_cache_ts: float = 0.0
 _LEVELS_TTL = 600  # 10 минут
 
 
+def _api_key() -> str:
+    return SUPABASE_SERVICE_ROLE_KEY or SUPABASE_KEY
+
+
 def get_client() -> Client:
+    """Synchronous Supabase client (SUPABASE_HTTP_MODE=sync)."""
     global _client
     if _client is None:
-        key = SUPABASE_SERVICE_ROLE_KEY or SUPABASE_KEY
-        _client = create_client(SUPABASE_URL, key)
+        _client = create_client(SUPABASE_URL, _api_key())
     return _client
 
 
-async def _run_db(fn):
-    return await asyncio.to_thread(fn)
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose httpx session uses our pool limits."""
+
+    def create_session(self, base_url, headers, timeout, verify=True) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
 
 
-# ─── Helpers ──────────────────────────────────────────────────
+def get_async_client() -> AsyncPostgrestClient:
+    """Shared async PostgREST client (SUPABASE_HTTP_MODE=async, default)."""
+    global _async_client, _in_flight
+    if _async_client is None:
+        _in_flight = asyncio.Semaphore(SUPABASE_HTTP_MAX_CONNECTIONS)
+        key = _api_key()
+        _async_client = _PooledPostgrestClient(
+            f"{SUPABASE_URL}/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=SUPABASE_HTTP_TIMEOUT,
+        )
+    return _async_client
+
+
+async def _execute(build: Callable):
+    """Run build(db).execute() on the configured client and return the response."""
+    if SUPABASE_HTTP_MODE == "sync":
+        return await asyncio.to_thread(lambda: build(get_client()).execute())
+    client = get_async_client()
+    async with _in_flight:
+        return await build(client).execute()
+
+
+async def close_db() -> None:
+    global _async_client, _in_flight
+    client, _async_client = _async_client, None
+    _in_flight = None
+    if client is not None:
+        await client.aclose()
+
+
+async def _bulk_insert(table: str, rows: list[dict], on_conflict: str | None) -> None:
+    def build(db):
+        if on_conflict:
+            return db.table(table).upsert(
+                rows,
+                on_conflict=on_conflict,
+                ignore_duplicates=True,
+                returning=ReturnMethod.minimal,
+            )
+        return db.table(table).insert(rows, returning=ReturnMethod.minimal)
 
-def _phrase_key(text: str) -> str:
-    value = text.lower()
-    value = re.sub(r"[^a-z0-9\s']", " ", value)
-    return re.sub(r"\s+", " ", value).strip()
+    await _execute(build)
 
 
-def _similarity(left: str, right: str) -> float:
-    try:
-        from rapidfuzz import fuzz
-
-        left_key = _phrase_key(left)
-        right_key = _phrase_key(right)
-        return float(
-            max(
-                fuzz.token_set_ratio(left_key, right_key),
-                fuzz.token_sort_ratio(left_key, right_key),
-                fuzz.partial_ratio(left_key, right_key),
-            )
-        )
-    except Exception:
-        left_words = set(_phrase_key(left).split())
-        right_words = set(_phrase_key(right).split())
-        if not left_words or not right_words:
-            return 0.0
-        return 100.0 * len(left_words & right_words) / len(left_words | right_words)
+# Scores и история просмотров пишутся пакетами в фоне (см. db/write_behind.py)
+write_queue = WriteBehindQueue(
+    _bulk_insert,
+    flush_interval=WRITE_BEHIND_FLUSH_MS / 1000,
+    max_rows=WRITE_BEHIND_MAX_ROWS,
+)
+
 
+# ─── Helpers ──────────────────────────────────────────────────
 
 def _normalize_phrase_row(row: dict, alternative_answers: list[str] | None = None) -> dict:
     row.setdefault("alternative_answers", alternative_answers or [])
@@ -86,19 +158,14 @@ async def get_levels() -> dict[str, str]:
     if _levels_cache is not None and (now - _levels_cache_ts) < _LEVELS_TTL:
         return _levels_cache
 
-    def query():
-        res = (
-            get_client()
-            .table("levels")
+    try:
+        res = await _execute(
+            lambda db: db.table("levels")
             .select("code, name_en, description")
             .eq("is_active", True)
             .order("sort_order")
-            .execute()
         )
-        return res.data or []
-
-    try:
-        rows = await _run_db(query)
+        rows = res.data or []
         if rows:
             result = {r["code"]: f"{r['name_en']} — {r['description']}" for r in rows}
             _levels_cache = result
@@ -119,62 +186,69 @@ async def get_level_codes() -> list[str]:
 # ─── Users ────────────────────────────────────────────────────
 
 async def get_or_create_user(telegram_id: int, username: str | None) -> dict:
-    def query():
-        db = get_client()
-        res = (
-            db.table("users")
-            .select("id, telegram_id, username")
-            .eq("telegram_id", telegram_id)
-            .limit(1)
-            .execute()
+    """
+    An existing user costs one select; a write happens only for a new user
+    or a changed username. As in postgres_client, a new user without a
+    username gets "" and a None/empty username never overwrites a stored one.
+    """
+    row = await _select_user(telegram_id)
+    if row is None:
+        # ignore_duplicates: a concurrent first message may insert the same user
+        res = await _execute(
+            lambda db: db.table("users").upsert(
+                {"telegram_id": telegram_id, "username": username or ""},
+                on_conflict="telegram_id",
+                ignore_duplicates=True,
+            )
         )
-        if res.data:
-            return res.data[0]
-        new = (
-            db.table("users")
-            .insert({"telegram_id": telegram_id, "username": username or ""})
-            .execute()
+        row = res.data[0] if res.data else await _select_user(telegram_id)
+    elif username and row.get("username") != username:
+        await _execute(
+            lambda db: db.table("users")
+            .update({"username": username}, returning=ReturnMethod.minimal)
+            .eq("telegram_id", telegram_id)
         )
-        return new.data[0]
+        row = {**row, "username": username}
+    return {key: row.get(key) for key in ("id", "telegram_id", "username")}
+
 
-    return await _run_db(query)
+async def _select_user(telegram_id: int) -> dict | None:
+    res = await _execute(
+        lambda db: db.table("users")
+        .select("id, telegram_id, username")
+        .eq("telegram_id", telegram_id)
+        .limit(1)
+    )
+    return res.data[0] if res.data else None
 
 
 # ─── Topics ───────────────────────────────────────────────────
 
 async def get_topics() -> list[dict]:
-    def query():
-        return (
-            get_client()
-            .table("topics")
-            .select("id, name_ru, name_uz, emoji")
-            .eq("is_active", True)
-            .order("name_ru")
-            .execute()
-            .data
-            or []
-        )
-
-    return await _run_db(query)
+    res = await _execute(
+        lambda db: db.table("topics")
+        .select("id, name_ru, name_uz, emoji")
+        .eq("is_active", True)
+        .order("name_ru")
+    )
+    return res.data or []
 
 
 async def get_topic_by_id(topic_id: int) -> dict | None:
-    def query():
-        res = (
-            get_client()
-            .table("topics")
-            .select("id, name_ru, name_uz, emoji")
-            .eq("id", topic_id)
-            .limit(1)
-            .execute()
-        )
-        return res.data[0] if res.data else None
-
-    return await _run_db(query)
+    res = await _execute(
+        lambda db: db.table("topics")
+        .select("id, name_ru, name_uz, emoji")
+        .eq("id", topic_id)
+        .limit(1)
+    )
+    return res.data[0] if res.data else None
 
 
 # ─── Phrases ──────────────────────────────────────────────────
 
+_PHRASE_COLUMNS = "id, text_ru, text_uz, english_answer, alternative_answers, level"
+
+
 async def save_phrase(
     topic_id: int,
     text_ru: str,
@@ -189,65 +263,56 @@ async def save_phrase(
         "text_uz": text_uz,
         "english_answer": english_answer,
         "alternative_answers": alternative_answers or [],
-        "phrase_key": _phrase_key(english_answer),
+        "phrase_key": phrase_key(english_answer),
         "level": level,
     }
 
-    def query():
-        db = get_client()
-        existing_candidates = (
+    def _by_key(db):
+        return (
             db.table("phrases")
-            .select("id, text_ru, text_uz, english_answer, alternative_answers, level")
+            .select(_PHRASE_COLUMNS)
             .eq("topic_id", topic_id)
             .eq("level", level)
-            .limit(100)
-            .execute()
-            .data
-            or []
+            .eq("phrase_key", payload["phrase_key"])
+            .limit(1)
         )
+
+    async def query():
+        existing_candidates = (
+            await _execute(
+                lambda db: db.table("phrases")
+                .select(_PHRASE_COLUMNS)
+                .eq("topic_id", topic_id)
+                .eq("level", level)
+                .limit(100)
+            )
+        ).data or []
         for candidate in existing_candidates:
-            score = _similarity(english_answer, candidate["english_answer"])
+            score = phrase_similarity(english_answer, candidate["english_answer"])
             if score >= PHRASE_SIMILARITY_THRESHOLD:
                 return _normalize_phrase_row(candidate, alternative_answers)
 
         try:
-            existing = (
-                db.table("phrases")
-                .select("id, text_ru, text_uz, english_answer, alternative_answers, level")
-                .eq("topic_id", topic_id)
-                .eq("level", level)
-                .eq("phrase_key", payload["phrase_key"])
-                .limit(1)
-                .execute()
-            )
+            existing = await _execute(_by_key)
             if existing.data:
                 return _normalize_phrase_row(existing.data[0], alternative_answers)
         except Exception:
-            existing = (
-                db.table("phrases")
-                .select("id, text_ru, text_uz, english_answer, alternative_answers, level")
+            existing = await _execute(
+                lambda db: db.table("phrases")
+                .select(_PHRASE_COLUMNS)
                 .eq("topic_id", topic_id)
                 .eq("level", level)
                 .eq("english_answer", english_answer)
                 .limit(1)
-                .execute()
             )
             if existing.data:
                 return _normalize_phrase_row(existing.data[0], alternative_answers)
 
         try:
-            res = db.table("phrases").insert(payload).execute()
+            res = await _execute(lambda db: db.table("phrases").insert(payload))
         except Exception:
             try:
-                existing = (
-                    db.table("phrases")
-                    .select("id, text_ru, text_uz, english_answer, alternative_answers, level")
-                    .eq("topic_id", topic_id)
-                    .eq("level", level)
-                    .eq("phrase_key", payload["phrase_key"])
-                    .limit(1)
-                    .execute()
-                )
+                existing = await _execute(_by_key)
                 if existing.data:
                     return _normalize_phrase_row(existing.data[0], alternative_answers)
             except Exception:
@@ -257,7 +322,7 @@ async def save_phrase(
             fallback.pop("alternative_answers", None)
             fallback.pop("phrase_key", None)
             try:
-                res = db.table("phrases").insert(fallback).execute()
+                res = await _execute(lambda db: db.table("phrases").insert(fallback))
             except Exception as second_error:
                 raise RuntimeError(
                     "Could not save phrase to Supabase. "
@@ -267,7 +332,9 @@ async def save_phrase(
         phrase = res.data[0]
         return _normalize_phrase_row(phrase, alternative_answers)
 
-    return await _run_db(query)
+    phrase = await query()
+    _phrase_catalog.invalidate(topic_id, level)
+    return phrase
 
 
 async def get_recent_phrase_answers(
@@ -275,109 +342,204 @@ async def get_recent_phrase_answers(
     level: str,
     limit: int = 25,
 ) -> list[str]:
-    def query():
-        res = (
-            get_client()
-            .table("phrases")
-            .select("english_answer")
-            .eq("topic_id", topic_id)
-            .eq("level", level)
-            .order("created_at", desc=True)
-            .limit(limit)
-            .execute()
-        )
-        return [row["english_answer"] for row in (res.data or []) if row.get("english_answer")]
-
-    return await _run_db(query)
+    res = await _execute(
+        lambda db: db.table("phrases")
+        .select("english_answer")
+        .eq("topic_id", topic_id)
+        .eq("level", level)
+        .order("created_at", desc=True)
+        .limit(limit)
+    )
+    return [row["english_answer"] for row in (res.data or []) if row.get("english_answer")]
 
 
 # ─── Unique phrase (без повторов) ────────────────────────────
 
 async def mark_phrase_seen(user_id: int, phrase_id: int, topic_id: int, level: str) -> None:
-    """Записываем факт просмотра фразы пользователем."""
-    def query():
-        try:
-            get_client().table("user_phrase_history").insert(
-                {
-                    "user_id": user_id,
-                    "phrase_id": phrase_id,
-                    "topic_id": topic_id,
-                    "level": level,
-                }
-            ).execute()
-        except Exception as e:
-            err_msg = str(e)
-            # 23505 is PostgreSQL unique constraint violation code
-            if "23505" not in err_msg and "duplicate key" not in err_msg.lower():
-                logger.error("Failed to mark phrase %s seen for user %s: %s", phrase_id, user_id, e)
-
-    await _run_db(query)
+    """Записываем факт просмотра фразы пользователем (пакетно, в фоне)."""
+    write_queue.enqueue(
+        "user_phrase_history",
+        {
+            "user_id": user_id,
+            "phrase_id": phrase_id,
+            "topic_id": topic_id,
+            "level": level,
+        },
+        on_conflict="user_id,phrase_id",
+    )
 
 
 async def _reset_phrase_history(user_id: int, topic_id: int, level: str) -> None:
     """Сбросить историю просмотров — когда все фразы уже показаны."""
-    def query():
-        try:
-            get_client().table("user_phrase_history").delete().eq("user_id", user_id).eq("topic_id", topic_id).eq("level", level).execute()
-        except Exception as e:
-            logger.error("Failed to reset phrase history for user %s, topic %s, level %s: %s", user_id, topic_id, level, e)
-
-    await _run_db(query)
-
-
-async def get_unique_phrase(user_id: int, topic_id: int, level: str) -> dict | None:
-    """
-    Возвращает случайную фразу, которую пользователь ещё не видел.
-    Если все фразы пройдены — сбрасывает историю и начинает заново.
-    Возвращает None если фраз вообще нет.
-    """
-    def _fetch_all():
-        res = (
-            get_client()
-            .table("phrases")
-            .select("id, text_ru, text_uz, english_answer, alternative_answers, level")
-            .eq("topic_id", topic_id)
-            .eq("level", level)
-            .execute()
-        )
-        return res.data or []
-
-    def _fetch_seen_ids():
-        res = (
-            get_client()
-            .table("user_phrase_history")
-            .select("phrase_id")
+    try:
+        await _execute(
+            lambda db: db.table("user_phrase_history")
+            .delete()
             .eq("user_id", user_id)
             .eq("topic_id", topic_id)
             .eq("level", level)
-            .execute()
         )
-        return {row["phrase_id"] for row in (res.data or [])}
+    except Exception as e:
+        logger.error("Failed to reset phrase history for user %s, topic %s, level %s: %s", user_id, topic_id, level, e)
 
-    def query():
-        all_phrases = _fetch_all()
-        if not all_phrases:
-            return None, False  # (phrase, was_reset)
 
-        seen_ids = _fetch_seen_ids()
-        unseen = [p for p in all_phrases if p["id"] not in seen_ids]
+async def _load_catalog_rows(topic_id: int, level: str) -> list[dict]:
+    res = await _execute(
+        lambda db: db.table("phrases")
+        .select(_PHRASE_COLUMNS)
+        .eq("topic_id", topic_id)
+        .eq("level", level)
+    )
+    return res.data or []
 
-        if not unseen:
-            # Все фразы просмотрены — вернём флаг для сброса
-            return None, True
 
-        phrase = random.choice(unseen)
-        phrase.setdefault("alternative_answers", [])
-        return phrase, False
+_phrase_catalog = PhraseCatalog(_load_catalog_rows, ttl=PHRASE_CATALOG_TTL)
 
-    phrase, needs_reset = await _run_db(query)
 
-    if needs_reset:
+async def _pick_phrase_id_rpc(user_id: int, topic_id: int, level: str) -> int | None:
+    """Один вызов pick_unseen_phrase: выбор, отметка и сброс цикла в одной транзакции."""
+    res = await _execute(
+        lambda db: db.rpc(
+            "pick_unseen_phrase",
+            {"p_user_id": user_id, "p_topic_id": topic_id, "p_level": level},
+        )
+    )
+    return res.data[0]["phrase_id"] if res.data else None
+
+
+async def _pick_phrase_legacy(user_id: int, topic_id: int, level: str, catalog) -> dict:
+    """Запасной путь, если функция pick_unseen_phrase ещё не создана в БД."""
+    res = await _execute(
+        lambda db: db.table("user_phrase_history")
+        .select("phrase_id")
+        .eq("user_id", user_id)
+        .eq("topic_id", topic_id)
+        .eq("level", level)
+    )
+    seen_ids = {row["phrase_id"] for row in (res.data or [])}
+    phrase = catalog.pick_unseen(seen_ids)
+
+    if phrase is None:
+        # Все фразы просмотрены — сбрасываем историю и берём любую фразу
         await _reset_phrase_history(user_id, topic_id, level)
-        # После сброса берём любую фразу
-        phrase, _ = await _run_db(query)
+        phrase = catalog.pick_unseen(set())
 
-    return phrase
+    await mark_phrase_seen(user_id, phrase.id, topic_id, level)
+    return phrase.as_dict()
+
+
+_pick_rpc_available = True
+
+
+async def get_unique_phrase(user_id: int, topic_id: int, level: str) -> dict | None:
+    """
+    Возвращает случайную фразу, которую пользователь ещё не видел,
+    и сразу отмечает её как просмотренную.
+    Если все фразы пройдены — сбрасывает историю и начинает заново.
+    Возвращает None если фраз вообще нет.
+
+    Выбор делает SQL-функция pick_unseen_phrase за один сетевой вызов;
+    тексты фраз берутся из in-process каталога.
+    """
+    global _pick_rpc_available
+
+    catalog = await _phrase_catalog.get(topic_id, level)
+    if not catalog:
+        return None
+
+    if _pick_rpc_available:
+        try:
+            phrase_id = await _pick_phrase_id_rpc(user_id, topic_id, level)
+        except Exception as e:
+            # PGRST202: function not found — schema.sql ещё не применён
+            if "PGRST202" in str(e):
+                _pick_rpc_available = False
+            logger.warning("pick_unseen_phrase RPC failed, using fallback: %s", e)
+        else:
+            # RPC уже отметил фразу как просмотренную: legacy-выбор отметил бы вторую
+            if phrase_id is None:
+                return None
+            phrase = await _picked_phrase(phrase_id, topic_id, level, catalog)
+            if phrase is None:
+                # Фразу удалили между выбором и чтением — выбираем ещё раз
+                logger.warning("Picked phrase %s no longer exists, picking again", phrase_id)
+                phrase_id = await _pick_phrase_id_rpc(user_id, topic_id, level)
+                if phrase_id is not None:
+                    phrase = await _picked_phrase(phrase_id, topic_id, level, catalog)
+            return phrase
+
+    return await _pick_phrase_legacy(user_id, topic_id, level, catalog)
+
+
+async def _picked_phrase(phrase_id: int, topic_id: int, level: str, catalog) -> dict | None:
+    """Фраза по id из каталога; если её там нет — из обновлённого каталога или одной строкой из БД."""
+    phrase = catalog.get(phrase_id)
+    if phrase is None:
+        # Фраза добавлена после загрузки каталога
+        _phrase_catalog.invalidate(topic_id, level)
+        phrase = (await _phrase_catalog.get(topic_id, level)).get(phrase_id)
+    if phrase is not None:
+        return phrase.as_dict()
+    # Обновление каталога могло не удаться (отдаётся старая копия)
+    res = await _execute(
+        lambda db: db.table("phrases").select(_PHRASE_COLUMNS).eq("id", phrase_id).limit(1)
+    )
+    return _normalize_phrase_row(res.data[0]) if res.data else None
+
+
+# ─── Check results (кэш проверок, см. services/result_cache.py) ─
+
+async def get_check_result(phrase_id: int, answer_key: str, level: str, checker_version: str) -> dict | None:
+    res = await _execute(
+        lambda db: db.table("check_results")
+        .select("result")
+        .eq("phrase_id", phrase_id)
+        .eq("answer_key", answer_key)
+        .eq("level", level)
+        .eq("checker_version", checker_version)
+        .limit(1)
+    )
+    return res.data[0]["result"] if res.data else None
+
+
+async def save_check_result(
+    phrase_id: int,
+    answer_key: str,
+    level: str,
+    checker_version: str,
+    result: dict,
+) -> None:
+    write_queue.enqueue(
+        "check_results",
+        {
+            "phrase_id": phrase_id,
+            "answer_key": answer_key,
+            "level": level,
+            "checker_version": checker_version,
+            "result": result,
+        },
+        on_conflict="phrase_id,answer_key,level,checker_version",
+    )
+
+
+# ─── AI explanations (кэш, см. services/ai_explainer.py) ─────
+
+async def get_explanation(prompt_hash: str) -> str | None:
+    res = await _execute(
+        lambda db: db.table("ai_explanations")
+        .select("explanation")
+        .eq("prompt_hash", prompt_hash)
+        .limit(1)
+    )
+    return res.data[0]["explanation"] if res.data else None
+
+
+async def save_explanation(prompt_hash: str, explanation: str) -> None:
+    write_queue.enqueue(
+        "ai_explanations",
+        {"prompt_hash": prompt_hash, "explanation": explanation},
+        on_conflict="prompt_hash",
+    )
 
 
 # ─── Scores ───────────────────────────────────────────────────
@@ -390,43 +552,90 @@ async def save_score(
     errors: list[str],
     feedback: str,
 ) -> dict:
-    def query():
-        res = (
-            get_client()
-            .table("scores")
-            .insert(
-                {
-                    "user_id": user_id,
-                    "phrase_id": phrase_id,
-                    "user_answer": user_answer,
-                    "score": score,
-                    "errors_json": errors,
-                    "feedback": feedback,
-                }
-            )
-            .execute()
-        )
-        return res.data[0]
+    """Queue a score row for the write-behind flusher and return it.
+
+    The row is written within WRITE_BEHIND_FLUSH_MS, so the returned dict
+    has no database id.
+    """
+    row = {
+        "user_id": user_id,
+        "phrase_id": phrase_id,
+        "user_answer": user_answer,
+        "score": score,
+        "errors_json": errors,
+        "feedback": feedback,
+    }
+    write_queue.enqueue("scores", row)
+    return row
+
+
+def _stats_from_rollup(row: dict | None) -> dict:
+    if not row or not row["total"]:
+        return {"total": 0, "avg": 0, "best": 0}
+    return {
+        "total": row["total"],
+        "avg": round(row["score_sum"] / row["total"], 1),
+        "best": row["best"],
+    }
 
-    return await _run_db(query)
+
+async def _get_user_stats_scan(user_id: int) -> dict:
+    """Полный скан scores — только если таблица user_stats ещё не создана."""
+    res = await _execute(
+        lambda db: db.table("scores")
+        .select("score")
+        .eq("user_id", user_id)
+    )
+    scores = [row["score"] for row in (res.data or [])]
+    if not scores:
+        return {"total": 0, "avg": 0, "best": 0}
+    return {
+        "total": len(scores),
+        "avg": round(sum(scores) / len(scores), 1),
+        "best": max(scores),
+    }
+
+
+_stats_rollup_available = True
 
 
 async def get_user_stats(user_id: int) -> dict:
-    def query():
-        res = (
-            get_client()
-            .table("scores")
-            .select("score")
+    """O(1) read of the user_stats rollup maintained by a trigger on scores."""
+    global _stats_rollup_available
+
+    if _stats_rollup_available:
+        try:
+            res = await _execute(
+                lambda db: db.table("user_stats")
+                .select("total, score_sum, best")
+                .eq("user_id", user_id)
+                .limit(1)
+            )
+            return _stats_from_rollup(res.data[0] if res.data else None)
+        except Exception as e:
+            # PGRST205 / 42P01: table not found — schema.sql ещё не применён.
+            # Остальные ошибки не маскируем полным сканированием scores.
+            if "PGRST205" not in str(e) and "42P01" not in str(e):
+                raise
+            _stats_rollup_available = False
+            logger.warning("user_stats rollup unavailable, scanning scores: %s", e)
+
+    return await _get_user_stats_scan(user_id)
+
+
+async def get_user_daily_stats(user_id: int) -> list[dict]:
+    """Daily (topic, level, day) buckets of the user's answers, oldest first."""
+    try:
+        res = await _execute(
+            lambda db: db.table("user_daily_stats")
+            .select("topic_id, level, day, attempts, score_sum, score_min, score_max, low_count")
             .eq("user_id", user_id)
-            .execute()
+            .order("day")
         )
-        scores = [row["score"] for row in (res.data or [])]
-        if not scores:
-            return {"total": 0, "avg": 0, "best": 0}
-        return {
-            "total": len(scores),
-            "avg": round(sum(scores) / len(scores), 1),
-            "best": max(scores),
-        }
-
-    return await _run_db(query)
+    except Exception as e:
+        logger.warning("user_daily_stats unavailable, skipping breakdown: %s", e)
+        return []
+    rows = res.data or []
+    for row in rows:
+        row["day"] = date.fromisoformat(row["day"])
+    return rows
@@ -0,0 +1,153 @@
+"""
+Write-behind batching for fire-and-forget inserts.
+
+Score rows and phrase-history rows are not read back on the user's
+critical path, so instead of one PostgREST call per row they are buffered
+here and written as multi-row inserts every WRITE_BEHIND_FLUSH_MS
+milliseconds, or as soon as WRITE_BEHIND_MAX_ROWS rows are waiting for
+one table. drain() flushes everything and is called from the aiogram
+shutdown hook; a row enqueued after that is written right away instead
+of waiting for a flusher that no longer runs.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# (table, rows, on_conflict) -> None; on_conflict set means "ignore duplicates"
+FlushFn = Callable[[str, list[dict], str | None], Awaitable[None]]
+
+
+class WriteBehindQueue:
+    def __init__(self, flush_fn: FlushFn, flush_interval: float, max_rows: int):
+        self._flush_fn = flush_fn
+        self._flush_interval = flush_interval
+        self._max_rows = max(1, max_rows)
+        self._buffers: dict[tuple[str, str | None], list[dict]] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self._late_flushes: set[asyncio.Task] = set()
+
+        self._enqueued = 0
+        self._flushed_rows = 0
+        self._failed_rows = 0
+        self._flushes = 0
+        self._flush_time_total = 0.0
+        self._flush_time_last = 0.0
+        self._flush_time_max = 0.0
+
+    # ─── Producer side ───────────────────────────────────────
+
+    def enqueue(self, table: str, row: dict, on_conflict: str | None = None) -> None:
+        buffer = self._buffers.setdefault((table, on_conflict), [])
+        buffer.append(row)
+        self._enqueued += 1
+        if self._closing:
+            self._flush_late(table)
+            return
+        self._ensure_started()
+        if len(buffer) >= self._max_rows and self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def depth(self) -> int:
+        return sum(len(rows) for rows in self._buffers.values())
+
+    # ─── Lifecycle ───────────────────────────────────────────
+
+    def start(self) -> None:
+        self._closing = False
+        self._ensure_started()
+
+    async def drain(self) -> None:
+        """Stop the background flusher and write out everything still buffered."""
+        self._closing = True
+        task, self._task = self._task, None
+        if task is not None:
+            self._wakeup.set()
+            try:
+                await task
+            except Exception as e:
+                logger.error("Write-behind flusher crashed: %s", e)
+        await self.flush()
+        if self._late_flushes:
+            await asyncio.gather(*self._late_flushes, return_exceptions=True)
+
+    def _ensure_started(self) -> None:
+        if self._task is not None or self._closing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; rows stay buffered until start()/drain()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    def _flush_late(self, table: str) -> None:
+        """A row arrived while draining or after drain(): no flusher will pick it up."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("Write-behind queue is closed; %s row stays buffered", table)
+            return
+        logger.warning("Write-behind queue is closed; flushing %s row immediately", table)
+        task = loop.create_task(self.flush())
+        self._late_flushes.add(task)
+        task.add_done_callback(self._late_flushes.discard)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    # ─── Flushing ────────────────────────────────────────────
+
+    async def flush(self) -> None:
+        buffers, self._buffers = self._buffers, {}
+        for (table, on_conflict), rows in buffers.items():
+            for start in range(0, len(rows), self._max_rows):
+                await self._flush_batch(table, rows[start:start + self._max_rows], on_conflict)
+
+    async def _flush_batch(self, table: str, rows: list[dict], on_conflict: str | None) -> None:
+        started = time.perf_counter()
+        try:
+            await self._flush_fn(table, rows, on_conflict)
+            self._flushed_rows += len(rows)
+        except Exception as e:
+            # One bad row must not poison the whole batch: retry row by row.
+            logger.warning("Bulk insert of %d rows into %s failed, retrying one by one: %s", len(rows), table, e)
+            for row in rows:
+                try:
+                    await self._flush_fn(table, [row], on_conflict)
+                    self._flushed_rows += 1
+                except Exception as row_error:
+                    self._failed_rows += 1
+                    logger.error("Dropping %s row %s: %s", table, row, row_error)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._flushes += 1
+            self._flush_time_total += elapsed
+            self._flush_time_last = elapsed
+            self._flush_time_max = max(self._flush_time_max, elapsed)
+
+    # ─── Metrics ─────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "enqueued_total": self._enqueued,
+            "flushed_rows_total": self._flushed_rows,
+            "failed_rows_total": self._failed_rows,
+            "flushes_total": self._flushes,
+            "flush_latency_ms_last": round(self._flush_time_last * 1000, 2),
+            "flush_latency_ms_max": round(self._flush_time_max * 1000, 2),
+            "flush_latency_ms_avg": round(self._flush_time_total * 1000 / self._flushes, 2) if self._flushes else 0.0,
+        }
@@ -11,7 +11,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
 
-from db.supabase_client import (
+from db.repository import (
     get_level_codes,
     get_levels,
     get_or_create_user,
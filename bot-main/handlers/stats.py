@@ -1,20 +1,104 @@
 """
 User statistics.
+
+Totals come from the user_stats rollup; per-topic, per-level and weekly
+breakdowns are summed from the daily buckets in user_daily_stats, so the
+cost depends on the number of active days, not on the number of answers.
 """
 
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from html import escape
+
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
-from db.supabase_client import get_or_create_user, get_user_stats
+from db.repository import get_or_create_user, get_topics, get_user_daily_stats, get_user_stats
 from utils.keyboards import main_reply_keyboard
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
+_MAX_TOPIC_LINES = 5
+
+
+def _sum_buckets(rows: list[dict]) -> dict:
+    attempts = sum(row["attempts"] for row in rows)
+    return {
+        "attempts": attempts,
+        "avg": round(sum(row["score_sum"] for row in rows) / attempts) if attempts else 0,
+        "best": max((row["score_max"] for row in rows), default=0),
+        "low": sum(row["low_count"] for row in rows),
+    }
+
+
+def _group_buckets(rows: list[dict], key: str) -> dict:
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault(row[key], []).append(row)
+    return {value: _sum_buckets(items) for value, items in groups.items()}
+
+
+def _breakdown_lines(daily: list[dict], topic_names: dict[int, str], today: date | None = None) -> list[str]:
+    if not daily:
+        return []
+    lines: list[str] = []
+
+    by_topic = _group_buckets([row for row in daily if row["topic_id"]], "topic_id")
+    if by_topic:
+        lines += ["", "📚 <b>By topic:</b>"]
+        ranked = sorted(by_topic.items(), key=lambda item: item[1]["attempts"], reverse=True)
+        for topic_id, agg in ranked[:_MAX_TOPIC_LINES]:
+            name = escape(topic_names.get(topic_id, f"Topic {topic_id}"))
+            low = f", {agg['low']} under 70" if agg["low"] else ""
+            lines.append(f"• {name} — {agg['attempts']} × avg {agg['avg']}{low}")
+
+    by_level = _group_buckets([row for row in daily if row["level"]], "level")
+    if by_level:
+        lines += ["", "📈 <b>By level:</b>"]
+        for level, agg in sorted(by_level.items()):
+            lines.append(f"• {level} — {agg['attempts']} × avg {agg['avg']}, best {agg['best']}")
+
+    if today is None:
+        today = datetime.now(timezone.utc).date()  # buckets are UTC days
+    this_week = _sum_buckets([row for row in daily if row["day"] > today - timedelta(days=7)])
+    last_week = _sum_buckets(
+        [row for row in daily if today - timedelta(days=14) < row["day"] <= today - timedelta(days=7)]
+    )
+    lines += ["", "🗓 <b>Last 7 days:</b>"]
+    if this_week["attempts"]:
+        count = this_week["attempts"]
+        trend = f"{count} answer{'' if count == 1 else 's'}, avg {this_week['avg']}"
+        if last_week["attempts"]:
+            delta = this_week["avg"] - last_week["avg"]
+            arrow = "⬆️" if delta > 0 else "⬇️" if delta < 0 else "➡️"
+            trend += f" ({arrow} {delta:+d} vs previous week)"
+        lines.append(f"• {trend}")
+    else:
+        lines.append("• No answers this week yet")
+    return lines
+
 
 async def send_stats(message: Message, telegram_id: int, username: str | None):
     db_user = await get_or_create_user(telegram_id, username)
-    stats = await get_user_stats(db_user["id"])
+    stats, daily, topics = await asyncio.gather(
+        get_user_stats(db_user["id"]),
+        get_user_daily_stats(db_user["id"]),
+        get_topics(),
+        return_exceptions=True,
+    )
+    if isinstance(stats, BaseException):
+        raise stats
+    # The totals stand on their own: a failed breakdown query only trims the message
+    if isinstance(daily, BaseException):
+        logger.warning("Daily stats unavailable: %s", daily)
+        daily = []
+    if isinstance(topics, BaseException):
+        logger.warning("Topic names unavailable: %s", topics)
+        topics = []
 
     if stats["total"] == 0:
         text = (
@@ -31,13 +115,16 @@ async def send_stats(message: Message, telegram_id: int, username: str | None):
         else:
             status = "Building up 🌱"
 
-        text = (
-            "📊 <b>Your Statistics</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            f"• <b>Total translations:</b> {stats['total']}\n"
-            f"• <b>Average score:</b> {avg}/100 ({status})\n"
-            f"• <b>Best score:</b> {stats['best']}/100"
-        )
+        topic_names = {topic["id"]: f"{topic['emoji']} {topic['name_ru']}" for topic in topics}
+        lines = [
+            "📊 <b>Your Statistics</b>",
+            "━━━━━━━━━━━━━━━━━━━━",
+            f"• <b>Total translations:</b> {stats['total']}",
+            f"• <b>Average score:</b> {avg}/100 ({status})",
+            f"• <b>Best score:</b> {stats['best']}/100",
+            *_breakdown_lines(daily, topic_names),
+        ]
+        text = "\n".join(lines)
 
     await message.answer(text, reply_markup=main_reply_keyboard(), parse_mode="HTML")
 
@@ -3,7 +3,9 @@ Practice flow:
 topic -> level -> phrase -> answer -> score
 """
 
+import asyncio
 import logging
+from functools import partial
 from html import escape
 
 from aiogram import F, Router
@@ -12,7 +14,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
 
-from db.supabase_client import (
+from db.repository import (
     get_or_create_user,
     save_score
 )
@@ -23,23 +25,30 @@ from handlers.start import (
     PracticeState
 )
 
-from services.ai_explainer import explain_errors
+from config import EXPLANATION_MIN_SCORE
+
 from services.checker import (
     check_translation,
     format_result_message
 )
 
+from services.explanation_delivery import schedule_explanation
+
 from services.generator import (
     generate_phrase,
     NoPhraseAvailable
 )
 
+from utils import background
+
 from utils.keyboards import (
     after_answer_keyboard,
     direction_label,
     levels_keyboard
 )
 
+from utils.timing import StageTimer
+
 
 router = Router()
 
@@ -365,15 +374,115 @@ async def receive_answer(
 
 
 
-    data = await state.get_data()
+    timer = StageTimer()
 
 
-    await message.answer(
-        "🔍 Checking..."
+    data = await timer.track(
+        "state",
+        state.get_data()
+    )
+
+
+    # Placeholder, user lookup and check run side by side
+    placeholder_task = asyncio.create_task(
+        timer.track(
+            "placeholder",
+            message.answer(
+                "🔍 Checking..."
+            )
+        )
+    )
+
+
+    user_task = asyncio.create_task(
+        timer.track(
+            "user",
+            get_or_create_user(
+                message.from_user.id,
+                message.from_user.username
+            )
+        )
+    )
+
+
+    try:
+
+        result = await timer.track(
+
+            "check",
+
+            check_translation(
+
+                original_ru=
+                data.get("current_text_ru",""),
+
+                original_uz=
+                data.get("current_text_uz",""),
+
+                reference_english=
+                data.get("current_english",""),
+
+                user_answer=
+                answer,
+
+                level=
+                data.get("level",DEFAULT_LEVEL),
+
+                alternative_answers=
+                data.get(
+                    "current_alternatives",
+                    []
+                ),
+
+                phrase_lang=
+                data.get(
+                    "phrase_lang",
+                    DEFAULT_DIRECTION
+                ),
+
+                phrase_id=
+                data.get("current_phrase_id")
+            )
+        )
+
+
+    except Exception as e:
+
+        logger.exception(e)
+
+
+        # Not cancelled: a concurrent lookup of the same user may share it
+        background.spawn(
+            _settle(user_task)
+        )
+
+
+        await _show_result(
+            message,
+            placeholder_task,
+            "Error checking answer",
+            None
+        )
+
+        return
+
+
+
+    # The score is persisted off the critical path
+    background.spawn(
+        _save_score(
+            user_task,
+            data.get("current_phrase_id"),
+            answer,
+            result
+        )
     )
 
 
-    result = await check_translation(
+
+    render = partial(
+
+        format_result_message,
 
         original_ru=
         data.get("current_text_ru",""),
@@ -381,22 +490,15 @@ async def receive_answer(
         original_uz=
         data.get("current_text_uz",""),
 
-        reference_english=
+        reference=
         data.get("current_english",""),
 
         user_answer=
         answer,
 
-        level=
-        data.get("level",DEFAULT_LEVEL),
-
-        alternative_answers=
-        data.get(
-            "current_alternatives",
-            []
-        ),
+        result=result,
 
-        phrase_lang=
+        lang=
         data.get(
             "phrase_lang",
             DEFAULT_DIRECTION
@@ -404,23 +506,92 @@ async def receive_answer(
     )
 
 
+    keyboard = after_answer_keyboard(
 
-    try:
+        data.get("topic_id"),
 
-        user = await get_or_create_user(
-            message.from_user.id,
-            message.from_user.username
+        data.get(
+            "level",
+            DEFAULT_LEVEL
+        ),
+
+        result["score"] < 90
+    )
+
+
+    # The score goes out now; the AI explanation is appended later
+    sent = await timer.track(
+
+        "reply",
+
+        _show_result(
+            message,
+            placeholder_task,
+            render(ai_explanation=None),
+            keyboard
         )
+    )
+
+
+    if result["score"] < EXPLANATION_MIN_SCORE:
+
+        schedule_explanation(
+
+            sent,
+
+            render,
+
+            keyboard,
+
+            original_ru=
+            data.get("current_text_ru",""),
+
+            original_uz=
+            data.get("current_text_uz",""),
+
+            reference_english=
+            data.get("current_english",""),
+
+            user_answer=
+            answer,
+
+            errors=result["errors"],
+
+            level=
+            data.get("level",DEFAULT_LEVEL),
+
+            phrase_lang=
+            data.get(
+                "phrase_lang",
+                DEFAULT_DIRECTION
+            )
+        )
+
+
+
+    logger.info(
+        f"answer_pipeline {timer.summary()}"
+    )
+
+
+
+async def _save_score(
+    user_task: asyncio.Task,
+    phrase_id: int | None,
+    answer: str,
+    result: dict
+):
+
+    try:
+
+        user = await user_task
 
 
         await save_score(
 
             user_id=user["id"],
 
-            phrase_id=
-            data.get(
-                "current_phrase_id"
-            ),
+            phrase_id=phrase_id,
 
             user_answer=answer,
 
@@ -440,51 +611,55 @@ async def receive_answer(
 
 
 
-    text = format_result_message(
+async def _settle(
+    task: asyncio.Task
+):
 
-        original_ru=
-        data.get("current_text_ru",""),
+    try:
 
-        original_uz=
-        data.get("current_text_uz",""),
+        await task
 
-        reference=
-        data.get("current_english",""),
 
-        user_answer=
-        answer,
+    except Exception as e:
 
-        result=result,
+        logger.warning(
+            f"User lookup error {e}"
+        )
 
-        lang=
-        data.get(
-            "phrase_lang",
-            DEFAULT_DIRECTION
-        ),
 
-        ai_explanation=None
-    )
 
+async def _show_result(
+    message: Message,
+    placeholder_task: asyncio.Task,
+    text: str,
+    keyboard
+) -> Message:
 
-    await message.answer(
+    # Edit "Checking..." into the result; a new message if that fails
+    try:
 
-        text,
+        placeholder = await placeholder_task
 
-        reply_markup=
-        after_answer_keyboard(
 
-            data.get("topic_id"),
+        return await placeholder.edit_text(
+            text,
+            reply_markup=keyboard,
+            parse_mode="HTML"
+        )
 
-            data.get(
-                "level",
-                DEFAULT_LEVEL
-            ),
 
-            result["score"] < 90
-        ),
+    except Exception as e:
 
-        parse_mode="HTML"
-    )
+        logger.warning(
+            f"Placeholder edit failed {e}"
+        )
+
+
+        return await message.answer(
+            text,
+            reply_markup=keyboard,
+            parse_mode="HTML"
+        )
 
 
 
@@ -1,3 +1,4 @@
+import hmac
 import os
 import logging
 
@@ -13,9 +14,21 @@ from aiogram.webhook.aiohttp_server import (
     setup_application
 )
 
-from config import BOT_TOKEN
+from config import BOT_TOKEN, LANGUAGE_TOOL_HEALTH_INTERVAL, METRICS_TOKEN
 
+from db.repository import close_db, user_cache_stats, write_queue
 from handlers import start, stats, translation
+from services import error_lexicon, explanation_delivery
+from services.ai_explainer import (
+    close_ai_clients,
+    explanation_cache_stats,
+    provider_stats,
+    start_ai_clients,
+)
+from services.checker import checker_processes, grammar_batcher, language_tool, result_cache
+from services.grammar_rules import rule_stats
+from services.semantic import get_scorer, scorer_stats
+from utils import background
 from utils.antispam import AntiSpamMiddleware
 
 
@@ -81,8 +94,13 @@ def create_app():
         import asyncio
         async def bg_preload():
             try:
-                from services.checker import preload_models
-                await asyncio.to_thread(preload_models)
+                await asyncio.to_thread(
+                    error_lexicon.load
+                )
+                await asyncio.to_thread(
+                    get_scorer
+                )
+                await language_tool.ensure_started()
             except Exception as e:
                 logging.warning(
                     f"Failed to preload models in background: {e}"
@@ -91,6 +109,21 @@ def create_app():
         asyncio.create_task(bg_preload())
 
 
+        language_tool.start_health_checks(
+            LANGUAGE_TOOL_HEALTH_INTERVAL
+        )
+
+
+        if checker_processes is not None:
+            await checker_processes.start()
+
+
+        await start_ai_clients()
+
+
+        write_queue.start()
+
+
         render_url = os.getenv(
             "RENDER_EXTERNAL_URL"
         )
@@ -148,6 +181,30 @@ def create_app():
         )
 
 
+        await background.drain()
+
+
+        await write_queue.drain()
+
+
+        logging.info(
+            f"Write-behind drained: {write_queue.stats()}"
+        )
+
+
+        await close_db()
+
+
+        await close_ai_clients()
+
+
+        await language_tool.stop()
+
+
+        if checker_processes is not None:
+            await checker_processes.stop()
+
+
         await bot.session.close()
 
 
@@ -191,6 +248,52 @@ def create_app():
 
 
 
+    # internal counters (write-behind queue, caches),
+    # only for holders of METRICS_TOKEN
+
+    async def metrics(request):
+
+        supplied = request.headers.get(
+            "Authorization",
+            ""
+        ).removeprefix("Bearer ")
+
+
+        if not hmac.compare_digest(
+            supplied.encode(),
+            METRICS_TOKEN.encode()
+        ):
+
+            raise web.HTTPForbidden()
+
+
+        return web.json_response({
+            "write_behind": write_queue.stats(),
+            "user_cache": user_cache_stats(),
+            "language_tool": language_tool.stats(),
+            "grammar_batch": grammar_batcher.stats(),
+            "grammar_rules": rule_stats(),
+            "checker_processes": (
+                checker_processes.stats() if checker_processes else None
+            ),
+            "result_cache": result_cache.stats(),
+            "semantic": scorer_stats(),
+            "ai_providers": provider_stats(),
+            "explanation_cache": explanation_cache_stats(),
+            "explanation_delivery": explanation_delivery.delivery_stats(),
+            "background_tasks": background.pending(),
+        })
+
+
+    if METRICS_TOKEN:
+
+        app.router.add_get(
+            "/metrics",
+            metrics
+        )
+
+
+
     # webhook handler
 
     SimpleRequestHandler(
@@ -217,15 +320,20 @@ def create_app():
 
 
 
-try:
-    app = create_app()
-    logging.info("✅ APP CREATED SUCCESSFULLY")
+# checker worker processes (CHECKER_EXECUTOR=process) re-import this
+# module as __mp_main__; they must not build a second bot
 
-except Exception as e:
-    logging.exception(
-        f"❌ APP CREATION FAILED: {e}"
-    )
-    raise
+if __name__ != "__mp_main__":
+
+    try:
+        app = create_app()
+        logging.info("✅ APP CREATED SUCCESSFULLY")
+
+    except Exception as e:
+        logging.exception(
+            f"❌ APP CREATION FAILED: {e}"
+        )
+        raise
 
 
 
@@ -4,24 +4,129 @@ AI-powered error explanation service.
 Uses Groq API (llama-3.1-8b-instant) as primary provider — fast and free.
 Falls back to Together.ai (Meta-Llama-3.1-8B) if Groq is unavailable.
 Returns None gracefully if both providers fail, so the bot continues working.
+
+The fallback is hedged: it starts as soon as Groq fails, or when Groq has
+not answered within its usual latency (AI_HEDGE_PERCENTILE of recent
+successful calls). The first answer wins and the other request is
+cancelled, so a slow provider costs about one timeout, not two.
+
+Each provider has one long-lived httpx.AsyncClient (HTTP/2, keep-alive,
+bounded pool), opened in the bot's startup hook and closed on shutdown,
+so an explanation does not pay DNS, TCP and TLS setup every time.
+
+Every provider also has a circuit breaker: after too many errors in its
+recent calls it is skipped outright (no request, no timeout) until
+AI_BREAKER_COOLDOWN passes, then a single probe decides whether it closes
+again. Request timeouts follow the provider's observed p95 latency
+instead of always waiting the full AI_TIMEOUT.
+
+The same wrong answer to the same phrase builds the same prompt, so
+explanations are cached by a fingerprint of the prompt: in memory
+(EXPLANATION_CACHE_SIZE) and, with EXPLANATION_CACHE_PERSIST=1, in the
+ai_explanations table. Identical requests in flight share one provider
+call (singleflight). Failures are not cached.
+
+With on_partial, the explanation is requested as an OpenAI-style SSE
+stream and on_partial receives the text so far after every chunk (only
+from the provider that streamed first), so the caller can show it while
+it is generated.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 
 import httpx
 
-from config import AI_TIMEOUT, GROQ_API_KEY, TOGETHER_API_KEY
+from config import (
+    AI_BREAKER_COOLDOWN,
+    AI_BREAKER_ERROR_RATE,
+    AI_BREAKER_MIN_CALLS,
+    AI_BREAKER_WINDOW,
+    AI_HTTP_KEEPALIVE_EXPIRY,
+    AI_HTTP_MAX_CONNECTIONS,
+    AI_HTTP_MAX_KEEPALIVE,
+    AI_HEDGE_DELAY,
+    AI_HEDGE_MIN_DELAY,
+    AI_HEDGE_PERCENTILE,
+    AI_LATENCY_EWMA_ALPHA,
+    AI_MIN_TIMEOUT,
+    AI_TIMEOUT,
+    AI_TIMEOUT_P95_FACTOR,
+    EXPLANATION_CACHE_PERSIST,
+    EXPLANATION_CACHE_SIZE,
+    EXPLANATION_CACHE_TTL,
+    GROQ_API_KEY,
+    GROQ_API_URL,
+    TOGETHER_API_KEY,
+    TOGETHER_API_URL,
+)
+from utils.cache import SingleFlight, TTLCache
 
 logger = logging.getLogger(__name__)
 
-_GROQ_URL    = "https://api.groq.com/openai/v1/chat/completions"
-_TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
+# Receives the explanation generated so far
+PartialFn = Callable[[str], Awaitable[None]]
 
 _GROQ_MODEL    = "llama-3.1-8b-instant"
 _TOGETHER_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
 
 
+@dataclass(frozen=True)
+class Provider:
+    name: str
+    url: str
+    api_key: str
+    model: str
+
+
+# In fallback order; providers without a key are skipped
+PROVIDERS = [
+    Provider("groq", GROQ_API_URL, GROQ_API_KEY, _GROQ_MODEL),
+    Provider("together", TOGETHER_API_URL, TOGETHER_API_KEY, _TOGETHER_MODEL),
+]
+
+
+# ─── HTTP clients ─────────────────────────────────────────────
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _client(provider: Provider) -> httpx.AsyncClient:
+    client = _clients.get(provider.name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=AI_TIMEOUT,
+            http2=True,
+            headers={"Authorization": f"Bearer {provider.api_key}"},
+            limits=httpx.Limits(
+                max_connections=AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=AI_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _clients[provider.name] = client
+    return client
+
+
+async def start_ai_clients() -> None:
+    """Open a client per configured provider (called from the startup hook)."""
+    for provider in PROVIDERS:
+        if provider.api_key:
+            _client(provider)
+
+
+async def close_ai_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
 def _build_prompt(
     original_ru: str,
     original_uz: str,
@@ -47,28 +152,272 @@ def _build_prompt(
     )
 
 
-async def _call_api(url: str, api_key: str, model: str, prompt: str) -> str | None:
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
+# ─── Latency and hedging ──────────────────────────────────────
+
+class LatencyWindow:
+    """The last `size` successful call latencies of one provider (seconds), plus their EWMA."""
+
+    MIN_SAMPLES = 5
+
+    def __init__(self, size: int = 100, alpha: float = AI_LATENCY_EWMA_ALPHA):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._alpha = alpha
+        self.ewma: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.ewma = seconds if self.ewma is None else self._alpha * seconds + (1 - self._alpha) * self.ewma
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self._samples) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class CircuitBreaker:
+    """
+    closed — calls pass; opens when the error rate of the last `window`
+    calls (at least `min_calls` of them) reaches `error_rate`.
+    open — calls are refused until `cooldown` seconds have passed.
+    half_open — one probe call passes; success closes, failure re-opens.
+
+    allow() hands out a ticket that the call passes back with its outcome.
+    Outcomes of calls admitted before the circuit opened are ignored, and
+    in half_open only the probe's ticket counts.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        window: int = AI_BREAKER_WINDOW,
+        min_calls: int = AI_BREAKER_MIN_CALLS,
+        error_rate: float = AI_BREAKER_ERROR_RATE,
+        cooldown: float = AI_BREAKER_COOLDOWN,
+        clock=time.monotonic,
+    ):
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._min_calls = min_calls
+        self._error_rate = error_rate
+        self._cooldown = cooldown
+        self._clock = clock
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        # Ticket of closed-state calls; replaced on every opening
+        self._generation = object()
+        self._probe: object | None = None
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> object | None:
+        """A ticket for one call, or None when the call is refused."""
+        if self.state == self.OPEN and self._clock() - self._opened_at >= self._cooldown:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return self._generation
+        if self.state == self.HALF_OPEN and self._probe is None:
+            self._probe = object()
+            return self._probe
+        self.rejected += 1
+        return None
+
+    def record_success(self, ticket: object | None) -> None:
+        if self.state == self.HALF_OPEN and ticket is self._probe:
+            self.state = self.CLOSED
+            self._probe = None
+            self._outcomes.clear()
+        if self.state == self.CLOSED and ticket is self._generation:
+            self._outcomes.append(True)
+
+    def record_failure(self, ticket: object | None) -> None:
+        if self.state == self.HALF_OPEN and ticket is self._probe:
+            self._open()
+        elif self.state == self.CLOSED and ticket is self._generation:
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self._min_calls and self.error_rate() >= self._error_rate:
+                self._open()
+
+    def release(self, ticket: object | None) -> None:
+        """The call ended without an outcome (cancelled by a hedge); a cancelled probe lets the next call probe."""
+        if ticket is self._probe:
+            self._probe = None
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        self._generation = object()
+        self._probe = None
+        self._outcomes.clear()
+        self.opened += 1
+
+
+_latencies: dict[str, LatencyWindow] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_stats = {"explanations": 0, "hedged": 0, "cancelled": 0, "failed": 0, "short_circuited": 0}
+_wins: dict[str, int] = {}
+
+
+def _latency(provider: Provider) -> LatencyWindow:
+    return _latencies.setdefault(provider.name, LatencyWindow())
+
+
+def _breaker(provider: Provider) -> CircuitBreaker:
+    breaker = _breakers.get(provider.name)
+    if breaker is None:
+        breaker = _breakers[provider.name] = CircuitBreaker()
+    return breaker
+
+
+def hedge_delay(provider: Provider) -> float:
+    """How long to wait for provider before starting the next one."""
+    observed = _latency(provider).percentile(AI_HEDGE_PERCENTILE)
+    delay = AI_HEDGE_DELAY if observed is None else observed
+    return min(max(delay, AI_HEDGE_MIN_DELAY), AI_TIMEOUT)
+
+
+def call_timeout(provider: Provider) -> float:
+    """Request timeout: a multiple of the observed p95, AI_TIMEOUT until there are enough samples."""
+    p95 = _latency(provider).percentile(95)
+    if p95 is None:
+        return AI_TIMEOUT
+    return min(max(p95 * AI_TIMEOUT_P95_FACTOR, AI_MIN_TIMEOUT), AI_TIMEOUT)
+
+
+def provider_stats() -> dict:
+    return {
+        **_stats,
+        "wins": dict(_wins),
+        "providers": {
+            provider.name: {
+                "state": _breaker(provider).state,
+                "error_rate": round(_breaker(provider).error_rate(), 3),
+                "opened": _breaker(provider).opened,
+                "rejected": _breaker(provider).rejected,
+                "samples": len(_latency(provider)),
+                "ewma_ms": _ms(_latency(provider).ewma),
+                "p50_ms": _ms(_latency(provider).percentile(50)),
+                "p95_ms": _ms(_latency(provider).percentile(95)),
+                "hedge_delay_ms": _ms(hedge_delay(provider)),
+                "timeout_ms": _ms(call_timeout(provider)),
+            }
+            for provider in PROVIDERS
+            if provider.api_key
+        },
     }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+async def _read_stream(resp: httpx.Response, on_partial: PartialFn) -> str:
+    parts: list[str] = []
+    async for line in resp.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+        if delta:
+            parts.append(delta)
+            await on_partial("".join(parts).strip())
+    return "".join(parts).strip()
+
+
+async def _call_api(
+    provider: Provider,
+    prompt: str,
+    on_partial: PartialFn | None = None,
+    ticket: object | None = None,
+) -> str | None:
+    """ticket: from the provider's breaker.allow(); calls without one leave the breaker alone."""
     body = {
-        "model": model,
+        "model": provider.model,
         "messages": [{"role": "user", "content": prompt}],
         "max_tokens": 200,
         "temperature": 0.4,
     }
+    breaker = _breaker(provider)
+    started = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=AI_TIMEOUT) as client:
-            resp = await client.post(url, json=body, headers=headers)
+        if on_partial is None:
+            resp = await _client(provider).post(provider.url, json=body, timeout=call_timeout(provider))
             resp.raise_for_status()
             data = resp.json()
-            return data["choices"][0]["message"]["content"].strip()
+            content = data["choices"][0]["message"]["content"].strip()
+        else:
+            body["stream"] = True
+            request = _client(provider).stream("POST", provider.url, json=body, timeout=call_timeout(provider))
+            async with request as resp:
+                resp.raise_for_status()
+                content = await _read_stream(resp, on_partial)
+        _latency(provider).record(time.perf_counter() - started)
+        breaker.record_success(ticket)
+        return content
+    except asyncio.CancelledError:
+        # Lost a hedge race: says nothing about the provider's health
+        breaker.release(ticket)
+        raise
     except Exception as exc:
-        logger.warning("AI provider %s failed: %s", url, exc)
+        breaker.record_failure(ticket)
+        logger.warning("AI provider %s failed (circuit %s): %s", provider.name, breaker.state, exc)
+        return None
+
+
+# ─── Explanation cache ────────────────────────────────────────
+
+_explanations = TTLCache(maxsize=EXPLANATION_CACHE_SIZE, ttl=EXPLANATION_CACHE_TTL or None)
+_explanation_flights = SingleFlight()
+_cache_stats = {"persistent_hits": 0, "persistent_errors": 0}
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def explanation_cache_stats() -> dict:
+    return {
+        **_explanations.stats(),
+        **_cache_stats,
+        "singleflight_shared": _explanation_flights.shared,
+    }
+
+
+async def _load_explanation(fingerprint: str) -> str | None:
+    if not EXPLANATION_CACHE_PERSIST:
+        return None
+    try:
+        from db.repository import get_explanation
+
+        return await get_explanation(fingerprint)
+    except Exception as e:
+        _cache_stats["persistent_errors"] += 1
+        logger.warning("explanation_cache_load_failed: %s", e)
         return None
 
 
+async def _save_explanation(fingerprint: str, explanation: str) -> None:
+    if not EXPLANATION_CACHE_PERSIST:
+        return
+    try:
+        from db.repository import save_explanation
+
+        await save_explanation(fingerprint, explanation)
+    except Exception as e:
+        _cache_stats["persistent_errors"] += 1
+        logger.warning("explanation_cache_save_failed: %s", e)
+
+
 async def explain_errors(
     original_ru: str,
     original_uz: str,
@@ -77,10 +426,12 @@ async def explain_errors(
     errors: list[str],
     level: str,
     phrase_lang: str = "ru",
+    on_partial: PartialFn | None = None,
 ) -> str | None:
     """
     Returns an AI explanation string, or None if all providers failed.
     Never raises — the bot must continue working without AI.
+    on_partial, if given, streams the text so far (not for cached answers).
     """
     prompt = _build_prompt(
         original_ru=original_ru,
@@ -92,17 +443,88 @@ async def explain_errors(
         phrase_lang=phrase_lang,
     )
 
-    # Try Groq first (fast, free tier)
-    if GROQ_API_KEY:
-        result = await _call_api(_GROQ_URL, GROQ_API_KEY, _GROQ_MODEL, prompt)
-        if result:
-            return result
+    fingerprint = prompt_fingerprint(prompt)
+    cached = _explanations.get(fingerprint)
+    if cached is not None:
+        return cached
+    return await _explanation_flights.do(fingerprint, lambda: _explain_uncached(fingerprint, prompt, on_partial))
+
 
-    # Fallback: Together.ai
-    if TOGETHER_API_KEY:
-        result = await _call_api(_TOGETHER_URL, TOGETHER_API_KEY, _TOGETHER_MODEL, prompt)
-        if result:
-            return result
+async def _explain_uncached(fingerprint: str, prompt: str, on_partial: PartialFn | None) -> str | None:
+    result = await _load_explanation(fingerprint)
+    if result:
+        _cache_stats["persistent_hits"] += 1
+        _explanations.set(fingerprint, result)
+        return result
 
+    # Groq first (fast, free tier), then Together.ai
+    providers = [provider for provider in PROVIDERS if provider.api_key]
+    _stats["explanations"] += 1
+    result = await _hedged(providers, prompt, on_partial) if providers else None
+    if result:
+        _explanations.set(fingerprint, result)
+        await _save_explanation(fingerprint, result)
+        return result
+
+    _stats["failed"] += 1
     logger.warning("All AI providers unavailable — skipping explanation")
     return None
+
+
+async def _hedged(providers: list[Provider], prompt: str, on_partial: PartialFn | None = None) -> str | None:
+    """
+    First non-empty answer; each next provider starts on failure or after
+    hedge_delay(). Providers whose circuit is open are skipped.
+    """
+    waiting = list(providers)
+    running: dict[asyncio.Task, Provider] = {}
+    streaming: list[str] = []
+
+    def forward_for(provider: Provider) -> PartialFn | None:
+        if on_partial is None:
+            return None
+
+        async def forward(text: str) -> None:
+            # Partials of two racing providers must not interleave
+            if not streaming:
+                streaming.append(provider.name)
+            if streaming[0] == provider.name:
+                await on_partial(text)
+
+        return forward
+
+    def launch() -> Provider | None:
+        while waiting:
+            provider = waiting.pop(0)
+            ticket = _breaker(provider).allow()
+            if ticket is not None:
+                call = _call_api(provider, prompt, forward_for(provider), ticket)
+                running[asyncio.create_task(call)] = provider
+                return provider
+            _stats["short_circuited"] += 1
+        return None
+
+    last = launch()
+    try:
+        while running:
+            timeout = hedge_delay(last) if waiting else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                started = launch()
+                if started is not None:
+                    _stats["hedged"] += 1
+                    last = started
+                continue
+            for task in done:
+                provider = running.pop(task)
+                result = task.result()
+                if result:
+                    _wins[provider.name] = _wins.get(provider.name, 0) + 1
+                    return result
+            # A provider failed: do not wait out the hedge delay for the next one
+            last = launch() or last
+        return None
+    finally:
+        for task in running:
+            task.cancel()
+            _stats["cancelled"] += 1
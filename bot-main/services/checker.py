@@ -6,54 +6,37 @@ analyzed for detailed error feedback, but it does not affect the score.
 """
 
 import asyncio
+import hashlib
 import logging
-import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from html import escape
 
-import httpx
-
 from config import (
-    AI_TIMEOUT,
-    GROQ_API_KEY,
-    TOGETHER_API_KEY,
+    CHECKER_EXECUTOR,
+    CHECKER_PROCESSES,
+    GRAMMAR_BATCH_MAX_SIZE,
+    GRAMMAR_BATCH_MAX_WAIT_MS,
+    LANGUAGE_TOOL_ACQUIRE_TIMEOUT,
+    LANGUAGE_TOOL_INSTANCES,
+    LANGUAGE_TOOL_URL,
+    REFERENCE_INDEX_SIZE,
+    RESULT_CACHE_PERSIST,
+    RESULT_CACHE_SIZE,
 )
+from services import error_lexicon
+from services.checker_pool import CheckerProcessPool, CheckRequest
+from services.grammar_pool import LanguageToolPool, language_tool_factory
+from services.grammar_rules import ReferenceFeatures, apply_rules
+from services.result_cache import ResultCache, ResultKey, answer_key
+from services.semantic import get_scorer, scorer_name
+from utils.cache import TTLCache
+from utils.text import tokens
 
 logger = logging.getLogger(__name__)
 
-_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?", re.IGNORECASE)
-_ARTICLE_RE = re.compile(r"\b(a|an|the)\b", re.IGNORECASE)
-_PREPOSITION_RE = re.compile(r"\b(at|in|on|by|to|from|for|with|of|as|about|during|before|after|around|between|into|through|under|over|above|below)\b", re.IGNORECASE)
-_VERB_FORM_RE = re.compile(r"\b(am|is|are|was|were|be|being|been|have|has|had|do|does|did|will|would|can|could|may|might|must|should)\b", re.IGNORECASE)
-_CONTRACTIONS = {
-    "i'm": "i am",
-    "you're": "you are",
-    "he's": "he is",
-    "she's": "she is",
-    "it's": "it is",
-    "we're": "we are",
-    "they're": "they are",
-    "can't": "cannot",
-    "won't": "will not",
-    "don't": "do not",
-    "doesn't": "does not",
-    "didn't": "did not",
-    "isn't": "is not",
-    "aren't": "are not",
-    "wasn't": "was not",
-    "weren't": "were not",
-    "i'll": "i will",
-    "you'll": "you will",
-    "we'll": "we will",
-    "they'll": "they will",
-}
-
-_GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
-_TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-
-_GROQ_MODEL = "llama-3.1-8b-instant"
-_TOGETHER_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
-
 
 @dataclass(frozen=True)
 class ValidationScores:
@@ -73,34 +56,14 @@ def _apply_semantic_gate(score: int, semantic: float) -> int:
     return score
 
 
-def _normalize(text: str) -> str:
-    value = text.strip().lower()
-    for old, new in _CONTRACTIONS.items():
-        value = re.sub(rf"\b{re.escape(old)}\b", new, value)
-    value = re.sub(r"[^a-z0-9'\s]", " ", value)
-    return re.sub(r"\s+", " ", value).strip()
-
-
-def _tokens(text: str) -> list[str]:
-    return _WORD_RE.findall(_normalize(text))
-
-
-def _best_reference(user_answer: str, references: list[str]) -> str:
-    normalized_answer = _normalize(user_answer)
-    return max(
-        references,
-        key=lambda item: _lexical_similarity(normalized_answer, _normalize(item)),
-    )
-
-
 def _lexical_similarity(left: str, right: str) -> float:
     try:
         from rapidfuzz import fuzz
 
         return float(fuzz.token_set_ratio(left, right))
     except Exception:
-        left_tokens = set(_tokens(left))
-        right_tokens = set(_tokens(right))
+        left_tokens = set(tokens(left))
+        right_tokens = set(tokens(right))
         if not left_tokens and not right_tokens:
             return 100.0
         if not left_tokens or not right_tokens:
@@ -108,236 +71,289 @@ def _lexical_similarity(left: str, right: str) -> float:
         return 100.0 * len(left_tokens & right_tokens) / len(left_tokens | right_tokens)
 
 
-def _semantic_score(user_answer: str, references: list[str]) -> float:
-    """Pure lexical similarity via rapidfuzz — fast, no external downloads."""
-    return max(_lexical_similarity(user_answer, ref) for ref in references)
-
+# ─── Reference features ──────────────────────────────────────
+# Everything the checker needs to know about a reference is derived once
+# per phrase and cached, so each answer only analyzes the user's text.
+
+_reference_index = TTLCache(maxsize=REFERENCE_INDEX_SIZE)
+
+
+def _reference_features(
+    references: list[str],
+    phrase_id: int | None = None,
+) -> tuple[ReferenceFeatures, ...]:
+    key = phrase_id if phrase_id is not None else tuple(references)
+    cached = _reference_index.get(key)
+    # A phrase id may outlive an edit of its answers; rebuild when texts differ.
+    if cached is not None and [item.text for item in cached] == references:
+        return cached
+    features = tuple(ReferenceFeatures.build(reference) for reference in references)
+    _reference_index.set(key, features)
+    return features
+
+
+def _best_match(user_answer: str, references: tuple[ReferenceFeatures, ...]) -> tuple[ReferenceFeatures, float]:
+    """Single pass over the references: (closest reference, its similarity)."""
+    scorer = get_scorer()
+    embedded = scorer.similarities(user_answer, [item.text for item in references]) if scorer else None
+    best, best_score = references[0], -1.0
+    for index, reference in enumerate(references):
+        score = _lexical_similarity(user_answer, reference.text)
+        if embedded is not None:
+            score = max(score, embedded[index])
+        if score > best_score:
+            best, best_score = reference, score
+    return best, best_score
+
+
+language_tool = LanguageToolPool(
+    language_tool_factory(LANGUAGE_TOOL_URL),
+    size=LANGUAGE_TOOL_INSTANCES,
+    acquire_timeout=LANGUAGE_TOOL_ACQUIRE_TIMEOUT,
+)
 
-_language_tool = None
-_language_tool_loading = False
-_language_tool_loaded = False
 
-def _get_language_tool():
-    global _language_tool, _language_tool_loading, _language_tool_loaded
-    if _language_tool_loaded:
-        return _language_tool
-    if _language_tool_loading:
-        return None
+# ─── Grammar micro-batching ──────────────────────────────────
+# Answers that arrive within max_wait of each other are checked as one
+# multi-paragraph document, one LanguageTool round trip per batch, and the
+# matches are split back per answer by offset.
+
+_PARAGRAPH_BREAK = "\n\n"
+# Rules that look at neighbouring sentences/paragraphs would see the other
+# answers of the batch. Their IDs are families (EN_REPEATEDWORDS_NICE,
+# ENGLISH_WORD_REPEAT_RULE, ...), so they are matched by prefix and
+# category. An answer that gets one of them is re-checked on its own, so
+# its feedback never depends on what else was in the batch.
+_CONTEXT_RULE_PREFIXES = (
+    "ENGLISH_WORD_REPEAT",
+    "EN_REPEATEDWORDS",
+    "PARAGRAPH_REPEAT",
+    "PUNCTUATION_PARAGRAPH_END",
+    "WHITESPACE_RULE",
+)
+_CONTEXT_CATEGORIES = frozenset({"REPETITIONS", "REPETITIONS_STYLE"})
+
+
+def _context_dependent(match) -> bool:
+    return match.ruleId.startswith(_CONTEXT_RULE_PREFIXES) or getattr(match, "category", None) in _CONTEXT_CATEGORIES
+
+
+def _join_paragraphs(texts: list[str]) -> tuple[str, list[tuple[int, int]]]:
+    """One document of paragraphs plus each text's (start, end) span in it."""
+    spans: list[tuple[int, int]] = []
+    position = 0
+    for text in texts:
+        spans.append((position, position + len(text)))
+        position += len(text) + len(_PARAGRAPH_BREAK)
+    return _PARAGRAPH_BREAK.join(texts), spans
+
+
+def _split_matches(matches: list, spans: list[tuple[int, int]]) -> tuple[list[list], set[int]]:
+    """
+    Assign each match to the answer whose span contains it, with local
+    offsets. Also returns the answers that must be re-checked alone: those
+    with a context-dependent match or a match running past their end.
+    """
+    per_answer: list[list] = [[] for _ in spans]
+    recheck: set[int] = set()
+    starts = [start for start, _ in spans]
+    for match in matches:
+        index = bisect_right(starts, match.offset) - 1
+        if index < 0:
+            continue
+        start, end = spans[index]
+        if match.offset >= end:
+            continue  # inside the separator
+        if _context_dependent(match) or match.offset + match.errorLength > end:
+            recheck.add(index)
+            continue
+        match.offset -= start
+        per_answer[index].append(match)
+    return per_answer, recheck
+
+
+class GrammarBatcher:
+    def __init__(self, pool: LanguageToolPool, max_batch: int, max_wait: float):
+        self._pool = pool
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max(0.0, max_wait)
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.answers = 0
+        self.largest = 0
+        self.rechecks = 0
+
+    async def check(self, text: str) -> list | None:
+        if not self._pool.available:
+            return None
+        if self._max_batch == 1 or self._max_wait == 0:
+            self.batches += 1
+            self.answers += 1
+            self.largest = max(self.largest, 1)
+            return await asyncio.to_thread(self._pool.check, text)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.answers += len(batch)
+        self.largest = max(self.largest, len(batch))
+
+        document, spans = _join_paragraphs([text for text, _ in batch])
+
+        try:
+            matches = await asyncio.to_thread(self._pool.check, document)
+            if matches is None:
+                results = [None] * len(batch)
+            else:
+                results, recheck = _split_matches(matches, spans)
+                if len(batch) > 1 and recheck:
+                    self.rechecks += len(recheck)
+                    alone = await asyncio.gather(
+                        *(asyncio.to_thread(self._pool.check, batch[index][0]) for index in sorted(recheck))
+                    )
+                    for index, single in zip(sorted(recheck), alone):
+                        results[index] = single
+                elif recheck:
+                    # A batch of one is already the answer on its own
+                    results = [matches]
+        except Exception as e:
+            logger.warning("grammar_batch_failed: %s", e)
+            results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "answers": self.answers,
+            "avg_batch": round(self.answers / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.largest,
+            "rechecks": self.rechecks,
+        }
+
+
+grammar_batcher = GrammarBatcher(
+    language_tool,
+    max_batch=GRAMMAR_BATCH_MAX_SIZE,
+    max_wait=GRAMMAR_BATCH_MAX_WAIT_MS / 1000,
+)
 
-    import shutil
-    if not shutil.which("java"):
-        logger.warning("LanguageTool disabled: Java runtime (java) is not installed or not in PATH.")
-        _language_tool_loaded = True
-        return None
+checker_processes = (
+    CheckerProcessPool(CHECKER_PROCESSES) if CHECKER_EXECUTOR == "process" else None
+)
 
-    _language_tool_loading = True
-    try:
-        import language_tool_python
+_CHECK_INLINE = object()
 
-        _language_tool = language_tool_python.LanguageTool("en-US")
-        _language_tool_loaded = True
-    except Exception as e:
-        logger.warning("language_tool_unavailable: %s", e)
-        _language_tool_loaded = True
-    finally:
-        _language_tool_loading = False
 
-    return _language_tool
+def _plain_matches(matches: list | None) -> list[tuple[str, str]] | None:
+    """LanguageTool matches as picklable (issue type, message) pairs."""
+    if matches is None:
+        return None
+    return [(item.ruleIssueType, item.message) for item in matches]
 
 
-def _grammar_score(user_answer: str, reference: str, level: str) -> tuple[float, list[str]]:
-    tool = _get_language_tool()
-    words = max(1, len(_tokens(user_answer)))
+def _grammar_score(
+    user_answer: str,
+    reference: ReferenceFeatures,
+    level: str,
+    matches: list[tuple[str, str]] | None,
+) -> tuple[float, list[str]]:
+    words = max(1, len(tokens(user_answer)))
     issues: list[str] = []
 
-    if tool is None:
-        score = _heuristic_grammar_score(user_answer, reference, issues)
+    if matches is None:
+        score = 100.0
     else:
-        matches = tool.check(user_answer)
         # Exclude misspelling and typographical errors entirely as spelling is removed
         relevant = [
-            item
-            for item in matches
-            if item.ruleIssueType in {"grammar", "style"}
+            message
+            for issue_type, message in matches
+            if issue_type in {"grammar", "style"}
         ]
         penalty_per_issue = 12 if level in {"A1", "A2"} else 16
         score = 100.0 - min(70.0, (len(relevant) / words) * 100.0 + len(relevant) * penalty_per_issue)
-        issues.extend(item.message for item in relevant[:4])
+        issues.extend(relevant[:4])
 
-    score = _apply_tense_article_penalties(score, user_answer, reference, issues)
-    score = _apply_verb_form_penalties(score, user_answer, reference, issues)
-    score = _apply_preposition_penalties(score, user_answer, reference, issues)
-    score = _apply_tense_and_capitalization_penalties(score, user_answer, reference, issues)
+    score = apply_rules(score, user_answer, reference, issues, heuristics=matches is None)
     return max(1.0, score), issues
 
 
-def _heuristic_grammar_score(user_answer: str, reference: str, issues: list[str]) -> float:
-    score = 100.0
-    answer = user_answer.strip()
-    if answer and answer[0].islower():
-        score -= 5
-        issues.append("Start the sentence with a capital letter.")
-    if len(_tokens(answer)) >= 5 and not re.search(r"[.!?]$", answer):
-        score -= 5
-        issues.append("Add sentence punctuation.")
-    if abs(len(_tokens(answer)) - len(_tokens(reference))) >= 5:
-        score -= 8
-        issues.append("The answer length is far from the reference translation.")
-    return score
+# ─── Result cache ─────────────────────────────────────────────
 
+# Bump on any change to scoring or feedback that the parts below do not
+# capture (rules, weights, messages); older cached results stop matching.
+CHECKER_VERSION = "3"
 
-def _apply_tense_article_penalties(
-    score: float,
-    user_answer: str,
-    reference: str,
-    issues: list[str],
-) -> float:
-    answer_norm = _normalize(user_answer)
-    reference_norm = _normalize(reference)
-
-    answer_articles = _ARTICLE_RE.findall(answer_norm)
-    reference_articles = _ARTICLE_RE.findall(reference_norm)
-    if reference_articles and not answer_articles:
-        score -= 6
-        issues.append("Check missing articles such as a, an, or the.")
-
-    tense_markers = ("will", "was", "were", "did", "have", "has", "had")
-    missing_tense = [
-        marker
-        for marker in tense_markers
-        if re.search(rf"\b{marker}\b", reference_norm)
-        and not re.search(rf"\b{marker}\b", answer_norm)
-    ]
-    if missing_tense:
-        score -= min(12, len(missing_tense) * 6)
-        issues.append("Check verb tense and auxiliary verbs.")
 
-    return score
+def checker_version(with_languagetool: bool, semantic: str, references: tuple[str, ...] = ()) -> str:
+    """
+    semantic: the scorer that actually runs (scorer_name()), not the
+    configured one. references: the phrase's answers; an edited answer
+    keeps its phrase id, so their hash is part of the version.
+    """
+    grammar = "languagetool" if with_languagetool else "heuristics"
+    return f"{CHECKER_VERSION}:{grammar}:{semantic}:{error_lexicon.digest()}:{_references_digest(references)}"
 
 
-def _apply_verb_form_penalties(
-    score: float,
-    user_answer: str,
-    reference: str,
-    issues: list[str],
-) -> float:
-    """Check for incorrect verb forms and double auxiliary verbs (e.g., 'I'm usually work')."""
-    answer_norm = _normalize(user_answer)
-    answer_lower = user_answer.lower()
-
-    # Check for patterns like "I'm work", "he's go", "we're make" (auxiliary + bare verb)
-    auxiliary_patterns = [
-        r"\b(i'm|you're|he's|she's|it's|we're|they're)\s+(work|go|make|see|come|take|get|give|find|tell|ask|know|think|feel|try|stop|seem|appear|become|start|continue|begin|help|want|need|like|love|hate|prefer)",
-        r"\bam\s+(work|go|make|see|come|take|get|give|find|tell|ask|know|think|feel|try|stop|seem|appear|become|start|continue|begin|help|want|need|like|love|hate|prefer)",
-        r"\b(is|are|was|were)\s+(work|go|make|see|come|take|get|give|find|tell|ask|know|think|feel|try|stop|seem|appear|become|start|continue|begin|help|want|need|like|love|hate|prefer)\b(?!\s*ing)",
-    ]
+@lru_cache(maxsize=4096)
+def _references_digest(references: tuple[str, ...]) -> str:
+    return hashlib.blake2b("\x1f".join(references).encode(), digest_size=6).hexdigest()
 
-    for pattern in auxiliary_patterns:
-        if re.search(pattern, answer_lower):
-            score -= 8
-            if "Check verb forms" not in "".join(issues):
-                issues.append("Check verb forms - avoid double auxiliaries (e.g., 'I'm work' should be 'I work').")
-            break
 
-    return score
+_semantic_name: str | None = None
 
 
-def _apply_preposition_penalties(
-    score: float,
-    user_answer: str,
-    reference: str,
-    issues: list[str],
-) -> float:
-    """Check for incorrect prepositions and missing prepositions."""
-    answer_norm = _normalize(user_answer)
-    reference_norm = _normalize(reference)
-
-    # Common preposition corrections
-    preposition_fixes = {
-        "in weekend": "at weekend",
-        "in the weekend": "at the weekend",
-        "on the weekends": "at weekends",
-        "in weekends": "at weekends",
-        "work in weekends": "work at weekends",
-        "work in the weekend": "work at the weekend",
-        "on afternoon": "in the afternoon",
-        "in morning": "in the morning",
-        "in night": "at night",
-    }
+async def _semantic_scorer_name() -> str:
+    global _semantic_name
+    if checker_processes is not None:
+        # The workers load their own scorer
+        await checker_processes.start()
+        return checker_processes.semantic or "lexical"
+    if _semantic_name is None:
+        # The first call may load the model: not on the event loop
+        _semantic_name = await asyncio.to_thread(scorer_name)
+    return _semantic_name
 
-    for wrong, correct in preposition_fixes.items():
-        if wrong in answer_norm and correct not in answer_norm:
-            score -= 7
-            if "Check prepositions" not in "".join(issues):
-                issues.append(f"Check prepositions - use '{correct}' instead of '{wrong}'.")
-            break
 
-    return score
+async def _load_result(*key) -> dict | None:
+    from db.repository import get_check_result
 
+    return await get_check_result(*key)
 
-def _apply_tense_and_capitalization_penalties(
-    score: float,
-    user_answer: str,
-    reference: str,
-    issues: list[str],
-) -> float:
-    """Check for incorrect verb tense (Present Continuous vs Simple Present) and capitalization errors."""
-    answer_lower = user_answer.lower()
-    
-    # Check for Present Continuous when Simple Present should be used
-    # Patterns like "are living", "is working", "are going" in habitual/general statements
-    present_continuous_patterns = [
-        r"\b(are|is|am)\s+(living|working|going|staying|studying|playing|eating|drinking|using|driving|reading|writing)",
-    ]
-    
-    # Check if reference uses simple present (live, work, go, stay, etc.)
-    simple_present_verbs = r"\b(live|work|go|stay|study|play|eat|drink|use|drive|read|write)\b"
-    
-    if re.search(simple_present_verbs, reference.lower()):
-        for pattern in present_continuous_patterns:
-            if re.search(pattern, answer_lower):
-                # Check if this is really wrong by seeing if reference doesn't use continuous
-                if not re.search(r"\b(are|is|am)\s+\w+ing\b", reference.lower()):
-                    score -= 8
-                    if "Check verb tense" not in "".join(issues):
-                        issues.append("Check verb tense - use simple present ('live') instead of continuous ('are living').")
-                    break
-    
-    # Check for capitalization errors (proper nouns like city names should be capitalized)
-    # Extract words that should be capitalized
-    words_in_answer = user_answer.split()
-    lowercased_proper_nouns = []
-    
-    for i, word in enumerate(words_in_answer):
-        # Check if word is lowercased but should be capitalized
-        # (e.g., city names, country names - words that are capitalized in reference)
-        clean_word = re.sub(r'[^a-z]', '', word.lower())
-        if clean_word:
-            # Check if this word appears capitalized in reference
-            reference_words = reference.split()
-            for ref_word in reference_words:
-                ref_clean = re.sub(r'[^a-z]', '', ref_word.lower())
-                if clean_word == ref_clean and ref_word[0].isupper() and word[0].islower():
-                    # This word should be capitalized
-                    if word not in ['is', 'are', 'am', 'in', 'at', 'on', 'the', 'a', 'an', 'and', 'or']:
-                        lowercased_proper_nouns.append(word)
-    
-    if lowercased_proper_nouns:
-        score -= 5
-        noun_list = ", ".join(lowercased_proper_nouns[:2])
-        if "Check capitalization" not in "".join(issues):
-            issues.append(f"Check capitalization - capitalize proper nouns like '{noun_list}'.")
-    
-    return score
 
+async def _save_result(*key_and_result) -> None:
+    from db.repository import save_check_result
 
-def preload_models():
-    """Warm up the language tool (Java-based) if available. No-op otherwise."""
-    logger.info("Pre-loading language tool...")
-    try:
-        _get_language_tool()
-    except Exception as e:
-        logger.warning("Failed pre-loading language tool: %s", e)
+    await save_check_result(*key_and_result)
+
+
+result_cache = ResultCache(
+    RESULT_CACHE_SIZE,
+    load=_load_result if RESULT_CACHE_PERSIST else None,
+    save=_save_result if RESULT_CACHE_PERSIST else None,
+)
 
 
 async def check_translation(
@@ -348,27 +364,75 @@ async def check_translation(
     level: str,
     alternative_answers: list[str] | None = None,
     phrase_lang: str = "ru",
+    phrase_id: int | None = None,
 ) -> dict:
     references = [reference_english, *(alternative_answers or [])]
     references = list(dict.fromkeys(item.strip() for item in references if item and item.strip()))
     if not references:
         raise ValueError("At least one reference answer is required")
 
-    # Run deterministic checker - no AI involvement in scoring
-    res = await asyncio.to_thread(
-        _check_translation_sync,
-        references,
-        user_answer,
+    # Wait for LanguageTool startup so the result never depends on timing
+    await language_tool.ensure_started()
+    with_languagetool = language_tool.available
+
+    async def compute() -> tuple[dict, bool]:
+        matches = _plain_matches(await grammar_batcher.check(user_answer))
+
+        # Run deterministic checker - no AI involvement in scoring
+        if checker_processes is not None:
+            res = await checker_processes.run(
+                CheckRequest(
+                    tuple(references),
+                    user_answer,
+                    level,
+                    phrase_id,
+                    None if matches is None else tuple(matches),
+                )
+            )
+        else:
+            res = await asyncio.to_thread(
+                _check_translation_sync,
+                references,
+                user_answer,
+                level,
+                phrase_id,
+                matches,
+            )
+        # Heuristic feedback must not be cached under a LanguageTool version
+        return res, (matches is not None) == with_languagetool
+
+    key = ResultKey(
+        phrase_id if phrase_id is not None else tuple(references),
+        answer_key(user_answer),
         level,
+        checker_version(with_languagetool, await _semantic_scorer_name(), tuple(references)),
     )
+    return await result_cache.get_or_compute(key, compute)
 
-    return res
 
+def _check_translation_sync(
+    references: list[str],
+    user_answer: str,
+    level: str,
+    phrase_id: int | None = None,
+    grammar_matches: list | None | object = _CHECK_INLINE,
+) -> dict:
+    """grammar_matches: (issue type, message) pairs checked by the caller (None = unavailable)."""
+    if grammar_matches is _CHECK_INLINE:
+        grammar_matches = _plain_matches(language_tool.check(user_answer))
 
-def _check_translation_sync(references: list[str], user_answer: str, level: str) -> dict:
-    best_reference = _best_reference(user_answer, references)
-    semantic = _semantic_score(user_answer, references)
-    grammar, grammar_issues = _grammar_score(user_answer, best_reference, level)
+    best_reference, semantic = _best_match(user_answer, _reference_features(references, phrase_id))
+    return _score_answer(user_answer, level, best_reference, semantic, grammar_matches)
+
+
+def _score_answer(
+    user_answer: str,
+    level: str,
+    best_reference: ReferenceFeatures,
+    semantic: float,
+    grammar_matches: list[tuple[str, str]] | None,
+) -> dict:
+    grammar, grammar_issues = _grammar_score(user_answer, best_reference, level, grammar_matches)
 
     scores = ValidationScores(grammar=grammar, semantic=semantic)
     errors: list[str] = []
@@ -386,11 +450,103 @@ def _check_translation_sync(references: list[str], user_answer: str, level: str)
         "details": {
             "syntax": round(grammar, 1),
             "semantic": round(semantic, 1),
-            "matched_reference": best_reference,
+            "matched_reference": best_reference.text,
         },
     }
 
 
+# ─── Batch scoring ───────────────────────────────────────────
+# Offline re-scoring of many answers (e.g. historical scores after tuning).
+# Similarities for every (answer, reference) pair come from one rapidfuzz
+# call spread over all cores; LanguageTool sees answers in paragraph
+# batches; the rule penalties run per answer on precomputed references.
+
+def _pairwise_similarity(answers: list[str], references: list[str], workers: int) -> list[float]:
+    try:
+        import numpy as np
+        from rapidfuzz import fuzz, process
+
+        return process.cpdist(
+            answers,
+            references,
+            scorer=fuzz.token_set_ratio,
+            dtype=np.float64,
+            workers=workers,
+        ).tolist()
+    except ImportError:
+        return [_lexical_similarity(answer, reference) for answer, reference in zip(answers, references)]
+
+
+def _grammar_matches_batch(answers: list[str]) -> list[list[tuple[str, str]] | None]:
+    if not language_tool.start():
+        return [None] * len(answers)
+
+    size = max(1, GRAMMAR_BATCH_MAX_SIZE)
+    chunks = [answers[i:i + size] for i in range(0, len(answers), size)]
+
+    def check_chunk(texts: list[str]) -> list[list[tuple[str, str]] | None]:
+        document, spans = _join_paragraphs(texts)
+        matches = language_tool.check(document)
+        if matches is None:
+            return [None] * len(texts)
+        per_answer, recheck = _split_matches(matches, spans)
+        if len(texts) == 1 and recheck:
+            # A chunk of one is already the answer on its own
+            per_answer = [matches]
+        else:
+            # Context-dependent matches (repeats across paragraphs): check those answers alone
+            for index in recheck:
+                per_answer[index] = language_tool.check(texts[index])
+        return [_plain_matches(items) for items in per_answer]
+
+    with ThreadPoolExecutor(max(1, LANGUAGE_TOOL_INSTANCES)) as executor:
+        return [result for chunk in executor.map(check_chunk, chunks) for result in chunk]
+
+
+def check_translations_batch(
+    items: list[tuple],
+    grammar: bool = True,
+    workers: int = -1,
+) -> list[dict]:
+    """
+    Score many answers at once; returns the same dicts as check_translation.
+
+    items: (references, user_answer, level) or (references, user_answer,
+    level, phrase_id) tuples. grammar=False skips LanguageTool and uses the
+    heuristics, as when it is unavailable. workers is passed to rapidfuzz
+    (-1 = all cores). Blocking — run it in a thread from async code.
+    """
+    prepared = []
+    for references, user_answer, level, *rest in items:
+        references = list(dict.fromkeys(item.strip() for item in references if item and item.strip()))
+        if not references:
+            raise ValueError("At least one reference answer is required")
+        prepared.append((_reference_features(references, rest[0] if rest else None), user_answer, level))
+
+    pair_answers: list[str] = []
+    pair_references: list[str] = []
+    for features, user_answer, _ in prepared:
+        for reference in features:
+            pair_answers.append(user_answer)
+            pair_references.append(reference.text)
+    similarities = _pairwise_similarity(pair_answers, pair_references, workers)
+    scorer = get_scorer()
+    if scorer is not None:
+        similarities = list(map(max, similarities, scorer.pairwise(pair_answers, pair_references)))
+
+    answers = [user_answer for _, user_answer, _ in prepared]
+    grammar_matches = _grammar_matches_batch(answers) if grammar else [None] * len(prepared)
+
+    results = []
+    position = 0
+    for (features, user_answer, level), matches in zip(prepared, grammar_matches):
+        row = similarities[position:position + len(features)]
+        position += len(features)
+        best_index = max(range(len(row)), key=row.__getitem__)  # first maximum, like _best_match
+        results.append(_score_answer(user_answer, level, features[best_index], row[best_index], matches))
+    return results
+
+
 def _build_feedback(scores: ValidationScores, errors: list[str]) -> str:
     if scores.total >= 90:
         return "Excellent translation. The meaning and English form are both strong."
@@ -0,0 +1,129 @@
+"""
+Process-pool execution mode for the checker (CHECKER_EXECUTOR=process).
+
+Scoring is pure Python regex and rapidfuzz work. In the default thread
+mode it shares the GIL with everything else in the bot. Here it runs in a
+pool of worker processes instead. The workers are spawned and warmed
+(checker imported, patterns compiled, one check run) when the bot starts,
+not on the first answer.
+
+Requests and responses are pure data: a CheckRequest of strings and
+tuples goes in, and the plain result dict of _check_translation_sync
+comes out. LanguageTool stays in the parent process; its matches arrive
+already reduced to (issue type, message) pairs.
+
+If the pool breaks (a worker crashes), the call falls back to a thread
+and the pool is rebuilt on the next request.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class CheckRequest(NamedTuple):
+    references: tuple[str, ...]
+    user_answer: str
+    level: str
+    phrase_id: int | None
+    grammar_matches: tuple[tuple[str, str], ...] | None
+
+
+def run_check(request: CheckRequest) -> dict:
+    from services.checker import _check_translation_sync
+
+    return _check_translation_sync(
+        list(request.references),
+        request.user_answer,
+        request.level,
+        request.phrase_id,
+        None if request.grammar_matches is None else list(request.grammar_matches),
+    )
+
+
+def _warm_worker() -> None:
+    run_check(CheckRequest(("I live in Tashkent.",), "i live in tashkent", "B1", None, None))
+
+
+def _describe() -> tuple[int, str]:
+    from services.semantic import scorer_name
+
+    return os.getpid(), scorer_name()
+
+
+class CheckerProcessPool:
+    def __init__(self, processes: int = 0):
+        self._processes = processes or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = asyncio.Lock()
+        self.calls = 0
+        self.fallbacks = 0
+        self.rebuilds = 0
+        self.busy_time = 0.0
+        # Semantic scorer the workers ended up with (known once started)
+        self.semantic: str | None = None
+
+    async def start(self) -> None:
+        """Spawn and warm every worker (idempotent)."""
+        async with self._lock:
+            if self._executor is not None:
+                return
+            started = time.monotonic()
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            loop = asyncio.get_running_loop()
+            workers = await asyncio.gather(
+                *(loop.run_in_executor(self._executor, _describe) for _ in range(self._processes))
+            )
+            pids = [pid for pid, _ in workers]
+            self.semantic = workers[0][1]
+            logger.info(
+                "Checker process pool ready: %d workers in %.1fs",
+                len(set(pids)), time.monotonic() - started,
+            )
+
+    async def run(self, request: CheckRequest) -> dict:
+        if self._executor is None:
+            await self.start()
+
+        executor = self._executor
+        started = time.monotonic()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, run_check, request)
+        except BrokenProcessPool:
+            logger.error("Checker process pool broke, falling back to a thread")
+            self.fallbacks += 1
+            if self._executor is executor:
+                self._executor = None
+                self.rebuilds += 1
+                executor.shutdown(wait=False, cancel_futures=True)
+            return await asyncio.to_thread(run_check, request)
+        self.calls += 1
+        self.busy_time += time.monotonic() - started
+        return result
+
+    async def stop(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "processes": self._processes,
+            "running": self._executor is not None,
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "rebuilds": self.rebuilds,
+            "avg_ms": round(self.busy_time / self.calls * 1000, 2) if self.calls else 0.0,
+        }
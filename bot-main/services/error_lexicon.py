@@ -0,0 +1,132 @@
+"""
+Lexicon of common learner mistakes (wrong → right), matched in one pass.
+
+Literal entries live in data/error_lexicon.tsv (generated by
+admin/build_error_lexicon.py) and are stored normalized, so they are
+matched against the normalized answer's words. They go into a single
+word-level Aho–Corasick automaton, built on first use; families such as
+"did {pronoun} {past}" or "since {number} weeks" are slot patterns
+(services/error_patterns.py) instead of enumerated rows.
+
+Matching is per clause: the answer is split at punctuation before it is
+normalized, so "Wait, you forgot" never matches "wait you". A mistake
+that the reference itself contains ("Look at May") is not one.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import NamedTuple
+
+from config import ERROR_LEXICON_PATH
+from services import error_patterns
+from utils.aho_corasick import AhoCorasick
+from utils.text import normalize
+
+logger = logging.getLogger(__name__)
+
+# category → (feedback prefix, penalty)
+CATEGORIES = {
+    "preposition": ("Check prepositions", 7),
+    "verb_form": ("Check verb forms", 8),
+    "agreement": ("Check subject-verb agreement", 8),
+    "countable": ("Check countable and uncountable nouns", 6),
+    "comparative": ("Check comparatives", 6),
+    "word_choice": ("Check word choice", 6),
+}
+
+
+class Mistake(NamedTuple):
+    wrong: str
+    right: str
+    category: str
+
+    @property
+    def penalty(self) -> int:
+        return CATEGORIES[self.category][1]
+
+    @property
+    def message(self) -> str:
+        return f"{CATEGORIES[self.category][0]} - use '{self.right}' instead of '{self.wrong}'."
+
+
+@lru_cache(maxsize=4)
+def digest(path: str = ERROR_LEXICON_PATH) -> str:
+    """Short content hash of the lexicon file ("missing" when absent) and the patterns."""
+    try:
+        with open(path, "rb") as f:
+            content = hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+    except OSError:
+        content = "missing"
+    return f"{content}.{error_patterns.fingerprint()}"
+
+
+def load_entries(path: str = ERROR_LEXICON_PATH) -> list[Mistake]:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            wrong, right, category = line.rstrip("\n").split("\t")
+            if category in CATEGORIES:
+                entries.append(Mistake(wrong, right, category))
+    return entries
+
+
+_matcher: AhoCorasick | None = None
+_matcher_lock = threading.Lock()
+
+
+def load() -> AhoCorasick:
+    """Build the automaton once (thread-safe); later calls return it."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                try:
+                    entries = load_entries()
+                except OSError as e:
+                    logger.warning("error_lexicon_unavailable: %s", e)
+                    entries = []
+                _matcher = AhoCorasick((tuple(entry.wrong.split()), entry) for entry in entries)
+                logger.info("Error lexicon loaded: %d patterns", len(_matcher))
+    return _matcher
+
+
+# Clause boundaries: a lexicon phrase never spans one
+_CLAUSE_BREAK_RE = re.compile(r"[,;:.!?…()\[\]\"«»]+|\s[-–—]+\s")
+
+
+@lru_cache(maxsize=4096)
+def clauses(text: str) -> tuple[tuple[str, ...], ...]:
+    """Normalized words of each clause of text."""
+    return tuple(
+        words
+        for part in _CLAUSE_BREAK_RE.split(text)
+        if (words := tuple(normalize(part).split()))
+    )
+
+
+def _contains(normalized: str, phrase: str) -> bool:
+    return f" {phrase} " in f" {normalized} "
+
+
+def find(text: str, reference: str = "") -> Mistake | None:
+    """
+    The leftmost (then longest) known mistake in text, clause by clause.
+    Phrases that the normalized reference also contains are skipped.
+    """
+    matcher = load()
+    for words in clauses(text):
+        matches = list(matcher.iter_matches(words))
+        matches.extend(
+            (start, end, Mistake(*found)) for start, end, found in error_patterns.iter_matches(words)
+        )
+        if len(matches) > 1:
+            matches.sort(key=lambda match: (match[0], -match[1]))
+        for _, _, mistake in matches:
+            if not (reference and _contains(reference, mistake.wrong)):
+                return mistake
+    return None
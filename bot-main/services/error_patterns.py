@@ -0,0 +1,224 @@
+"""
+Slot patterns of the error lexicon: mistake families that are one rule
+over a word class instead of thousands of literal rows.
+
+"did you saw" and "did they went" are both did {pronoun} {past}, with the
+past form mapped back to its base for the suggestion; "since 3 weeks" and
+"at 1999" use regex slots for the number. Patterns are indexed by their
+first word, so a clause costs one dict lookup per word plus the few
+patterns that can start there. services/error_lexicon.py runs them next
+to the literal-phrase automaton.
+"""
+
+import hashlib
+import re
+from collections.abc import Iterator, Mapping, Sequence
+from typing import NamedTuple
+
+# ─── Word tables ──────────────────────────────────────────────
+# Also used by admin/build_error_lexicon.py for the literal entries.
+
+IRREGULAR = {
+    "have": "had", "do": "did", "go": "went", "say": "said", "make": "made",
+    "get": "got", "know": "knew", "think": "thought", "take": "took", "see": "saw",
+    "come": "came", "give": "gave", "find": "found", "tell": "told", "become": "became",
+    "leave": "left", "feel": "felt", "bring": "brought", "begin": "began", "keep": "kept",
+    "hold": "held", "write": "wrote", "stand": "stood", "hear": "heard", "mean": "meant",
+    "meet": "met", "run": "ran", "pay": "paid", "sit": "sat", "speak": "spoke",
+    "lose": "lost", "send": "sent", "build": "built", "understand": "understood",
+    "spend": "spent", "grow": "grew", "win": "won", "teach": "taught", "buy": "bought",
+    "catch": "caught", "sell": "sold", "fall": "fell", "choose": "chose", "drive": "drove",
+    "eat": "ate", "drink": "drank", "sleep": "slept", "swim": "swam", "ride": "rode",
+    "forget": "forgot", "draw": "drew", "fly": "flew", "throw": "threw", "wear": "wore",
+    "break": "broke", "steal": "stole", "fight": "fought", "feed": "fed", "shake": "shook",
+    "hide": "hid", "bite": "bit", "blow": "blew", "freeze": "froze", "forgive": "forgave",
+    "lend": "lent", "stick": "stuck", "swear": "swore", "seek": "sought", "shoot": "shot",
+    "rise": "rose", "sink": "sank", "dig": "dug", "spin": "spun", "deal": "dealt",
+    "cut": "cut", "put": "put", "hit": "hit", "hurt": "hurt", "shut": "shut",
+    "read": "read", "spread": "spread", "let": "let", "cost": "cost", "set": "set",
+}
+REGULAR = (
+    "work", "live", "play", "like", "love", "want", "need", "help", "start", "finish",
+    "watch", "study", "use", "try", "call", "ask", "open", "close", "walk", "talk",
+    "cook", "clean", "wash", "visit", "travel", "stay", "listen", "answer", "arrive",
+    "change", "move", "learn", "look", "wait", "hope", "plan", "remember", "decide",
+    "enjoy", "hate", "prefer", "explain", "carry", "dance", "smile", "return", "miss",
+    "show", "turn", "stop", "agree", "believe", "happen", "order", "kiss", "fix",
+    "relax", "rain", "snow", "invite", "prepare", "practice", "improve", "check",
+)
+# After a modal these can be correct (to found a company, to fell a tree, to saw wood)
+AMBIGUOUS_PAST = frozenset({"found", "fell", "saw"})
+PRONOUNS = ("i", "you", "he", "she", "it", "we", "they")
+MODALS = ("can", "could", "will", "would", "should", "must", "may", "might")
+# Verbs of the former double-auxiliary rule ("i am work", "is go")
+BARE_VERBS = (
+    "work", "go", "make", "see", "come", "take", "get", "give", "find", "tell", "ask",
+    "know", "think", "feel", "try", "stop", "seem", "appear", "become", "start",
+    "continue", "begin", "help", "want", "need", "like", "love", "hate", "prefer", "use",
+)
+# Can be a noun after is/are/was/were ("it is work")
+NOUN_LIKE = frozenset({"work", "love", "help", "need", "stop", "start", "like", "hate", "try", "feel", "find", "use"})
+# "I'm usually use": the adverb sits between the auxiliary and the verb
+FREQUENCY_ADVERBS = ("always", "usually", "often", "sometimes", "rarely", "seldom", "never")
+TIME_UNITS = ("year", "years", "month", "months", "week", "weeks", "day", "days", "hour", "hours", "minutes")
+
+
+def third_person(verb: str) -> str:
+    if verb == "have":
+        return "has"
+    if verb.endswith(("s", "sh", "ch", "x", "o")):
+        return verb + "es"
+    if verb.endswith("y") and verb[-2] not in "aeiou":
+        return verb[:-1] + "ies"
+    return verb + "s"
+
+
+def regular_past(verb: str) -> str:
+    if verb.endswith("e"):
+        return verb + "d"
+    if verb.endswith("y") and verb[-2] not in "aeiou":
+        return verb[:-1] + "ied"
+    return verb + "ed"
+
+
+PAST = {**IRREGULAR, **{verb: regular_past(verb) for verb in REGULAR}}
+
+
+def _same(words: Sequence[str]) -> dict[str, str]:
+    return {word: word for word in words}
+
+
+# Slot values: matched word → word in the suggestion
+_PAST_TO_BASE = {past: base for base, past in PAST.items() if past != base}
+_MODAL_PAST_TO_BASE = {
+    past: base for base, past in IRREGULAR.items() if past != base and past not in AMBIGUOUS_PAST
+}
+_THIRD_TO_BASE = {third_person(verb): verb for verb in PAST}
+_MODAL = _same(MODALS + ("cannot",))
+_NEGATABLE_MODAL = _same(("could", "will", "would", "should", "must"))
+_THIRD_PRONOUN = _same(("he", "she", "it"))
+_PLURAL_PRONOUN = _same(("we", "you", "they"))
+_VERB_AFTER_BE = [verb for verb in BARE_VERBS if verb not in NOUN_LIKE]
+_PAST_AFTER_BE = {verb: PAST.get(verb, regular_past(verb)) for verb in _VERB_AFTER_BE}
+
+
+# ─── Patterns ─────────────────────────────────────────────────
+# {name} is a slot: a word → suggestion mapping, or a regex kept as written.
+
+class Pattern(NamedTuple):
+    wrong: str
+    right: str
+    category: str
+    slots: Mapping[str, Mapping[str, str] | str]
+
+
+PATTERNS = (
+    Pattern("did {pronoun} {past}", "did {pronoun} {past}", "verb_form",
+            {"pronoun": _same(PRONOUNS), "past": _PAST_TO_BASE}),
+    Pattern("did not {past}", "did not {past}", "verb_form", {"past": _PAST_TO_BASE}),
+    Pattern("does not {third}", "does not {third}", "verb_form", {"third": _THIRD_TO_BASE}),
+    Pattern("does {pronoun} {third}", "does {pronoun} {third}", "verb_form",
+            {"pronoun": _THIRD_PRONOUN, "third": _THIRD_TO_BASE}),
+    Pattern("{modal} {third}", "{modal} {third}", "verb_form", {"modal": _MODAL, "third": _THIRD_TO_BASE}),
+    Pattern("{modal} not {third}", "{modal} not {third}", "verb_form",
+            {"modal": _NEGATABLE_MODAL, "third": _THIRD_TO_BASE}),
+    Pattern("{modal} {past}", "{modal} {past}", "verb_form", {"modal": _MODAL, "past": _MODAL_PAST_TO_BASE}),
+    Pattern("{modal} not {past}", "{modal} not {past}", "verb_form",
+            {"modal": _NEGATABLE_MODAL, "past": _MODAL_PAST_TO_BASE}),
+    Pattern("{modal} to", "{modal}", "verb_form", {"modal": _same(("can", "could", "must", "should", "might"))}),
+    Pattern("i am {verb}", "i {verb}", "verb_form", {"verb": _same(BARE_VERBS)}),
+    Pattern("i am {adverb} {verb}", "i {adverb} {verb}", "verb_form",
+            {"adverb": _same(FREQUENCY_ADVERBS), "verb": _same(BARE_VERBS)}),
+    Pattern("is {verb}", "{verb}", "verb_form", {"verb": {verb: third_person(verb) for verb in _VERB_AFTER_BE}}),
+    Pattern("are {verb}", "{verb}", "verb_form", {"verb": _same(_VERB_AFTER_BE)}),
+    Pattern("was {verb}", "{verb}", "verb_form", {"verb": _PAST_AFTER_BE}),
+    Pattern("were {verb}", "{verb}", "verb_form", {"verb": _PAST_AFTER_BE}),
+    Pattern("{pronoun} do not", "{pronoun} does not", "agreement", {"pronoun": _THIRD_PRONOUN}),
+    Pattern("{pronoun} was", "{pronoun} were", "agreement", {"pronoun": _PLURAL_PRONOUN}),
+    Pattern("{prep} {year}", "in {year}", "preposition",
+            {"prep": _same(("at", "on")), "year": r"1[5-9]\d\d|20\d\d"}),
+    Pattern("{prep} {hour} o'clock", "at {hour} o'clock", "preposition",
+            {"prep": _same(("in", "on")), "hour": r"[1-9]|1[0-2]"}),
+    Pattern("{prep} {number} {unit}", "for {number} {unit}", "preposition",
+            {"prep": _same(("since", "during")), "number": r"\d+", "unit": _same(TIME_UNITS)}),
+)
+
+_SLOT_RE = re.compile(r"^\{(\w+)\}$")
+
+
+class _Compiled(NamedTuple):
+    pattern: Pattern
+    # Per word: a literal, (slot, mapping) or (slot, compiled regex)
+    steps: tuple
+
+
+def _compile(pattern: Pattern) -> _Compiled:
+    steps = []
+    for word in pattern.wrong.split():
+        slot = _SLOT_RE.match(word)
+        if slot is None:
+            steps.append(word)
+            continue
+        spec = pattern.slots[slot[1]]
+        steps.append((slot[1], re.compile(spec) if isinstance(spec, str) else dict(spec)))
+    return _Compiled(pattern, tuple(steps))
+
+
+def _index(patterns: Sequence[Pattern]) -> dict[str, list[_Compiled]]:
+    by_first: dict[str, list[_Compiled]] = {}
+    for pattern in patterns:
+        compiled = _compile(pattern)
+        first = compiled.steps[0]
+        if isinstance(first, str):
+            starts = [first]
+        elif isinstance(first[1], Mapping):
+            starts = list(first[1])
+        else:
+            raise ValueError(f"pattern {pattern.wrong!r} must not start with a regex slot")
+        for word in starts:
+            by_first.setdefault(word, []).append(compiled)
+    return by_first
+
+
+_BY_FIRST = _index(PATTERNS)
+
+
+def _match_at(compiled: _Compiled, words: Sequence[str], start: int) -> dict[str, tuple[str, str]] | None:
+    """slot → (matched word, suggestion) when the pattern matches at start."""
+    if start + len(compiled.steps) > len(words):
+        return None
+    values: dict[str, tuple[str, str]] = {}
+    for offset, step in enumerate(compiled.steps):
+        word = words[start + offset]
+        if step.__class__ is str:
+            if word != step:
+                return None
+            continue
+        name, spec = step
+        if spec.__class__ is dict:
+            suggestion = spec.get(word)
+            if suggestion is None:
+                return None
+            values[name] = (word, suggestion)
+        elif spec.fullmatch(word):
+            values[name] = (word, word)
+        else:
+            return None
+    return values
+
+
+def iter_matches(words: Sequence[str]) -> Iterator[tuple[int, int, tuple[str, str, str]]]:
+    """(start, end, (wrong, right, category)) for every pattern match in words."""
+    for start, word in enumerate(words):
+        for compiled in _BY_FIRST.get(word, ()):
+            values = _match_at(compiled, words, start)
+            if values is None:
+                continue
+            end = start + len(compiled.steps)
+            right = compiled.pattern.right.format(**{name: value[1] for name, value in values.items()})
+            yield start, end, (" ".join(words[start:end]), right, compiled.pattern.category)
+
+
+def fingerprint() -> str:
+    """Changes with the patterns, so cached check results are invalidated."""
+    return hashlib.blake2b(repr(PATTERNS).encode(), digest_size=6).hexdigest()
@@ -0,0 +1,128 @@
+"""
+Background AI explanations for graded answers.
+
+The score message is sent first, without waiting for AI. The explanation
+is fetched in a background task and appended to that message with
+edit_text when ready. With AI_STREAMING the text shows up while it is
+generated, but a message is edited at most once per
+EXPLANATION_EDIT_INTERVAL to stay inside Telegram's edit limits; the
+complete explanation is always written last.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup, Message
+
+from config import AI_STREAMING, EXPLANATION_EDIT_INTERVAL
+from services.ai_explainer import explain_errors
+from utils import background
+
+logger = logging.getLogger(__name__)
+
+# The full message text for an explanation (None — the plain result)
+RenderFn = Callable[..., str]
+
+
+class ThrottledEditor:
+    """Edits one message: partial text at most every `interval` seconds, the final text always."""
+
+    def __init__(
+        self,
+        message: Message,
+        render: RenderFn,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        interval: float = EXPLANATION_EDIT_INTERVAL,
+        clock=time.monotonic,
+    ):
+        self._message = message
+        self._render = render
+        self._reply_markup = reply_markup
+        self._interval = interval
+        self._clock = clock
+        # The message itself was just sent
+        self._next_edit = clock() + interval
+        self._shown: str | None = None
+        self.edits = 0
+
+    async def partial(self, explanation: str) -> None:
+        if self._clock() < self._next_edit:
+            return
+        try:
+            await self._edit(self._render(ai_explanation=f"{explanation} …"), final=False)
+        except Exception as e:
+            # A lost partial is harmless; it must not fail the provider's stream
+            logger.debug("explanation_partial_edit_failed: %s", e)
+
+    async def final(self, explanation: str | None) -> None:
+        await self._edit(self._render(ai_explanation=explanation), final=True)
+
+    async def _edit(self, text: str, final: bool) -> None:
+        if text == self._shown:
+            return
+        self._next_edit = self._clock() + self._interval
+        try:
+            await self._send(text)
+        except TelegramRetryAfter as e:
+            if not final:
+                # Flood control: no partials until it is over
+                self._next_edit = self._clock() + e.retry_after
+                return
+            await asyncio.sleep(e.retry_after)
+            await self._send(text)
+        except TelegramBadRequest as e:
+            # "message is not modified", or the user deleted the message
+            logger.debug("explanation_edit_skipped: %s", e)
+            return
+        self._shown = text
+        self.edits += 1
+
+    async def _send(self, text: str) -> None:
+        await self._message.edit_text(text, reply_markup=self._reply_markup, parse_mode="HTML")
+
+
+# ─── Delivery ─────────────────────────────────────────────────
+
+_stats = {"scheduled": 0, "delivered": 0, "unavailable": 0, "failed": 0, "edits": 0}
+
+
+def schedule_explanation(
+    message: Message,
+    render: RenderFn,
+    reply_markup: InlineKeyboardMarkup | None = None,
+    **explain_kwargs,
+) -> asyncio.Task:
+    """
+    Fetch an explanation (explain_errors keyword arguments) in the
+    background and append it to message via render(ai_explanation=...).
+    """
+    _stats["scheduled"] += 1
+    return background.spawn(_deliver(ThrottledEditor(message, render, reply_markup), explain_kwargs))
+
+
+async def _deliver(editor: ThrottledEditor, explain_kwargs: dict) -> None:
+    try:
+        explanation = await explain_errors(
+            **explain_kwargs,
+            on_partial=editor.partial if AI_STREAMING else None,
+        )
+        if explanation:
+            await editor.final(explanation)
+            _stats["delivered"] += 1
+        else:
+            _stats["unavailable"] += 1
+            if editor.edits:
+                # The stream broke off after partial edits: back to the plain result
+                await editor.final(None)
+    except Exception as e:
+        _stats["failed"] += 1
+        logger.warning("explanation_delivery_failed: %s", e)
+    finally:
+        _stats["edits"] += editor.edits
+
+
+def delivery_stats() -> dict:
+    return dict(_stats)
@@ -8,7 +8,7 @@ restarts. AI generation is intentionally not used.
 
 import logging
 
-from db.supabase_client import get_unique_phrase, mark_phrase_seen
+from db.repository import get_unique_phrase
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +26,8 @@ async def generate_phrase(
 ) -> dict:
     """
     Returns a phrase that the user has not seen yet for this topic+level.
-    Marks it as seen immediately so it won't repeat until the full cycle
-    is exhausted and the history resets.
+    get_unique_phrase marks it as seen in the same call, so it won't repeat
+    until the full cycle is exhausted and the history resets.
     """
     phrase = await get_unique_phrase(user_id=user_id, topic_id=topic_id, level=level)
     if not phrase:
@@ -35,14 +35,6 @@ async def generate_phrase(
             f"No saved phrases for topic_id={topic_id}, level={level}"
         )
 
-    # Mark as seen so the next call returns a different phrase
-    await mark_phrase_seen(
-        user_id=user_id,
-        phrase_id=phrase["id"],
-        topic_id=topic_id,
-        level=level,
-    )
-
     logger.info(
         "Phrase delivered: id=%s topic_id=%s level=%s user_id=%s",
         phrase["id"], topic_id, level, user_id,
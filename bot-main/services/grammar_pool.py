@@ -0,0 +1,220 @@
+"""
+Pool of LanguageTool workers for the checker.
+
+Each worker is a language_tool_python client. Locally every client owns
+its own LanguageTool server (one JVM per instance), so checks run in
+parallel instead of queueing behind a single instance. With
+LANGUAGE_TOOL_URL set, the clients share one external server, and the
+pool only caps how many requests are in flight.
+
+Startup happens once: concurrent async callers share one start through
+SingleFlight, and worker threads wait on a lock. Callers never see a
+half-started pool. A worker whose check raises is closed and replaced.
+Idle workers are also probed periodically, so a dead JVM is restarted
+before a user hits it.
+
+check() returns None when LanguageTool is unavailable (no Java, no
+server, or every restart failed); the checker then uses its heuristics.
+"""
+
+import asyncio
+import logging
+import queue
+import shutil
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from utils.cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_PROBE_TEXT = "This is a short health check."
+
+
+class LanguageToolPool:
+    def __init__(
+        self,
+        factory: Callable[[], Any] | None,
+        size: int = 1,
+        acquire_timeout: float = 10.0,
+    ):
+        self._factory = factory
+        self._size = max(1, size)
+        self._acquire_timeout = acquire_timeout
+        self._idle: queue.Queue = queue.Queue()
+        self._workers = 0
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._singleflight = SingleFlight()
+        self._health_task: asyncio.Task | None = None
+        self.checks = 0
+        self.failures = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.wait_max = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self._workers > 0
+
+    # ─── Lifecycle ────────────────────────────────────────────
+
+    def start(self) -> bool:
+        """Create the workers (blocking, idempotent). True if any came up."""
+        with self._start_lock:
+            if self._started:
+                return self.available
+            if self._factory is not None:
+                for _ in range(self._size):
+                    worker = self._spawn()
+                    if worker is not None:
+                        self._idle.put(worker)
+                        self._workers += 1
+                logger.info("LanguageTool pool ready: %d/%d workers", self._workers, self._size)
+            self._started = True
+            return self.available
+
+    async def ensure_started(self) -> bool:
+        if self._started:
+            return self.available
+        return await self._singleflight.do("start", lambda: asyncio.to_thread(self.start))
+
+    def close(self) -> None:
+        with self._start_lock:
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._close(worker)
+            self._workers = 0
+            self._started = False
+
+    def _spawn(self) -> Any | None:
+        try:
+            return self._factory()
+        except Exception as e:
+            logger.warning("language_tool_unavailable: %s", e)
+            return None
+
+    @staticmethod
+    def _close(worker: Any) -> None:
+        try:
+            worker.close()
+        except Exception:
+            pass
+
+    def _restart(self, worker: Any) -> Any | None:
+        """Replace a broken worker; on failure the pool shrinks by one."""
+        self._close(worker)
+        replacement = self._spawn()
+        if replacement is None:
+            with self._start_lock:
+                self._workers -= 1
+            logger.error("LanguageTool worker lost, %d left", self._workers)
+            return None
+        self.restarts += 1
+        return replacement
+
+    # ─── Checks ───────────────────────────────────────────────
+
+    def check(self, text: str) -> list | None:
+        """Run one check on a free worker (blocking; call from a worker thread)."""
+        if not self._started:
+            self.start()
+        if not self.available:
+            return None
+
+        started = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self._acquire_timeout)
+        except queue.Empty:
+            self.timeouts += 1
+            logger.warning("No free LanguageTool worker within %.1fs", self._acquire_timeout)
+            return None
+        self.wait_max = max(self.wait_max, time.monotonic() - started)
+
+        try:
+            matches = worker.check(text)
+            self.checks += 1
+            return matches
+        except Exception as e:
+            self.failures += 1
+            logger.warning("LanguageTool check failed, restarting worker: %s", e)
+            worker = self._restart(worker)
+            if worker is None:
+                return None
+            try:
+                matches = worker.check(text)
+                self.checks += 1
+                return matches
+            except Exception:
+                self.failures += 1
+                return None
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+    def probe(self) -> None:
+        """Health-check the workers that are idle right now."""
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                worker.check(_PROBE_TEXT)
+            except Exception as e:
+                logger.warning("LanguageTool health check failed, restarting worker: %s", e)
+                worker = self._restart(worker)
+            if worker is not None:
+                self._idle.put(worker)
+
+    def start_health_checks(self, interval: float) -> None:
+        if interval <= 0 or self._health_task is not None:
+            return
+
+        async def loop():
+            while True:
+                await asyncio.sleep(interval)
+                if self.available:
+                    await asyncio.to_thread(self.probe)
+
+        self._health_task = asyncio.create_task(loop())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.to_thread(self.close)
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "workers": self._workers,
+            "idle": self._idle.qsize(),
+            "started": self._started,
+            "checks": self.checks,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+def language_tool_factory(remote_url: str = "") -> Callable[[], Any] | None:
+    """Factory for language_tool_python clients, or None when LT can't run here."""
+    if not remote_url and not shutil.which("java"):
+        logger.warning("LanguageTool disabled: Java runtime (java) is not installed or not in PATH.")
+        return None
+
+    def create():
+        import language_tool_python
+
+        if remote_url:
+            return language_tool_python.LanguageTool("en-US", remote_server=remote_url)
+        return language_tool_python.LanguageTool("en-US")
+
+    return create
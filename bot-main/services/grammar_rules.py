@@ -0,0 +1,240 @@
+"""
+Declarative grammar rules for the checker's feedback.
+
+Each rule is a row in RULES: a name, a check over the answer and the
+reference, and an optional dedupe marker. Patterns are compiled at import.
+The answer is analyzed once into an AnswerView (lowercase text,
+normalized text, tokens, words), and apply_rules() walks the table in a
+single pass over that shared view. Rule order is the order of the table;
+it decides the order of the feedback lines.
+
+Fixed wrong → right pairs (prepositions, verb forms, agreement, ...) are
+not rules of their own: they are entries of the error lexicon
+(services/error_lexicon.py), checked by the single known_mistake rule.
+
+Every rule counts evaluations, hits and cumulative time (rule_stats(), in
+/metrics), so expensive or never-firing rules are visible in production.
+With CHECKER_EXECUTOR=process the counters live in the worker processes.
+"""
+
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from services import error_lexicon
+from utils.text import normalize, tokens
+
+_ARTICLE_RE = re.compile(r"\b(a|an|the)\b", re.IGNORECASE)
+_TENSE_MARKERS = ("will", "was", "were", "did", "have", "has", "had")
+_TENSE_MARKER_RES = {marker: re.compile(rf"\b{marker}\b") for marker in _TENSE_MARKERS}
+_SIMPLE_PRESENT_RE = re.compile(r"\b(live|work|go|stay|study|play|eat|drink|use|drive|read|write)\b")
+_CONTINUOUS_RE = re.compile(r"\b(are|is|am)\s+\w+ing\b")
+_SENTENCE_END_RE = re.compile(r"[.!?]$")
+_NON_LETTER_RE = re.compile(r"[^a-z]")
+_HABITUAL_CONTINUOUS_RE = re.compile(
+    r"\b(are|is|am)\s+(living|working|going|staying|studying|playing|eating|drinking|using|driving|reading|writing)"
+)
+_NEVER_PROPER = frozenset({"is", "are", "am", "in", "at", "on", "the", "a", "an", "and", "or"})
+
+
+# ─── Reference and answer views ──────────────────────────────
+
+@dataclass(frozen=True)
+class ReferenceFeatures:
+    text: str
+    normalized: str
+    token_count: int
+    has_articles: bool
+    tense_markers: tuple[str, ...]
+    has_simple_present: bool
+    has_continuous: bool
+    capitalized_words: frozenset[str]
+
+    @classmethod
+    def build(cls, reference: str) -> "ReferenceFeatures":
+        normalized = normalize(reference)
+        lower = reference.lower()
+        return cls(
+            text=reference,
+            normalized=normalized,
+            token_count=len(tokens(reference)),
+            has_articles=bool(_ARTICLE_RE.search(normalized)),
+            tense_markers=tuple(
+                marker for marker in _TENSE_MARKERS if _TENSE_MARKER_RES[marker].search(normalized)
+            ),
+            has_simple_present=bool(_SIMPLE_PRESENT_RE.search(lower)),
+            has_continuous=bool(_CONTINUOUS_RE.search(lower)),
+            capitalized_words=_capitalized_words(reference),
+        )
+
+
+def _capitalized_words(reference: str) -> frozenset[str]:
+    """Capitalized words, except those that only start a sentence ("We live in Tashkent.")."""
+    words = reference.split()
+    return frozenset(
+        _NON_LETTER_RE.sub("", word.lower())
+        for index, word in enumerate(words)
+        if word[0].isupper() and index > 0 and not words[index - 1].endswith((".", "!", "?"))
+    )
+
+
+@dataclass(frozen=True)
+class AnswerView:
+    stripped: str
+    lower: str
+    normalized: str
+    tokens: tuple[str, ...]
+    words: tuple[str, ...]
+
+    @classmethod
+    def build(cls, answer: str) -> "AnswerView":
+        return cls(
+            stripped=answer.strip(),
+            lower=answer.lower(),
+            normalized=normalize(answer),
+            tokens=tokens(answer),
+            words=tuple(answer.split()),
+        )
+
+
+# ─── Rules ────────────────────────────────────────────────────
+# A check returns (penalty, message) when the rule fires, else None.
+
+Hit = tuple[float, str] | None
+
+
+def _lowercase_start(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    if answer.stripped and answer.stripped[0].islower():
+        return 5, "Start the sentence with a capital letter."
+    return None
+
+
+def _missing_punctuation(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    if len(answer.tokens) >= 5 and not _SENTENCE_END_RE.search(answer.stripped):
+        return 5, "Add sentence punctuation."
+    return None
+
+
+def _length_mismatch(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    if abs(len(answer.tokens) - reference.token_count) >= 5:
+        return 8, "The answer length is far from the reference translation."
+    return None
+
+
+def _missing_articles(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    if reference.has_articles and not _ARTICLE_RE.search(answer.normalized):
+        return 6, "Check missing articles such as a, an, or the."
+    return None
+
+
+def _missing_tense_markers(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    missing = sum(
+        1 for marker in reference.tense_markers if not _TENSE_MARKER_RES[marker].search(answer.normalized)
+    )
+    if missing:
+        return min(12, missing * 6), "Check verb tense and auxiliary verbs."
+    return None
+
+
+def _known_mistake(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    mistake = error_lexicon.find(answer.stripped, reference.normalized)
+    if mistake is not None:
+        return mistake.penalty, mistake.message
+    return None
+
+
+def _continuous_for_habit(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    if (
+        reference.has_simple_present
+        and not reference.has_continuous
+        and _HABITUAL_CONTINUOUS_RE.search(answer.lower)
+    ):
+        return 8, "Check verb tense - use simple present ('live') instead of continuous ('are living')."
+    return None
+
+
+def _lowercase_proper_nouns(answer: AnswerView, reference: ReferenceFeatures) -> Hit:
+    # One set lookup per answer word against the reference's capitalized words
+    nouns = [
+        word
+        for word in answer.words
+        if word[0].islower()
+        and word not in _NEVER_PROPER
+        and (clean := _NON_LETTER_RE.sub("", word.lower()))
+        and clean in reference.capitalized_words
+    ]
+    if nouns:
+        return 5, f"Check capitalization - capitalize proper nouns like '{', '.join(nouns[:2])}'."
+    return None
+
+
+@dataclass
+class GrammarRule:
+    name: str
+    check: Callable[[AnswerView, ReferenceFeatures], Hit]
+    # Skip the message (not the penalty) when an earlier issue contains this text
+    dedupe: str | None = None
+    # Only when LanguageTool is unavailable (it covers these itself)
+    heuristic_only: bool = False
+    evaluations: int = 0
+    hits: int = 0
+    time_ns: int = 0
+
+
+RULES: list[GrammarRule] = [
+    GrammarRule("lowercase_start", _lowercase_start, heuristic_only=True),
+    GrammarRule("missing_punctuation", _missing_punctuation, heuristic_only=True),
+    GrammarRule("length_mismatch", _length_mismatch, heuristic_only=True),
+    GrammarRule("missing_articles", _missing_articles),
+    GrammarRule("missing_tense_markers", _missing_tense_markers),
+    GrammarRule("known_mistake", _known_mistake),
+    GrammarRule("continuous_for_habit", _continuous_for_habit, dedupe="Check verb tense"),
+    GrammarRule("lowercase_proper_nouns", _lowercase_proper_nouns, dedupe="Check capitalization"),
+]
+
+_stats_lock = threading.Lock()
+
+
+def apply_rules(
+    score: float,
+    user_answer: str,
+    reference: ReferenceFeatures,
+    issues: list[str],
+    heuristics: bool,
+) -> float:
+    """Run the rule table once over the answer; appends messages to issues."""
+    answer = AnswerView.build(user_answer)
+    timings: list[tuple[GrammarRule, int, bool]] = []
+    for rule in RULES:
+        if rule.heuristic_only and not heuristics:
+            continue
+        started = time.perf_counter_ns()
+        hit = rule.check(answer, reference)
+        timings.append((rule, time.perf_counter_ns() - started, hit is not None))
+        if hit is None:
+            continue
+        penalty, message = hit
+        score -= penalty
+        if rule.dedupe is None or not any(rule.dedupe in issue for issue in issues):
+            issues.append(message)
+
+    with _stats_lock:
+        for rule, elapsed, fired in timings:
+            rule.evaluations += 1
+            rule.hits += fired
+            rule.time_ns += elapsed
+    return score
+
+
+def rule_stats() -> dict:
+    return {
+        rule.name: {
+            "evaluations": rule.evaluations,
+            "hits": rule.hits,
+            "time_ms": round(rule.time_ns / 1e6, 3),
+            "avg_us": round(rule.time_ns / rule.evaluations / 1e3, 2) if rule.evaluations else 0.0,
+        }
+        for rule in RULES
+    }
@@ -0,0 +1,119 @@
+"""
+Two-tier cache of full check results.
+
+Learners often send the same answer to the same phrase (most often the
+reference itself). A result is keyed by (phrase, answer, level, checker
+version):
+  * tier 1 — an in-process LRU (RESULT_CACHE_SIZE entries);
+  * tier 2 — the check_results table, read on a tier-1 miss and written
+    through the write-behind queue, so results survive restarts and are
+    shared between instances.
+
+The answer is only whitespace-normalized: case and punctuation change the
+feedback, so they stay part of the key. The checker version changes with
+the checker itself, which invalidates every older entry at once. It also
+carries a short hash of the phrase's reference answers: an answer edited
+in place keeps its phrase id, and its old results simply stop matching.
+"""
+
+import copy
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import NamedTuple
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ResultKey(NamedTuple):
+    # Phrase id, or the reference tuple for answers without one (tier 1 only)
+    phrase: Hashable
+    answer_key: str
+    level: str
+    checker_version: str
+
+    @property
+    def persistent(self) -> bool:
+        return isinstance(self.phrase, int)
+
+
+def answer_key(user_answer: str) -> str:
+    return " ".join(user_answer.split())
+
+
+LoadFn = Callable[[int, str, str, str], Awaitable[dict | None]]
+SaveFn = Callable[[int, str, str, str, dict], Awaitable[None]]
+
+
+class ResultCache:
+    def __init__(self, maxsize: int, load: LoadFn | None = None, save: SaveFn | None = None):
+        self._memory = TTLCache(maxsize=maxsize)
+        self._load = load
+        self._save = save
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.persistent_errors = 0
+        self._compute_time = 0.0
+
+    async def get_or_compute(self, key: ResultKey, compute: Callable[[], Awaitable[tuple[dict, bool]]]) -> dict:
+        """
+        Cached result for key, or compute() it and store it in both tiers.
+
+        compute() returns (result, cacheable); a result that does not match
+        the key's checker version (e.g. LanguageTool failed mid-check) is
+        returned but not stored.
+        """
+        result = self._memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(result)
+
+        if self._load is not None and key.persistent:
+            try:
+                result = await self._load(*key)
+            except Exception as e:
+                self.persistent_errors += 1
+                logger.warning("result_cache_load_failed: %s", e)
+            if result is not None:
+                self.persistent_hits += 1
+                self._memory.set(key, result)
+                return copy.deepcopy(result)
+
+        started = time.perf_counter()
+        result, cacheable = await compute()
+        self._compute_time += time.perf_counter() - started
+        self.misses += 1
+        if not cacheable:
+            return result
+
+        self._memory.set(key, copy.deepcopy(result))
+        if self._save is not None and key.persistent:
+            try:
+                await self._save(*key, result)
+            except Exception as e:
+                self.persistent_errors += 1
+                logger.warning("result_cache_save_failed: %s", e)
+        return result
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        avg_check_ms = self._compute_time * 1000 / self.misses if self.misses else 0.0
+        return {
+            "size": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "persistent_errors": self.persistent_errors,
+            "avg_check_ms": round(avg_check_ms, 2),
+            # Checks (LanguageTool + rules) not run thanks to the cache
+            "saved_checks": hits,
+            "saved_ms_estimate": round(hits * avg_check_ms, 1),
+        }
@@ -0,0 +1,264 @@
+"""
+Optional embedding-based meaning similarity for the checker.
+
+Lexical similarity (rapidfuzz) scores "I arrived late" against "I was
+late" poorly although the meaning is the same. With SEMANTIC_SCORER set,
+the checker also compares sentence embeddings and keeps the higher of the
+two similarities, so paraphrases are no longer punished while exact
+wording still scores as before.
+
+Embedders are pluggable (the Embedder protocol):
+  * SentenceTransformerEmbedder — a local CPU model (SEMANTIC_MODEL),
+    needs sentence-transformers;
+  * HashingEmbedder — deterministic hashed word n-grams, no download;
+    a stand-in for tests and benchmarks, not a meaning model.
+
+Reference embeddings are computed ahead of time (admin/load_phrases.py,
+admin/build_reference_vectors.py) into a vector file that is memory-mapped
+at runtime, so process workers share its pages and each check embeds only
+the user's answer and takes one batch of dot products. References missing
+from the file (phrases added after the build) are embedded on first use
+and cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Protocol
+
+from config import (
+    REFERENCE_INDEX_SIZE,
+    SEMANTIC_CACHE_SIZE,
+    SEMANTIC_COSINE_FLOOR,
+    SEMANTIC_MODEL,
+    SEMANTIC_SCORER,
+    SEMANTIC_VECTORS_PATH,
+)
+from utils.cache import TTLCache
+from utils.text import normalize, phrase_key, tokens
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    # Recorded in the vector file; vectors of another embedder are ignored
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> "np.ndarray":
+        """(len(texts), dim) float32 rows with unit L2 norm."""
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        words = tokens(text)
+        return [*words, *(f"{left} {right}" for left, right in zip(words, words[1:]))]
+
+    def embed(self, texts: list[str]) -> "np.ndarray":
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # blake2b, not hash(): vectors must match across processes
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return _unit_rows(vectors)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str = SEMANTIC_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> "np.ndarray":
+        import numpy as np
+
+        return np.asarray(
+            self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True),
+            dtype=np.float32,
+        )
+
+
+def _unit_rows(vectors: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def create_embedder(kind: str = SEMANTIC_SCORER) -> Embedder | None:
+    """None for the default lexical-only mode or when the engine is unavailable."""
+    if kind in ("", "lexical"):
+        return None
+    try:
+        if kind == "hashing":
+            import numpy  # noqa: F401
+
+            return HashingEmbedder()
+        if kind == "embedding":
+            return SentenceTransformerEmbedder()
+    except Exception as e:
+        logger.warning("Semantic scorer %r unavailable, using lexical similarity only: %s", kind, e)
+        return None
+    logger.warning("Unknown SEMANTIC_SCORER=%r, using lexical similarity only", kind)
+    return None
+
+
+# ─── Reference vector file ───────────────────────────────────
+# <path>.npy — float32 matrix, one row per reference text;
+# <path>.json — {"embedder", "dim", "keys"}: phrase_key of each row.
+
+def write_reference_vectors(texts: Iterable[str], embedder: Embedder, path: str = SEMANTIC_VECTORS_PATH) -> int:
+    import numpy as np
+
+    by_key = {phrase_key(text): text for text in texts if text and text.strip()}
+    keys = list(by_key)
+    vectors = embedder.embed([by_key[key] for key in keys]) if keys else np.zeros((0, embedder.dim), np.float32)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write beside the target and rename, so a running bot never maps a half-written file
+    np.save(f"{path}.tmp.npy", vectors.astype(np.float32))
+    with open(f"{path}.tmp.json", "w", encoding="utf-8") as f:
+        json.dump({"embedder": embedder.name, "dim": embedder.dim, "keys": keys}, f)
+    os.replace(f"{path}.tmp.npy", f"{path}.npy")
+    os.replace(f"{path}.tmp.json", f"{path}.json")
+    return len(keys)
+
+
+class ReferenceVectors:
+    def __init__(self, path: str, embedder: Embedder):
+        self._matrix = None
+        self._rows: dict[str, int] = {}
+        try:
+            import numpy as np
+
+            with open(f"{path}.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["embedder"] != embedder.name or meta["dim"] != embedder.dim:
+                logger.warning(
+                    "Reference vectors at %s were built with %s, not %s; ignoring them",
+                    path, meta["embedder"], embedder.name,
+                )
+                return
+            self._matrix = np.load(f"{path}.npy", mmap_mode="r")
+            self._rows = {key: row for row, key in enumerate(meta["keys"])}
+            logger.info("Reference vectors mapped: %d rows from %s.npy", len(self._rows), path)
+        except FileNotFoundError:
+            logger.info("No reference vectors at %s; references are embedded on demand", path)
+        except Exception as e:
+            logger.warning("Failed to map reference vectors at %s: %s", path, e)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> "np.ndarray | None":
+        row = self._rows.get(key)
+        return None if row is None else self._matrix[row]
+
+
+# ─── Scorer ───────────────────────────────────────────────────
+
+class EmbeddingScorer:
+    def __init__(self, embedder: Embedder, vectors_path: str = SEMANTIC_VECTORS_PATH):
+        self.embedder = embedder
+        self.vectors = ReferenceVectors(vectors_path, embedder)
+        self._answers = TTLCache(maxsize=SEMANTIC_CACHE_SIZE)
+        self._references = TTLCache(maxsize=REFERENCE_INDEX_SIZE)
+        self.reference_misses = 0
+
+    def _reference_matrix(self, references: list[str]) -> "np.ndarray":
+        import numpy as np
+
+        keys = [phrase_key(text) for text in references]
+        rows = [self.vectors.get(key) for key in keys]
+        rows = [row if row is not None else self._references.get(key) for row, key in zip(rows, keys)]
+        missing = [index for index, row in enumerate(rows) if row is None]
+        if missing:
+            self.reference_misses += len(missing)
+            for index, vector in zip(missing, self.embedder.embed([references[i] for i in missing])):
+                self._references.set(keys[index], vector)
+                rows[index] = vector
+        return np.stack(rows)
+
+    def _answer_matrix(self, answers: list[str]) -> "np.ndarray":
+        import numpy as np
+
+        keys = [normalize(answer) for answer in answers]
+        cached = {key: self._answers.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, vector in cached.items() if vector is None]
+        if missing:
+            # One model call for every new answer in the batch
+            for key, vector in zip(missing, self.embedder.embed(missing)):
+                self._answers.set(key, vector)
+                cached[key] = vector
+        return np.stack([cached[key] for key in keys])
+
+    def _to_score(self, cosines: "np.ndarray") -> list[float]:
+        import numpy as np
+
+        scaled = (cosines - SEMANTIC_COSINE_FLOOR) / (1.0 - SEMANTIC_COSINE_FLOOR) * 100.0
+        return np.clip(scaled, 0.0, 100.0).astype(float).tolist()
+
+    def similarities(self, answer: str, references: list[str]) -> list[float]:
+        """0–100 similarity of one answer to each reference."""
+        return self._to_score(self._reference_matrix(references) @ self._answer_matrix([answer])[0])
+
+    def pairwise(self, answers: list[str], references: list[str]) -> list[float]:
+        """0–100 similarity of answers[i] to references[i]."""
+        import numpy as np
+
+        if not answers:
+            return []
+        return self._to_score(
+            np.einsum("ij,ij->i", self._answer_matrix(answers), self._reference_matrix(references))
+        )
+
+    def stats(self) -> dict:
+        return {
+            "embedder": self.embedder.name,
+            "mapped_references": len(self.vectors),
+            "reference_misses": self.reference_misses,
+            "answers": self._answers.stats(),
+        }
+
+
+_scorer: EmbeddingScorer | None = None
+_scorer_ready = False
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> EmbeddingScorer | None:
+    """The configured scorer, created on first use; None in lexical-only mode."""
+    global _scorer, _scorer_ready
+    if not _scorer_ready:
+        with _scorer_lock:
+            if not _scorer_ready:
+                embedder = create_embedder()
+                _scorer = EmbeddingScorer(embedder) if embedder is not None else None
+                _scorer_ready = True
+    return _scorer
+
+
+def scorer_name() -> str:
+    """What scores meaning in this process: the embedder, or "lexical" (also after a fallback)."""
+    scorer = get_scorer()
+    return scorer.embedder.name if scorer is not None else "lexical"
+
+
+def scorer_stats() -> dict | None:
+    # Never creates the scorer (a model load has no place in /metrics)
+    return _scorer.stats() if _scorer is not None else None
@@ -0,0 +1,324 @@
+"""Tests for the AI explanation providers (services/ai_explainer.py) against local fake servers."""
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+
+from services import ai_explainer
+from services.ai_explainer import CircuitBreaker, Provider
+from utils.cache import SingleFlight, TTLCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_explanation_cache(monkeypatch):
+    monkeypatch.setattr(ai_explainer, "_explanations", TTLCache(maxsize=100))
+    monkeypatch.setattr(ai_explainer, "_explanation_flights", SingleFlight())
+    monkeypatch.setattr(ai_explainer, "_breakers", {})
+
+
+async def _fake_provider(reply: str, peers: list, delay: float = 0.0, status: int = 200) -> tuple[web.AppRunner, str]:
+    async def completions(request: web.Request) -> web.Response:
+        peers.append(request.transport.get_extra_info("peername"))
+        await request.json()
+        await asyncio.sleep(delay)
+        if status != 200:
+            return web.json_response({"error": "unavailable"}, status=status)
+        return web.json_response({"choices": [{"message": {"content": f" {reply} "}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1/chat/completions"
+
+
+def _explain(answer: str = "I late."):
+    return ai_explainer.explain_errors("Я опоздал.", "", "I was late.", answer, ["Missing verb"], "B1")
+
+
+def test_explanations_reuse_one_connection_per_provider(monkeypatch):
+    peers: list = []
+
+    async def scenario():
+        runner, url = await _fake_provider("Add 'was'.", peers)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [Provider("fake", url, "key", "model")])
+        await ai_explainer.start_ai_clients()
+        try:
+            return [await _explain(answer) for answer in ("I late.", "I am late.", "Me late.")]
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == ["Add 'was'."] * 3
+    assert len(peers) == 3
+    assert len(set(peers)) == 1
+    assert ai_explainer._clients == {}
+
+
+def test_falls_back_to_next_provider(monkeypatch):
+    peers: list = []
+
+    async def scenario():
+        runner, url = await _fake_provider("From the fallback.", peers)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [
+            Provider("down", "http://127.0.0.1:9/v1/chat/completions", "key", "model"),
+            Provider("unconfigured", url, "", "model"),
+            Provider("fallback", url, "key", "model"),
+        ])
+        try:
+            return await _explain()
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == "From the fallback."
+    assert len(peers) == 1
+
+
+def _hedge_scenario(monkeypatch, primary: dict, fallback: dict, hedge_delay: float = 0.1):
+    primary_peers: list = []
+    fallback_peers: list = []
+    monkeypatch.setattr(ai_explainer, "AI_HEDGE_DELAY", hedge_delay)
+    monkeypatch.setattr(ai_explainer, "AI_HEDGE_MIN_DELAY", 0.0)
+    monkeypatch.setattr(ai_explainer, "_latencies", {})
+
+    async def scenario():
+        first, first_url = await _fake_provider("From primary.", primary_peers, **primary)
+        second, second_url = await _fake_provider("From fallback.", fallback_peers, **fallback)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [
+            Provider("primary", first_url, "key", "model"),
+            Provider("fallback", second_url, "key", "model"),
+        ])
+        started = time.perf_counter()
+        try:
+            return await _explain(), time.perf_counter() - started
+        finally:
+            await ai_explainer.close_ai_clients()
+            await first.cleanup()
+            await second.cleanup()
+
+    result, elapsed = asyncio.run(scenario())
+    return result, elapsed, len(primary_peers), len(fallback_peers)
+
+
+def test_fast_primary_never_starts_the_fallback(monkeypatch):
+    result, _, primary, fallback = _hedge_scenario(monkeypatch, {}, {}, hedge_delay=1.0)
+    assert (result, primary, fallback) == ("From primary.", 1, 0)
+
+
+def test_slow_primary_is_hedged_and_cancelled(monkeypatch):
+    before = dict(ai_explainer._stats)
+    result, elapsed, primary, fallback = _hedge_scenario(monkeypatch, {"delay": 2.0}, {"delay": 0.05})
+    assert (result, primary, fallback) == ("From fallback.", 1, 1)
+    assert elapsed < 1.0
+    assert ai_explainer._stats["hedged"] == before["hedged"] + 1
+    assert ai_explainer._stats["cancelled"] == before["cancelled"] + 1
+
+
+def test_failed_primary_starts_fallback_without_waiting(monkeypatch):
+    result, elapsed, _, fallback = _hedge_scenario(monkeypatch, {"status": 503}, {}, hedge_delay=5.0)
+    assert (result, fallback) == ("From fallback.", 1)
+    assert elapsed < 1.0
+
+
+def test_hedge_delay_follows_observed_latency(monkeypatch):
+    monkeypatch.setattr(ai_explainer, "_latencies", {})
+    monkeypatch.setattr(ai_explainer, "AI_HEDGE_MIN_DELAY", 0.0)
+    provider = Provider("p", "http://unused", "key", "model")
+    assert ai_explainer.hedge_delay(provider) == ai_explainer.AI_HEDGE_DELAY
+    for ms in range(1, 101):
+        ai_explainer._latency(provider).record(ms / 1000)
+    assert ai_explainer.hedge_delay(provider) == 0.096
+
+
+def test_identical_explanations_share_one_call_and_are_cached(monkeypatch):
+    peers: list = []
+
+    async def scenario():
+        runner, url = await _fake_provider("Add 'was'.", peers, delay=0.05)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [Provider("fake", url, "key", "model")])
+        try:
+            concurrent = await asyncio.gather(*(_explain() for _ in range(5)))
+            return concurrent, await _explain()
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+    concurrent, repeated = asyncio.run(scenario())
+    assert concurrent == ["Add 'was'."] * 5
+    assert repeated == "Add 'was'."
+    assert len(peers) == 1
+    stats = ai_explainer.explanation_cache_stats()
+    assert stats["singleflight_shared"] == 4
+    assert stats["hits"] == 1
+
+
+def test_failed_explanation_is_not_cached(monkeypatch):
+    peers: list = []
+
+    async def scenario():
+        runner, url = await _fake_provider("", peers, status=503)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [Provider("fake", url, "key", "model")])
+        try:
+            return [await _explain() for _ in range(2)]
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == [None, None]
+    assert len(peers) == 2
+    assert len(ai_explainer._explanations) == 0
+
+
+def test_prompt_fingerprint_is_stable():
+    prompt = ai_explainer._build_prompt("Я опоздал.", "", "I was late.", "I late.", [], "B1")
+    assert ai_explainer.prompt_fingerprint(prompt) == ai_explainer.prompt_fingerprint(prompt)
+    assert ai_explainer.prompt_fingerprint(prompt) != ai_explainer.prompt_fingerprint(prompt + " ")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    clock = _Clock()
+    breaker = CircuitBreaker(window=10, min_calls=4, error_rate=0.5, cooldown=30.0, clock=clock)
+    for ok in (True, False, True, False):
+        ticket = breaker.allow()
+        assert ticket is not None
+        breaker.record_success(ticket) if ok else breaker.record_failure(ticket)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is None
+
+    clock.now = 30.0
+    probe = breaker.allow()  # the single half-open probe
+    assert probe is not None
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None
+    breaker.record_failure(probe)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 60.0
+    probe = breaker.allow()
+    breaker.release(probe)  # probe cancelled by a hedge: the next call probes instead
+    probe = breaker.allow()
+    assert probe is not None
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.error_rate() == 0.0
+    assert (breaker.opened, breaker.rejected) == (2, 2)
+
+
+def test_circuit_breaker_ignores_calls_admitted_before_it_opened():
+    clock = _Clock()
+    breaker = CircuitBreaker(window=10, min_calls=2, error_rate=0.5, cooldown=30.0, clock=clock)
+    stragglers = [breaker.allow() for _ in range(4)]
+    breaker.record_failure(stragglers.pop())
+    breaker.record_failure(stragglers.pop())
+    assert (breaker.state, breaker.opened) == (CircuitBreaker.OPEN, 1)
+
+    # In flight when it opened: no restarted cooldown, no outcomes
+    clock.now = 10.0
+    breaker.record_failure(stragglers.pop())
+    breaker.record_success(stragglers[0])
+    assert (breaker.state, breaker.opened, breaker.error_rate()) == (CircuitBreaker.OPEN, 1, 0.0)
+
+    clock.now = 30.0
+    probe = breaker.allow()
+    breaker.release(stragglers[0])  # a cancelled straggler does not free the probe slot
+    assert breaker.allow() is None
+    breaker.record_success(stragglers[0])
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_skips_the_provider(monkeypatch):
+    down_peers: list = []
+    fallback_peers: list = []
+    monkeypatch.setattr(ai_explainer, "AI_HEDGE_DELAY", 5.0)
+
+    async def scenario():
+        down, down_url = await _fake_provider("", down_peers, status=503)
+        fallback, fallback_url = await _fake_provider("From fallback.", fallback_peers)
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [
+            Provider("down", down_url, "key", "model"),
+            Provider("fallback", fallback_url, "key", "model"),
+        ])
+        try:
+            return [await _explain(f"I late {n}.") for n in range(8)]
+        finally:
+            await ai_explainer.close_ai_clients()
+            await down.cleanup()
+            await fallback.cleanup()
+
+    assert asyncio.run(scenario()) == ["From fallback."] * 8
+    assert len(down_peers) == ai_explainer.AI_BREAKER_MIN_CALLS
+    assert len(fallback_peers) == 8
+    stats = ai_explainer.provider_stats()["providers"]
+    assert stats["down"]["state"] == CircuitBreaker.OPEN
+    assert stats["fallback"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_call_timeout_follows_observed_p95(monkeypatch):
+    monkeypatch.setattr(ai_explainer, "_latencies", {})
+    provider = Provider("p", "http://unused", "key", "model")
+    assert ai_explainer.call_timeout(provider) == ai_explainer.AI_TIMEOUT
+    for _ in range(10):
+        ai_explainer._latency(provider).record(0.5)
+    assert ai_explainer.call_timeout(provider) == 0.5 * ai_explainer.AI_TIMEOUT_P95_FACTOR
+    assert ai_explainer._latency(provider).ewma == 0.5
+    for _ in range(100):
+        ai_explainer._latency(provider).record(0.01)
+    assert ai_explainer.call_timeout(provider) == ai_explainer.AI_MIN_TIMEOUT
+
+
+async def _fake_stream_provider(chunks: list[str]) -> tuple[web.AppRunner, str]:
+    async def completions(request: web.Request) -> web.StreamResponse:
+        assert (await request.json())["stream"] is True
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        for chunk in chunks:
+            event = {"choices": [{"delta": {"content": chunk}}]}
+            await resp.write(f"data: {json.dumps(event)}\n\n".encode())
+        await resp.write(b"data: [DONE]\n\n")
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1/chat/completions"
+
+
+def test_streamed_explanation_reports_partials(monkeypatch):
+    partials: list[str] = []
+
+    async def on_partial(text: str) -> None:
+        partials.append(text)
+
+    async def scenario():
+        runner, url = await _fake_stream_provider(["Add", " 'was'", " before 'late'."])
+        monkeypatch.setattr(ai_explainer, "PROVIDERS", [Provider("fake", url, "key", "model")])
+        try:
+            return await ai_explainer.explain_errors(
+                "Я опоздал.", "", "I was late.", "I late.", ["Missing verb"], "B1", on_partial=on_partial,
+            )
+        finally:
+            await ai_explainer.close_ai_clients()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == "Add 'was' before 'late'."
+    assert partials == ["Add", "Add 'was'", "Add 'was' before 'late'."]
@@ -0,0 +1,68 @@
+"""check_translations_batch must agree with the per-answer checker."""
+import re
+
+from services import checker
+from services.checker import _check_translation_sync, check_translations_batch
+from services.grammar_pool import LanguageToolPool
+
+ITEMS = [
+    (["I live in Tashkent."], "i live in tashkent", "B1"),
+    (["She was late for the meeting.", "She came late to the meeting."], "She came late to meeting", "A2", 7),
+    (["If I had known, I would have warned you.", "Had I known, I would have warned you."], "If I knew, I warn you", "B2"),
+    (["We're going home."], "We are going to home.", "B1"),
+]
+
+
+def test_batch_matches_single_checks():
+    expected = [_check_translation_sync(refs, answer, level, None, None) for refs, answer, level, *_ in ITEMS]
+    assert check_translations_batch(ITEMS, grammar=False) == expected
+
+
+def test_batch_strips_and_dedupes_references_like_check_translation():
+    [result] = check_translations_batch([([" I am home. ", "I am home.", ""], "I am home.", "B1")], grammar=False)
+    assert result["details"]["matched_reference"] == "I am home."
+    assert result["score"] == 100
+
+
+class _Match:
+    def __init__(self, offset, length, rule_id):
+        self.offset = offset
+        self.errorLength = length
+        self.ruleId = rule_id
+        self.ruleIssueType = "grammar"
+        self.message = rule_id
+
+
+class _Tool:
+    """Flags "goed", and words repeated earlier in the document (context-dependent)."""
+
+    def check(self, text):
+        matches, seen = [], set()
+        for word in re.finditer(r"\w+", text):
+            key = word.group().lower()
+            if key in seen:
+                matches.append(_Match(word.start(), len(key), f"EN_REPEATEDWORDS_{key.upper()}"))
+            seen.add(key)
+            if key == "goed":
+                matches.append(_Match(word.start(), 4, "GRAMMAR"))
+        return matches
+
+    def close(self):
+        pass
+
+
+def test_batch_with_grammar_matches_single_checks(monkeypatch):
+    pool = LanguageToolPool(_Tool, size=1)
+    pool.start()
+    monkeypatch.setattr(checker, "language_tool", pool)
+    items = [
+        (["I went home."], "I goed home.", "B1"),
+        (["We went home."], "We goed home.", "B1"),  # "goed" repeats the neighbour's
+        (["It is a nice day."], "It is a nice day.", "B1"),
+    ]
+
+    expected = [
+        _check_translation_sync(refs, answer, level, None, checker._plain_matches(pool.check(answer)))
+        for refs, answer, level in items
+    ]
+    assert check_translations_batch(items, grammar=True) == expected
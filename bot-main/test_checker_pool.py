@@ -0,0 +1,40 @@
+"""Tests for the process-pool checker mode (services/checker_pool.py)."""
+import asyncio
+
+from services.checker import _check_translation_sync
+from services.checker_pool import CheckerProcessPool, CheckRequest
+
+CASES = [
+    (("I live in Tashkent.",), "i live in tashkent", "B1"),
+    (("She was late for the meeting.", "She came late to the meeting."), "She was late to meeting.", "A2"),
+    (("If I had known, I would have warned you.",), "If I knew, I warn you", "B2"),
+]
+
+
+def test_process_pool_matches_thread_results():
+    requests = [
+        CheckRequest(refs, answer, level, None, (("grammar", "Possible agreement error."),))
+        for refs, answer, level in CASES
+    ]
+
+    async def scenario():
+        pool = CheckerProcessPool(2)
+        await pool.start()
+        try:
+            results = await asyncio.gather(*(pool.run(request) for request in requests))
+            return results, pool.stats(), pool.semantic
+        finally:
+            await pool.stop()
+
+    results, stats, semantic = asyncio.run(scenario())
+
+    expected = [
+        _check_translation_sync(list(request.references), request.user_answer, request.level, None,
+                                list(request.grammar_matches))
+        for request in requests
+    ]
+    assert results == expected
+    assert stats["calls"] == len(requests)
+    assert stats["fallbacks"] == 0
+    # Reported by the workers, for the result cache's checker version
+    assert semantic == "lexical"
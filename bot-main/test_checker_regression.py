@@ -0,0 +1,18 @@
+"""Score-drift gate: every case of bench/checker_corpus.json stays inside its band.
+
+Latency is gated by the benchmark runner (python -m bench.checker), not here.
+"""
+import pytest
+
+from bench.checker import check_case, load_corpus, score_drift
+
+CASES = load_corpus()
+
+
+def test_corpus_ids_are_unique():
+    assert len({case["id"] for case in CASES}) == len(CASES)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["id"] for case in CASES])
+def test_score_stays_in_band(case):
+    assert score_drift([case], [check_case(case, with_languagetool=False)]) == []
@@ -0,0 +1,90 @@
+"""Tests for the Aho–Corasick matcher and the learner-error lexicon."""
+import re
+
+import pytest
+
+from services import error_lexicon, error_patterns
+from services.checker import _check_translation_sync
+from utils.aho_corasick import AhoCorasick
+from utils.text import normalize
+
+
+def test_automaton_finds_overlapping_patterns():
+    matcher = AhoCorasick([(("he", "do"), "a"), (("do", "not"), "b"), (("he", "do", "not", "go"), "c")])
+    items = "i think he do not go".split()
+    assert sorted(matcher.iter_matches(items)) == [(2, 4, "a"), (2, 6, "c"), (3, 5, "b")]
+    assert list(matcher.iter_matches(["nothing", "here"])) == []
+    assert len(matcher) == 3
+
+
+def test_automaton_matches_whole_words_only():
+    matcher = AhoCorasick([(("in", "weekend"), "x")])
+    assert list(matcher.iter_matches("work in weekends".split())) == []
+    assert list(matcher.iter_matches("work in weekend".split())) == [(1, 3, "x")]
+
+
+def test_lexicon_entries_are_normalized_and_unique():
+    entries = error_lexicon.load_entries()
+    # Enumerable families are patterns, not rows
+    assert 300 < len(entries) < 1500
+    assert all(entry.wrong == normalize(entry.wrong) for entry in entries)
+    assert len({entry.wrong for entry in entries}) == len(entries)
+
+
+@pytest.mark.parametrize("answer, message", [
+    ("He goed to school.", "Check verb forms - use 'went' instead of 'goed'."),
+    ("Did you saw him?", "Check verb forms - use 'did you see' instead of 'did you saw'."),
+    ("She doesn't likes tea.", "Check verb forms - use 'does not like' instead of 'does not likes'."),
+    ("I was born at 1999.", "Check prepositions - use 'in 1999' instead of 'at 1999'."),
+    ("I need some informations.", "Check countable and uncountable nouns - use 'information' instead of 'informations'."),
+    ("I'm married with Anna.", "Check prepositions - use 'married to' instead of 'married with'."),
+    ("I live here since 12 years.", "Check prepositions - use 'for 12 years' instead of 'since 12 years'."),
+    ("He can't swims.", "Check verb forms - use 'cannot swim' instead of 'cannot swims'."),
+    ("She should not went there.", "Check verb forms - use 'should not go' instead of 'should not went'."),
+    ("They was at home.", "Check subject-verb agreement - use 'they were' instead of 'they was'."),
+])
+def test_lexicon_finds_common_mistakes(answer, message):
+    assert error_lexicon.find(answer).message == message
+
+
+@pytest.mark.parametrize("answer", [
+    "I'm going to school.",
+    "They are working in the morning.",
+    "I agree with you.",
+    "I usually work at weekends.",
+])
+def test_lexicon_ignores_correct_answers(answer):
+    assert error_lexicon.find(answer) is None
+
+
+def test_lexicon_does_not_match_across_punctuation():
+    assert error_lexicon.clauses("Wait, you forgot - my keys!") == (("wait",), ("you", "forgot"), ("my", "keys"))
+    assert error_lexicon.find("Wait, you forgot your keys.") is None
+    assert error_lexicon.find("I got more, then I left.") is None
+    assert error_lexicon.find("Wait you here.").wrong == "wait you"
+
+
+def test_lexicon_skips_phrases_the_reference_contains():
+    assert error_lexicon.find("Look at May.", reference=normalize("Look at May, she is dancing.")) is None
+    assert error_lexicon.find("Look at May.").wrong == "at may"
+
+
+def test_patterns_start_with_a_word_and_fill_every_slot():
+    for pattern in error_patterns.PATTERNS:
+        assert set(pattern.slots) == set(re.findall(r"\{(\w+)\}", pattern.wrong))
+    assert error_patterns.fingerprint() in error_lexicon.digest()
+
+
+@pytest.mark.parametrize("reference", [
+    "Wait, you forgot your keys.",
+    "Look at May, she is dancing.",
+    "I got more, then I left.",
+    "The children in the train were loud.",
+    "He said, the truth is simple.",
+    "We met in 1999, at 5 o'clock.",
+    "Did you see him yesterday?",
+])
+def test_reference_scored_against_itself_has_no_errors(reference):
+    result = _check_translation_sync([reference], reference, "B1", None, None)
+    assert result["score"] == 100
+    assert result["errors"] == []
@@ -0,0 +1,107 @@
+"""Background AI explanations appended to the score message (services/explanation_delivery.py)."""
+import asyncio
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText
+
+from services import explanation_delivery
+from services.explanation_delivery import ThrottledEditor, schedule_explanation
+from utils import background
+
+
+class _Message:
+    def __init__(self, fail_with: Exception | None = None):
+        self.edits: list[str] = []
+        self._fail_with = fail_with
+
+    async def edit_text(self, text, reply_markup=None, parse_mode=None):
+        if self._fail_with is not None:
+            error, self._fail_with = self._fail_with, None
+            raise error
+        self.edits.append(text)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _render(ai_explanation=None):
+    return "Score 60/100" + (f" | {ai_explanation}" if ai_explanation else "")
+
+
+def test_partials_are_throttled_and_final_is_always_written():
+    message, clock = _Message(), _Clock()
+    editor = ThrottledEditor(message, _render, interval=1.0, clock=clock)
+
+    async def scenario():
+        await editor.partial("Use")  # too soon after the score message
+        clock.now = 1.0
+        await editor.partial("Use 'was'")
+        clock.now = 1.5
+        await editor.partial("Use 'was' here")  # throttled
+        await editor.final("Use 'was' here.")
+        await editor.final("Use 'was' here.")  # unchanged: no edit
+
+    asyncio.run(scenario())
+    assert message.edits == ["Score 60/100 | Use 'was' …", "Score 60/100 | Use 'was' here."]
+    assert editor.edits == 2
+
+
+def test_flood_control_pauses_partials():
+    retry = TelegramRetryAfter(EditMessageText(text="x"), "Flood control", retry_after=10)
+    message, clock = _Message(fail_with=retry), _Clock()
+    editor = ThrottledEditor(message, _render, interval=1.0, clock=clock)
+
+    async def scenario():
+        clock.now = 1.0
+        await editor.partial("a")  # hits flood control
+        clock.now = 5.0
+        await editor.partial("ab")  # still waiting
+        clock.now = 11.0
+        await editor.partial("abc")
+
+    asyncio.run(scenario())
+    assert message.edits == ["Score 60/100 | abc …"]
+
+
+def test_explanation_is_appended_in_the_background(monkeypatch):
+    message = _Message()
+
+    async def fake_explain(**kwargs):
+        assert kwargs["user_answer"] == "I late."
+        await kwargs["on_partial"]("ignored while throttled")
+        return "Add 'was'."
+
+    monkeypatch.setattr(explanation_delivery, "explain_errors", fake_explain)
+
+    async def scenario():
+        task = schedule_explanation(message, _render, None, user_answer="I late.")
+        assert not message.edits  # the caller is not blocked
+        await task
+        await background.drain()
+
+    asyncio.run(scenario())
+    assert message.edits == ["Score 60/100 | Add 'was'."]
+    assert background.pending() == 0
+
+
+def test_broken_stream_restores_the_plain_result(monkeypatch):
+    message = _Message()
+
+    async def fake_explain(**kwargs):
+        editor_partial = kwargs["on_partial"]
+        editor_partial.__self__._next_edit = 0.0
+        await editor_partial("Half an expl")
+        return None
+
+    monkeypatch.setattr(explanation_delivery, "explain_errors", fake_explain)
+
+    async def scenario():
+        await schedule_explanation(message, _render, None)
+
+    asyncio.run(scenario())
+    assert message.edits == ["Score 60/100 | Half an expl …", "Score 60/100"]
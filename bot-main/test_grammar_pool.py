@@ -0,0 +1,177 @@
+"""Tests for the LanguageTool pool and the grammar micro-batcher, with fake workers."""
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.checker import GrammarBatcher, _split_matches
+from services.grammar_pool import LanguageToolPool
+
+
+class FakeTool:
+    created = 0
+
+    def __init__(self, delay: float = 0.0, broken: bool = False):
+        FakeTool.created += 1
+        self.delay = delay
+        self.broken = broken
+        self.closed = False
+
+    def check(self, text):
+        if self.broken:
+            raise ConnectionError("jvm died")
+        time.sleep(self.delay)
+        return [text]
+
+    def close(self):
+        self.closed = True
+
+
+def test_concurrent_startup_creates_workers_once():
+    calls = []
+
+    def factory():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return FakeTool()
+
+    pool = LanguageToolPool(factory, size=2)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.ensure_started() for _ in range(10)))
+
+    assert asyncio.run(scenario()) == [True] * 10
+    assert len(calls) == 2
+    assert pool.check("hello") == ["hello"]
+
+
+def test_checks_run_in_parallel_across_workers():
+    pool = LanguageToolPool(lambda: FakeTool(delay=0.1), size=4)
+    pool.start()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(pool.check, ["a", "b", "c", "d"]))
+    elapsed = time.monotonic() - started
+
+    assert results == [["a"], ["b"], ["c"], ["d"]]
+    assert elapsed < 0.3
+
+
+def test_broken_worker_is_restarted():
+    tools = iter([FakeTool(broken=True), FakeTool()])
+    pool = LanguageToolPool(lambda: next(tools), size=1)
+
+    assert pool.check("text") == ["text"]
+    assert pool.stats()["restarts"] == 1
+    assert pool.stats()["workers"] == 1
+
+
+def test_unavailable_pool_returns_none():
+    assert LanguageToolPool(None).check("text") is None
+
+    def failing():
+        raise OSError("no java")
+
+    assert LanguageToolPool(failing, size=2).check("text") is None
+
+
+class FakeMatch:
+    def __init__(self, offset, length, rule_id="GRAMMAR", issue_type="grammar"):
+        self.offset = offset
+        self.errorLength = length
+        self.ruleId = rule_id
+        self.ruleIssueType = issue_type
+        self.message = rule_id
+
+
+class DocumentTool(FakeTool):
+    """Flags every 'goed' and counts round trips."""
+
+    documents = []
+
+    def check(self, text):
+        DocumentTool.documents.append(text)
+        matches = []
+        start = text.find("goed")
+        while start != -1:
+            matches.append(FakeMatch(start, 4))
+            start = text.find("goed", start + 1)
+        return matches
+
+
+def test_batcher_checks_burst_in_one_call_and_splits_by_offset():
+    DocumentTool.documents = []
+    pool = LanguageToolPool(DocumentTool, size=1)
+    pool.start()
+    batcher = GrammarBatcher(pool, max_batch=8, max_wait=0.02)
+    answers = ["I goed home.", "She went home.", "They goed to school and goed back."]
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.check(text) for text in answers))
+
+    results = asyncio.run(scenario())
+
+    assert len(DocumentTool.documents) == 1
+    assert [[m.offset for m in matches] for matches in results] == [[2], [], [5, 24]]
+    for text, matches in zip(answers, results):
+        assert all(text[m.offset:m.offset + m.errorLength] == "goed" for m in matches)
+    assert batcher.stats()["max_batch"] == 3
+
+
+def test_batcher_flushes_at_max_batch_and_sets_aside_cross_paragraph_rules():
+    matches = [
+        FakeMatch(0, 1),
+        FakeMatch(6, 1, rule_id="ENGLISH_WORD_REPEAT_BEGINNING_RULE"),
+        FakeMatch(3, 4),  # runs into the paragraph break
+    ]
+    per_answer, recheck = _split_matches(matches, [(0, 4), (6, 10)])
+    assert [len(items) for items in per_answer] == [1, 0]
+    assert recheck == {0, 1}
+
+    DocumentTool.documents = []
+    pool = LanguageToolPool(DocumentTool, size=2)
+    pool.start()
+    batcher = GrammarBatcher(pool, max_batch=2, max_wait=10.0)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.check(f"answer {i}") for i in range(4))), timeout=1.0
+        )
+
+    asyncio.run(scenario())
+    assert len(DocumentTool.documents) == 2
+
+
+class RepeatTool(FakeTool):
+    """Context-dependent like LanguageTool's EN_REPEATEDWORDS_*: flags a word seen earlier in the document."""
+
+    def check(self, text):
+        matches, seen = [], set()
+        for word in re.finditer(r"\w+", text):
+            key = word.group().lower()
+            if key in seen:
+                matches.append(FakeMatch(word.start(), len(key), rule_id=f"EN_REPEATEDWORDS_{key.upper()}"))
+            seen.add(key)
+            if key == "goed":
+                matches.append(FakeMatch(word.start(), 4))
+        return matches
+
+
+def test_batched_result_equals_single_answer_result_when_a_neighbour_repeats_words():
+    answers = ["It is a nice day.", "Nice weather, nice day, I goed out.", "We goed home."]
+    pool = LanguageToolPool(RepeatTool, size=1)
+    pool.start()
+    batcher = GrammarBatcher(pool, max_batch=8, max_wait=0.02)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.check(text) for text in answers))
+
+    def plain(matches):
+        return [(match.offset, match.errorLength, match.ruleId) for match in matches]
+
+    batched = asyncio.run(scenario())
+    assert [plain(matches) for matches in batched] == [plain(pool.check(text)) for text in answers]
+    # The 2nd repeats "nice"/"day", the 3rd repeats the 2nd's "goed"; the 1st is kept from the batch
+    assert batcher.stats()["rechecks"] == 2
@@ -0,0 +1,43 @@
+"""Tests for the declarative grammar rule table (services/grammar_rules.py)."""
+from services.grammar_rules import RULES, ReferenceFeatures, apply_rules, rule_stats
+
+
+def _apply(answer: str, reference: str, heuristics: bool = True) -> tuple[float, list[str]]:
+    issues: list[str] = []
+    score = apply_rules(100.0, answer, ReferenceFeatures.build(reference), issues, heuristics)
+    return score, issues
+
+
+def test_rules_fire_in_table_order():
+    score, issues = _apply("we are living in tashkent", "We live in Tashkent.")
+    assert issues == [
+        "Start the sentence with a capital letter.",
+        "Add sentence punctuation.",
+        "Check verb tense - use simple present ('live') instead of continuous ('are living').",
+        "Check capitalization - capitalize proper nouns like 'tashkent'.",
+    ]
+    assert score == 100 - 5 - 5 - 8 - 5
+
+
+def test_sentence_initial_words_are_not_proper_nouns():
+    _, issues = _apply("I was late. we met anna there", "I was late. We met Anna there.")
+    assert "Check capitalization - capitalize proper nouns like 'anna'." in issues
+def test_heuristic_only_rules_are_skipped_with_languagetool():
+    _, issues = _apply("I work in the morning and in night", "I work at night.", heuristics=False)
+    assert issues == ["Check prepositions - use 'at night' instead of 'in night'."]
+
+
+def test_dedupe_keeps_penalty_but_drops_second_message():
+    # The tense-marker rule already said "Check verb tense ..."
+    score, issues = _apply("We are living here", "We will live here.", heuristics=False)
+    assert issues == ["Check verb tense and auxiliary verbs."]
+    assert score == 100 - 6 - 8
+
+
+def test_counters_track_evaluations_and_hits():
+    before = rule_stats()["known_mistake"]
+    _apply("I'm work on weekends", "I work on weekends.")
+    after = rule_stats()["known_mistake"]
+    assert after["evaluations"] == before["evaluations"] + 1
+    assert after["hits"] == before["hits"] + 1
+    assert set(rule_stats()) == {rule.name for rule in RULES}
@@ -0,0 +1,101 @@
+"""Tests for the two-tier check result cache (services/result_cache.py)."""
+import asyncio
+
+from services import checker
+from services.result_cache import ResultCache, ResultKey, answer_key
+
+
+class FakeTable:
+    def __init__(self, fail: bool = False):
+        self.rows: dict[tuple, dict] = {}
+        self.fail = fail
+
+    async def load(self, *key):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self.rows.get(key)
+
+    async def save(self, *key_and_result):
+        *key, result = key_and_result
+        self.rows[tuple(key)] = result
+
+
+def _compute(calls: list, cacheable: bool = True):
+    async def compute():
+        calls.append(1)
+        return {"score": 90, "errors": []}, cacheable
+    return compute
+
+
+def test_memory_tier_serves_repeats_and_returns_copies():
+    cache = ResultCache(10)
+    key = ResultKey(1, "I was late.", "B1", "v1")
+    calls: list = []
+
+    first = asyncio.run(cache.get_or_compute(key, _compute(calls)))
+    first["errors"].append("mutated by the caller")
+    second = asyncio.run(cache.get_or_compute(key, _compute(calls)))
+
+    assert len(calls) == 1
+    assert second == {"score": 90, "errors": []}
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_persistent_tier_survives_a_restart_and_version_change_invalidates():
+    table = FakeTable()
+    calls: list = []
+    key = ResultKey(1, "I was late.", "B1", "v1")
+
+    asyncio.run(ResultCache(10, table.load, table.save).get_or_compute(key, _compute(calls)))
+    restarted = ResultCache(10, table.load, table.save)
+    asyncio.run(restarted.get_or_compute(key, _compute(calls)))
+    assert len(calls) == 1
+    assert restarted.stats()["persistent_hits"] == 1
+
+    asyncio.run(restarted.get_or_compute(key._replace(checker_version="v2"), _compute(calls)))
+    assert len(calls) == 2
+
+
+def test_uncacheable_and_phraseless_results_skip_the_table():
+    table = FakeTable()
+    cache = ResultCache(10, table.load, table.save)
+    calls: list = []
+
+    asyncio.run(cache.get_or_compute(ResultKey(1, "a", "B1", "v1"), _compute(calls, cacheable=False)))
+    asyncio.run(cache.get_or_compute(ResultKey(("I was late.",), "a", "B1", "v1"), _compute(calls)))
+    assert table.rows == {}
+    assert len(cache._memory) == 1
+
+
+def test_table_errors_fall_back_to_checking():
+    cache = ResultCache(10, FakeTable(fail=True).load)
+    calls: list = []
+    result = asyncio.run(cache.get_or_compute(ResultKey(1, "a", "B1", "v1"), _compute(calls)))
+    assert result["score"] == 90
+    assert cache.stats()["persistent_errors"] == 1
+
+
+def test_check_translation_is_memoized_per_phrase_and_answer(monkeypatch):
+    cache = ResultCache(10)
+    monkeypatch.setattr(checker, "result_cache", cache)
+
+    def check(answer: str, level: str = "B1"):
+        return asyncio.run(checker.check_translation("", "", "I was late.", answer, level, phrase_id=7))
+
+    first = check("I  was late.")
+    assert check("I was late. ") == first
+    assert cache.stats()["memory_hits"] == 1
+
+    # Case and punctuation change the feedback, so they are part of the key
+    check("i was late")
+    check("I was late.", level="B2")
+    assert cache.stats()["misses"] == 3
+    assert answer_key(" I  was\nlate. ") == "I was late."
+
+
+def test_checker_version_follows_the_reference_answers():
+    before = checker.checker_version(False, "lexical", ("I was late.",))
+    assert checker.checker_version(False, "lexical", ("I was late.",)) == before
+    # The same phrase id after its answer was edited
+    assert checker.checker_version(False, "lexical", ("I came late.",)) != before
@@ -0,0 +1,96 @@
+"""Tests for the optional embedding scorer (services/semantic.py), no model download."""
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services import checker, semantic  # noqa: E402
+from services.semantic import EmbeddingScorer, HashingEmbedder, write_reference_vectors  # noqa: E402
+
+REFERENCES = ["I was late for the meeting.", "I arrived late for the meeting"]
+
+
+class SynonymEmbedder(HashingEmbedder):
+    """Hashing embedder that treats a few paraphrases as the same words."""
+
+    SYNONYMS = {"arrived": "was", "came": "was"}
+
+    def __init__(self):
+        super().__init__()
+        self.name = "synonyms"
+
+    def _features(self, text):
+        return super()._features(" ".join(self.SYNONYMS.get(word, word) for word in text.lower().split()))
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder()
+    first = embedder.embed(["I was late.", ""])
+    assert np.array_equal(first, HashingEmbedder().embed(["I was late.", ""]))
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+
+
+def test_reference_vectors_are_memory_mapped(tmp_path):
+    path = str(tmp_path / "vectors")
+    embedder = HashingEmbedder()
+    assert write_reference_vectors(REFERENCES + REFERENCES[:1], embedder, path) == 2
+
+    scorer = EmbeddingScorer(embedder, path)
+    assert isinstance(scorer.vectors._matrix, np.memmap)
+    scores = scorer.similarities("I was late for the meeting.", REFERENCES)
+    assert scores[0] == pytest.approx(100.0)
+    assert scores[1] < scores[0]
+    assert scorer.reference_misses == 0
+
+    scorer.similarities("I was late.", ["A phrase added after the build."])
+    assert scorer.reference_misses == 1
+
+
+def test_vectors_of_another_embedder_are_ignored(tmp_path):
+    path = str(tmp_path / "vectors")
+    write_reference_vectors(REFERENCES, HashingEmbedder(), path)
+    scorer = EmbeddingScorer(SynonymEmbedder(), path)
+    assert len(scorer.vectors) == 0
+    assert scorer.similarities("I was late for the meeting.", REFERENCES[:1])[0] == pytest.approx(100.0)
+
+
+def test_pairwise_matches_single_answer_scoring(tmp_path):
+    scorer = EmbeddingScorer(HashingEmbedder(), str(tmp_path / "missing"))
+    answers = ["I was late to the meeting", "The cat sleeps"]
+    pairwise = scorer.pairwise(answers, [REFERENCES[0], REFERENCES[0]])
+    assert pairwise == pytest.approx([scorer.similarities(answer, REFERENCES[:1])[0] for answer in answers])
+
+
+def test_checker_keeps_the_higher_of_lexical_and_embedding_similarity(tmp_path, monkeypatch):
+    references = checker._reference_features(["I was late for the meeting."])
+    answer = "I arrived late for the meeting"
+    _, lexical = checker._best_match(answer, references)
+
+    monkeypatch.setattr(semantic, "_scorer", EmbeddingScorer(SynonymEmbedder(), str(tmp_path / "none")))
+    monkeypatch.setattr(semantic, "_scorer_ready", True)
+    _, combined = checker._best_match(answer, references)
+    assert lexical < combined == pytest.approx(100.0)
+
+    # Exact wording never scores lower than before
+    assert checker._best_match("I was late for the meeting.", references)[1] == 100.0
+
+
+def test_lexical_mode_has_no_scorer():
+    assert semantic.create_embedder("lexical") is None
+    assert semantic.create_embedder("no-such-scorer") is None
+
+
+def test_checker_version_names_the_scorer_that_runs(tmp_path, monkeypatch):
+    def version():
+        monkeypatch.setattr(checker, "_semantic_name", None)
+        return checker.checker_version(False, asyncio.run(checker._semantic_scorer_name()))
+
+    # SEMANTIC_SCORER=embedding whose model failed to load: lexical results
+    monkeypatch.setattr(semantic, "_scorer", None)
+    monkeypatch.setattr(semantic, "_scorer_ready", True)
+    assert ":heuristics:lexical:" in version()
+
+    monkeypatch.setattr(semantic, "_scorer", EmbeddingScorer(SynonymEmbedder(), str(tmp_path / "none")))
+    assert ":heuristics:synonyms:" in version()
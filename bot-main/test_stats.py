@@ -0,0 +1,93 @@
+"""Tests for /stats (handlers/stats.py): bucket sums, breakdown lines, degraded topics."""
+import asyncio
+from datetime import date, timedelta
+
+from handlers import stats
+
+TODAY = date(2026, 3, 15)
+
+
+def _bucket(days_ago: int, attempts: int, score_sum: int, topic_id=1, level="B1", score_max=90, low=0):
+    return {
+        "day": TODAY - timedelta(days=days_ago),
+        "topic_id": topic_id,
+        "level": level,
+        "attempts": attempts,
+        "score_sum": score_sum,
+        "score_max": score_max,
+        "low_count": low,
+    }
+
+
+def test_sum_buckets_of_nothing_is_zero():
+    assert stats._sum_buckets([]) == {"attempts": 0, "avg": 0, "best": 0, "low": 0}
+
+
+def test_sum_and_group_buckets():
+    rows = [
+        _bucket(0, 2, 150, topic_id=1, score_max=80, low=1),
+        _bucket(1, 1, 100, topic_id=1, score_max=100),
+        _bucket(1, 4, 360, topic_id=2, score_max=95),
+    ]
+    assert stats._sum_buckets(rows) == {"attempts": 7, "avg": 87, "best": 100, "low": 1}
+    assert stats._group_buckets(rows, "topic_id") == {
+        1: {"attempts": 3, "avg": 83, "best": 100, "low": 1},
+        2: {"attempts": 4, "avg": 90, "best": 95, "low": 0},
+    }
+
+
+def test_breakdown_of_no_buckets_is_empty():
+    assert stats._breakdown_lines([], {1: "Travel"}, today=TODAY) == []
+
+
+def test_week_boundaries():
+    daily = [
+        _bucket(6, 1, 90),    # oldest day of this week
+        _bucket(7, 1, 70),    # newest day of the previous week
+        _bucket(13, 1, 50),   # oldest day of the previous week
+        _bucket(14, 5, 0),    # older: in neither week
+    ]
+    lines = stats._breakdown_lines(daily, {}, today=TODAY)
+    assert "• 1 answer, avg 90 (⬆️ +30 vs previous week)" in lines
+    assert "• 2 answers, avg 80" in stats._breakdown_lines([_bucket(0, 2, 160)], {}, today=TODAY)
+
+
+def test_week_without_answers_and_unnamed_topic():
+    lines = stats._breakdown_lines([_bucket(7, 2, 160, topic_id=9, low=1)], {}, today=TODAY)
+    assert "• Topic 9 — 2 × avg 80, 1 under 70" in lines
+    assert "• B1 — 2 × avg 80, best 90" in lines
+    assert lines[-1] == "• No answers this week yet"
+
+
+class _Message:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    async def answer(self, text, **kwargs):
+        self.texts.append(text)
+
+
+def test_stats_survive_a_topics_failure(monkeypatch):
+    async def user(telegram_id, username):
+        return {"id": 1}
+
+    async def totals(user_id):
+        return {"total": 2, "avg": 80, "best": 90}
+
+    async def daily(user_id):
+        return [_bucket(0, 2, 160, topic_id=3)]
+
+    async def topics():
+        raise ConnectionError("topics down")
+
+    monkeypatch.setattr(stats, "get_or_create_user", user)
+    monkeypatch.setattr(stats, "get_user_stats", totals)
+    monkeypatch.setattr(stats, "get_user_daily_stats", daily)
+    monkeypatch.setattr(stats, "get_topics", topics)
+    message = _Message()
+
+    asyncio.run(stats.send_stats(message, 42, "learner"))
+
+    text, = message.texts
+    assert "<b>Total translations:</b> 2" in text
+    assert "• Topic 3 — 2 × avg 80" in text
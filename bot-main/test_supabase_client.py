@@ -0,0 +1,179 @@
+"""Tests for the Supabase backend (db/supabase_client.py) with PostgREST stubbed out."""
+import asyncio
+
+import pytest
+
+from db import supabase_client as sb
+from db.phrase_catalog import PhraseCatalog
+
+
+class _Users:
+    """Stand-in for the users table behind _execute(build): records each call."""
+
+    def __init__(self, rows=()):
+        self.rows = {row["telegram_id"]: dict(row) for row in rows}
+        self.calls: list[str] = []
+
+    def table(self, name):
+        self._op, self._payload, self._filters = None, None, {}
+        return self
+
+    def select(self, columns):
+        self._op = "select"
+        return self
+
+    def upsert(self, payload, on_conflict, ignore_duplicates=False):
+        self._op, self._payload = "upsert", payload
+        return self
+
+    def update(self, payload, returning=None):
+        self._op, self._payload = "update", payload
+        return self
+
+    def eq(self, column, value):
+        self._filters[column] = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    async def execute(self, build):
+        build(self)
+        self.calls.append(self._op)
+        data = []
+        if self._op == "select":
+            row = self.rows.get(self._filters["telegram_id"])
+            data = [dict(row)] if row else []
+        elif self._op == "upsert" and self._payload["telegram_id"] not in self.rows:
+            row = {"id": len(self.rows) + 1, **self._payload}
+            self.rows[row["telegram_id"]] = row
+            data = [dict(row)]
+        elif self._op == "update":
+            self.rows[self._filters["telegram_id"]].update(self._payload)
+        return type("Response", (), {"data": data})()
+
+
+def test_existing_user_costs_one_select_and_keeps_the_username(monkeypatch):
+    users = _Users([{"id": 7, "telegram_id": 100, "username": "alice"}])
+    monkeypatch.setattr(sb, "_execute", users.execute)
+
+    user = asyncio.run(sb.get_or_create_user(100, None))
+    assert user == {"id": 7, "telegram_id": 100, "username": "alice"}
+    assert users.calls == ["select"]
+
+    assert asyncio.run(sb.get_or_create_user(100, "alice2"))["username"] == "alice2"
+    assert users.calls == ["select", "select", "update"]
+    assert users.rows[100]["username"] == "alice2"
+
+
+def test_new_user_without_username_is_stored_with_empty_string(monkeypatch):
+    users = _Users()
+    monkeypatch.setattr(sb, "_execute", users.execute)
+
+    user = asyncio.run(sb.get_or_create_user(200, None))
+    assert user == {"id": 1, "telegram_id": 200, "username": ""}
+    assert users.calls == ["select", "upsert"]
+
+
+ROW = {"id": 1, "text_ru": "ru", "text_uz": "uz", "english_answer": "I am home.", "level": "B1"}
+
+
+class _Phrases:
+    """Stand-in for select-by-id on the phrases table."""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self._id = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    async def execute(self, build):
+        build(self)
+        row = self.rows.get(self._id)
+        return type("Response", (), {"data": [dict(row)] if row else []})()
+
+
+def _pick(monkeypatch, picks, table_rows):
+    """Catalog with ROW only; the RPC returns the ids in picks one by one."""
+    legacy_picks: list = []
+    picks = iter(picks)
+
+    async def load(topic_id, level):
+        return [ROW]
+
+    async def rpc(user_id, topic_id, level):
+        return next(picks)
+
+    async def legacy(*args):
+        legacy_picks.append(args)
+        return ROW
+
+    monkeypatch.setattr(sb, "_phrase_catalog", PhraseCatalog(load, ttl=300))
+    monkeypatch.setattr(sb, "_pick_rpc_available", True)
+    monkeypatch.setattr(sb, "_pick_phrase_id_rpc", rpc)
+    monkeypatch.setattr(sb, "_pick_phrase_legacy", legacy)
+    monkeypatch.setattr(sb, "_execute", _Phrases(table_rows).execute)
+    return asyncio.run(sb.get_unique_phrase(5, 1, "B1")), legacy_picks
+
+
+def test_picked_phrase_missing_from_catalog_is_read_by_id(monkeypatch):
+    # The catalog refresh served a stale copy without phrase 2
+    row = {**ROW, "id": 2, "english_answer": "I am out.", "alternative_answers": []}
+    phrase, legacy_picks = _pick(monkeypatch, [2], [row])
+    assert phrase["id"] == 2
+    assert legacy_picks == []
+
+
+def test_deleted_pick_is_picked_again_not_by_the_legacy_picker(monkeypatch):
+    phrase, legacy_picks = _pick(monkeypatch, [2, 1], [])
+    assert phrase["id"] == 1
+    assert legacy_picks == []
+
+
+def test_in_flight_semaphore_is_created_with_the_async_client(monkeypatch):
+    monkeypatch.setattr(sb, "_async_client", None)
+    monkeypatch.setattr(sb, "_in_flight", None)
+
+    async def scenario():
+        sb.get_async_client()
+        semaphore = sb._in_flight
+        await sb.close_db()
+        return semaphore
+
+    assert isinstance(asyncio.run(scenario()), asyncio.Semaphore)
+    assert sb._in_flight is None
+
+
+def test_stats_scan_only_when_the_rollup_table_is_missing(monkeypatch):
+    scans: list = []
+
+    async def scan(user_id):
+        scans.append(user_id)
+        return {"total": 0, "avg": 0, "best": 0}
+
+    def failing(message):
+        async def execute(build):
+            raise RuntimeError(message)
+        return execute
+
+    monkeypatch.setattr(sb, "_get_user_stats_scan", scan)
+    monkeypatch.setattr(sb, "_stats_rollup_available", True)
+
+    monkeypatch.setattr(sb, "_execute", failing("connection reset"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(sb.get_user_stats(1))
+    assert scans == [] and sb._stats_rollup_available
+
+    monkeypatch.setattr(sb, "_execute", failing("PGRST205 relation user_stats not found"))
+    asyncio.run(sb.get_user_stats(1))
+    assert scans == [1] and not sb._stats_rollup_available
@@ -0,0 +1,25 @@
+"""Tests for the shared normalizer (utils/text.py)."""
+from utils.text import normalize, phrase_key, phrase_similarity, tokens
+
+
+def test_normalize_expands_contractions_in_one_pass():
+    assert normalize("  I'm sure they'll come, DON'T worry!  ") == "i am sure they will come do not worry"
+    assert normalize("It's can't-stop") == "it is cannot stop"
+
+
+def test_normalize_keeps_unknown_apostrophes():
+    assert normalize("Tom's car") == "tom's car"
+
+
+def test_tokens_match_normalized_words():
+    assert tokens("We're at home.") == ("we", "are", "at", "home")
+
+
+def test_phrase_key_keeps_contractions():
+    # Keys are stored in phrases.phrase_key, so they must not change shape.
+    assert phrase_key("I'm late — again!") == "i'm late again"
+
+
+def test_phrase_similarity_ignores_case_and_punctuation():
+    assert phrase_similarity("I was late.", "i was LATE") == 100.0
+    assert phrase_similarity("I was late.", "She bought a new car") < 50.0
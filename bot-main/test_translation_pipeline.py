@@ -0,0 +1,122 @@
+"""receive_answer: concurrent stages, in-place result, score saved in the background."""
+import asyncio
+
+from handlers import translation
+from utils import background
+from utils.timing import StageTimer
+
+
+class _Sent:
+    def __init__(self, log: list):
+        self._log = log
+
+    async def edit_text(self, text, reply_markup=None, parse_mode=None):
+        self._log.append(("edit", text))
+        return self
+
+
+class _Message:
+    def __init__(self, text: str):
+        self.text = text
+        self.from_user = type("User", (), {"id": 42, "username": "learner"})()
+        self.log: list = []
+
+    async def answer(self, text, **kwargs):
+        await asyncio.sleep(0.05)
+        self.log.append(("answer", text))
+        return _Sent(self.log)
+
+
+class _State:
+    async def get_data(self):
+        return {
+            "topic_id": 1,
+            "level": "B1",
+            "current_phrase_id": 7,
+            "current_text_ru": "Я дома.",
+            "current_english": "I am home.",
+        }
+
+
+class _RecordingTimer(StageTimer):
+    created: list = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _RecordingTimer.created.append(self)
+
+
+def test_receive_answer_runs_stages_concurrently_and_edits_in_place(monkeypatch):
+    saved: list = []
+
+    async def slow_user(telegram_id, username):
+        await asyncio.sleep(0.2)
+        return {"id": 3}
+
+    async def slow_check(**kwargs):
+        await asyncio.sleep(0.2)
+        return {"score": 100, "errors": [], "feedback": "", "details": {"semantic": 100}}
+
+    async def fake_save(**kwargs):
+        saved.append(kwargs)
+
+    _RecordingTimer.created = []
+    monkeypatch.setattr(translation, "StageTimer", _RecordingTimer)
+    monkeypatch.setattr(translation, "get_or_create_user", slow_user)
+    monkeypatch.setattr(translation, "check_translation", slow_check)
+    monkeypatch.setattr(translation, "save_score", fake_save)
+    message = _Message("I am home.")
+
+    async def scenario():
+        await translation.receive_answer(message, _State())
+        await background.drain()
+
+    asyncio.run(scenario())
+
+    # Run one after another, the stages could not fit into the total
+    timer, = _RecordingTimer.created
+    assert {"placeholder", "user", "check", "reply"} <= set(timer.stages)
+    assert timer.total() < timer.stages["user"] + timer.stages["check"]
+    assert [kind for kind, _ in message.log] == ["answer", "edit"]
+    assert message.log[0][1] == "🔍 Checking..."
+    assert "100/100" in message.log[1][1]
+    assert saved == [{
+        "user_id": 3, "phrase_id": 7, "user_answer": "I am home.",
+        "score": 100, "errors": [], "feedback": "",
+    }]
+
+
+def test_failed_check_edits_placeholder_and_lets_user_lookup_finish(monkeypatch):
+    looked_up: list = []
+
+    async def slow_user(telegram_id, username):
+        await asyncio.sleep(0.1)
+        looked_up.append(telegram_id)
+        return {"id": 3}
+
+    async def failing_check(**kwargs):
+        raise RuntimeError("checker down")
+
+    monkeypatch.setattr(translation, "get_or_create_user", slow_user)
+    monkeypatch.setattr(translation, "check_translation", failing_check)
+    message = _Message("I am home.")
+
+    async def scenario():
+        await translation.receive_answer(message, _State())
+        await background.drain()
+
+    asyncio.run(scenario())
+
+    assert message.log == [("answer", "🔍 Checking..."), ("edit", "Error checking answer")]
+    assert looked_up == [42]
+
+
+def test_stage_timer_reports_each_stage():
+    ticks = iter([0.0, 1.0, 1.5, 2.0])
+    timer = StageTimer(clock=lambda: next(ticks))
+
+    async def noop():
+        return "done"
+
+    assert asyncio.run(timer.track("check", noop())) == "done"
+    assert timer.summary() == "check=500.0ms total=2000.0ms"
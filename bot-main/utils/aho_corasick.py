@@ -0,0 +1,73 @@
+"""
+Aho–Corasick multi-pattern matcher over token sequences.
+
+Patterns are tuples of tokens (words). Matching walks the input once and
+follows failure links, so the cost is linear in the input length plus the
+number of matches, independent of how many patterns are loaded.
+"""
+
+from collections import deque
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from typing import Any
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[tuple[Sequence[Hashable], Any]]):
+        # Flat tables instead of a dict per state: a large lexicon would
+        # otherwise leave tens of thousands of containers for the GC to scan.
+        self._goto: dict[tuple[int, Hashable], int] = {}
+        self._fail: list[int] = [0]
+        # State → (pattern length, value) of every pattern ending there
+        self._out: dict[int, tuple[tuple[int, Any], ...]] = {}
+        self._size = 0
+        children: list[list[tuple[Hashable, int]]] = [[]]
+        for pattern, value in patterns:
+            self._add(pattern, value, children)
+        self._build(children)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, pattern: Sequence[Hashable], value: Any, children: list) -> None:
+        if not pattern:
+            return
+        state = 0
+        for item in pattern:
+            nxt = self._goto.get((state, item))
+            if nxt is None:
+                nxt = len(self._fail)
+                self._goto[state, item] = nxt
+                self._fail.append(0)
+                children[state].append((item, nxt))
+                children.append([])
+            state = nxt
+        outputs = self._out.get(state, ())
+        if not any(length == len(pattern) for length, _ in outputs):
+            self._out[state] = outputs + ((len(pattern), value),)
+            self._size += 1
+
+    def _build(self, children: list) -> None:
+        queue = deque(nxt for _, nxt in children[0])
+        while queue:
+            state = queue.popleft()
+            for item, nxt in children[state]:
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and (fail, item) not in self._goto:
+                    fail = self._fail[fail]
+                target = self._goto.get((fail, item), 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._out.get(self._fail[nxt])
+                if inherited:
+                    self._out[nxt] = self._out.get(nxt, ()) + inherited
+
+    def iter_matches(self, items: Sequence[Hashable]) -> Iterator[tuple[int, int, Any]]:
+        """Yield (start, end, value) for every pattern occurrence in items."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, item in enumerate(items):
+            while state and (state, item) not in goto:
+                state = fail[state]
+            state = goto.get((state, item), 0)
+            for length, value in out.get(state, ()):
+                yield index + 1 - length, index + 1, value
@@ -0,0 +1,40 @@
+"""
+Fire-and-forget tasks that still finish on shutdown.
+
+The event loop only keeps weak references to tasks, so spawn() holds each
+one until it is done. drain() runs in the shutdown hook, before the
+write-behind queue and the HTTP clients close, so a queued score or an
+explanation in progress is not lost on a redeploy.
+"""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_tasks: set[asyncio.Task] = set()
+
+
+def spawn(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def pending() -> int:
+    return len(_tasks)
+
+
+async def drain(timeout: float = 5.0) -> None:
+    """Wait for running tasks; cancel the ones still running after timeout."""
+    if not _tasks:
+        return
+    _, late = await asyncio.wait(set(_tasks), timeout=timeout)
+    if late:
+        logger.warning("Cancelling %d background tasks at shutdown", len(late))
+    for task in late:
+        task.cancel()
+    await asyncio.gather(*late, return_exceptions=True)
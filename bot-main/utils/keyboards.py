@@ -6,7 +6,7 @@ Level-related keyboards are async because levels are loaded from the database.
 from aiogram.types import InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from db.supabase_client import get_levels
+from db.repository import get_levels
 
 
 DIRECTION_LABELS = {
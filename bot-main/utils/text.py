@@ -0,0 +1,90 @@
+"""
+Text normalization shared by the checker, the DB layer and admin loaders.
+
+normalize() expands contractions and reduces text to lowercase words; it is
+what the checker compares. phrase_key() is the dedupe key stored in
+phrases.phrase_key — same cleanup, but contractions are kept as written so
+keys already in the database stay valid. phrase_similarity() compares two
+phrase keys (0–100) for the near-duplicate check when phrases are added.
+
+All contractions are matched by one compiled alternation in a single pass,
+and results are memoized: the same references and answers are normalized
+over and over.
+"""
+
+import re
+from functools import lru_cache
+
+CONTRACTIONS = {
+    "i'm": "i am",
+    "you're": "you are",
+    "he's": "he is",
+    "she's": "she is",
+    "it's": "it is",
+    "we're": "we are",
+    "they're": "they are",
+    "can't": "cannot",
+    "won't": "will not",
+    "don't": "do not",
+    "doesn't": "does not",
+    "didn't": "did not",
+    "isn't": "is not",
+    "aren't": "are not",
+    "wasn't": "was not",
+    "weren't": "were not",
+    "i'll": "i will",
+    "you'll": "you will",
+    "we'll": "we will",
+    "they'll": "they will",
+}
+
+_CONTRACTION_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(item) for item in sorted(CONTRACTIONS, key=len, reverse=True)) + r")\b"
+)
+# Everything except letters, digits and apostrophes (whitespace included)
+# collapses to a single space.
+_SEPARATOR_RE = re.compile(r"[^a-z0-9']+")
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+_CACHE_SIZE = 8192
+
+
+def _expand(match: re.Match) -> str:
+    return CONTRACTIONS[match.group(0)]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalize(text: str) -> str:
+    value = _CONTRACTION_RE.sub(_expand, text.strip().lower())
+    return _SEPARATOR_RE.sub(" ", value).strip()
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def tokens(text: str) -> tuple[str, ...]:
+    return tuple(_WORD_RE.findall(normalize(text)))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def phrase_key(text: str) -> str:
+    return _SEPARATOR_RE.sub(" ", text.lower()).strip()
+
+
+def phrase_similarity(left: str, right: str) -> float:
+    try:
+        from rapidfuzz import fuzz
+
+        left_key = phrase_key(left)
+        right_key = phrase_key(right)
+        return float(
+            max(
+                fuzz.token_set_ratio(left_key, right_key),
+                fuzz.token_sort_ratio(left_key, right_key),
+                fuzz.partial_ratio(left_key, right_key),
+            )
+        )
+    except Exception:
+        left_words = set(phrase_key(left).split())
+        right_words = set(phrase_key(right).split())
+        if not left_words or not right_words:
+            return 0.0
+        return 100.0 * len(left_words & right_words) / len(left_words | right_words)
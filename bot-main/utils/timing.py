@@ -0,0 +1,33 @@
+"""
+Per-stage latency of one request.
+
+Stages may overlap (they run concurrently), so each is timed on its own
+and the total is wall time since the timer was created.
+"""
+
+import time
+from collections.abc import Awaitable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._started = clock()
+        self.stages: dict[str, float] = {}
+
+    async def track(self, name: str, awaitable: Awaitable[T]) -> T:
+        started = self._clock()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = self._clock() - started
+
+    def total(self) -> float:
+        return self._clock() - self._started
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages.items()]
+        return " ".join([*parts, f"total={self.total() * 1000:.1f}ms"])